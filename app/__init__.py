@@ -2,7 +2,7 @@ import os
 from flask import Flask, session
 from dotenv import load_dotenv
 from app.models import User
-from app.extensions import db, limiter, mail
+from app.extensions import db, migrate, limiter, mail
 from flask_login import current_user
 
 
@@ -22,6 +22,7 @@ def create_app(config_class=None):
 
     # Initialize extensions
     db.init_app(app)
+    migrate.init_app(app, db)
     limiter.init_app(app)
     mail.init_app(app) 
     
@@ -41,6 +42,15 @@ def create_app(config_class=None):
     from app.blueprints.auth.routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')  
 
+    # Background analysis workers run in every process that serves the app
+    from app.centralizepath import analysis_jobs
+    analysis_jobs.init_app(app)
+
+    # Load the models named in MODEL_WARMUP now instead of on the first request. With
+    # gunicorn --preload this runs once in the master and workers share the weights.
+    from app.services.model_registry import warm_up_models
+    warm_up_models()
+
     @app.context_processor
     def inject_user():
         user = None
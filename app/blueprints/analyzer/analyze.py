@@ -1,43 +1,47 @@
 import cv2
-import pytesseract
-from PIL import Image
 import numpy as np
 import os
+import atexit
 import tempfile
 from datetime import datetime, timedelta
 import re
-from collections import Counter, defaultdict
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-import platform
-from nltk.corpus import stopwords
-from pdf2image import convert_from_path
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.stem import WordNetLemmatizer
+from collections import Counter, defaultdict, deque
+from collections.abc import Mapping
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from pdf2image import convert_from_path, pdfinfo_from_path
+import PyPDF2
 import warnings
 import subprocess
+from app.services.ocr_service import get_engine, load_grayscale, estimate_text_height, normalize_resolution, TEXT_HEIGHT_TARGET
+from app.services.ocr_cache import get_ocr_cache, make_cache_key
+from app.services.nlp_service import PhraseCleaner, get_stop_words, get_topic_scanner, normalize_topic_phrase, normalization_cache_stats
 warnings.filterwarnings('ignore')
 
-try:
-    result = subprocess.run(["tesseract", "--version"], capture_output=True, text=True)
-    print(f"[INFO] Tesseract version output:\n{result.stdout}")
-except Exception as e:
-    print(f"[ERROR] Failed to run tesseract: {e}")
+os.environ['NLTK_DATA'] = '/app/nltk_data'
 
 
-if platform.system() == "Windows":
-    # Change this path to your local tesseract installation path
-    pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-else:
-    # Linux / Docker environment path
-    pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
+# The checks below run once per process when the first analyzer is created, not at import:
+# importing this module (and so booting the app) must not wait on a subprocess or NLTK
+@lru_cache(maxsize=None)
+def report_tesseract_version():
+    """Print the installed tesseract version (once per process)"""
+    try:
+        result = subprocess.run(["tesseract", "--version"], capture_output=True, text=True)
+        print(f"[INFO] Tesseract version output:\n{result.stdout}")
+    except Exception as e:
+        print(f"[ERROR] Failed to run tesseract: {e}")
 
-# Download required NLTK data silently
-os.environ['NLTK_DATA'] = '/app/nltk_data'
 
-if os.environ.get("FLASK_ENV") == "development":
+@lru_cache(maxsize=None)
+def ensure_nltk_data():
+    """Download required NLTK data silently in development (once per process)"""
+    if os.environ.get("FLASK_ENV") != "development":
+        return
+    import nltk
     nltk_downloads = ["punkt", "stopwords", "wordnet", "omw-1.4", "averaged_perceptron_tagger"]
     for item in nltk_downloads:
         try:
@@ -46,6 +50,56 @@ if os.environ.get("FLASK_ENV") == "development":
             nltk.download(item, quiet=True)
 
 
+# OCR candidate search space
+PREPROCESSING_VARIANTS = ['adaptive', 'otsu', 'enhanced']
+PSM_MODES = [6, 8, 3, 7, 4, 11, 12]
+OCR_WHITELIST_CHARS = r'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:;?!()[]{}"-+=*/\\|@#$%^&_~ \n\t'
+
+# PDF pages rendered per batch when streaming a PDF into OCR
+PDF_RENDER_WINDOW = int(os.environ.get('PDF_RENDER_WINDOW', 4))
+
+# Render DPI for PDFs - 'auto' picks it from the text height measured on page 1
+PDF_RENDER_DPI = os.environ.get('PDF_RENDER_DPI', 'auto')
+PDF_PROBE_DPI = 72
+PDF_DPI_RANGE = (150, 400)
+
+# A PDF page needs at least this many words in its text layer to skip OCR
+TEXT_LAYER_MIN_WORDS = 10
+
+# How often each "<variant>_psm<mode>" combination produced the best page. OCR pool workers
+# report their wins back, so this covers every page OCR'd by this process or its pool.
+OCR_CANDIDATE_WINS = Counter()
+
+
+def text_from_ocr_data(data):
+    """Rebuild page text from pytesseract image_to_data output (one line per OCR line)"""
+    lines = []
+    current_key = None
+    current_words = []
+    last_block = None
+    
+    for i, word in enumerate(data['text']):
+        word = (word or '').strip()
+        if not word:
+            continue
+        key = (data['page_num'][i], data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != current_key:
+            if current_words:
+                lines.append(' '.join(current_words))
+            # Blank line between blocks, like image_to_string
+            if last_block is not None and key[:2] != last_block:
+                lines.append('')
+            current_key = key
+            last_block = key[:2]
+            current_words = []
+        current_words.append(word)
+    
+    if current_words:
+        lines.append(' '.join(current_words))
+    
+    return '\n'.join(lines)
+
+
 def convert_pdf_to_images(pdf_path, output_folder=None, dpi=300):
     import logging
     if output_folder is None:
@@ -72,15 +126,354 @@ def convert_pdf_to_images(pdf_path, output_folder=None, dpi=300):
     return image_paths
 
 
+# Pages larger than this are bilateral-filtered in horizontal strips across threads
+PREPROCESS_TILE_MIN_PIXELS = 2_000_000
+BILATERAL_DIAMETER = 9
+
+_clahe_local = threading.local()
+
+
+def get_clahe():
+    """CLAHE is stateless between calls, so build it once per thread instead of once per page"""
+    clahe = getattr(_clahe_local, 'clahe', None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        _clahe_local.clahe = clahe
+    return clahe
+
+
+def tiled_bilateral_filter(gray, threads, d=BILATERAL_DIAMETER, sigma_color=75, sigma_space=75):
+    """
+    bilateralFilter over horizontal strips in parallel (OpenCV releases the GIL).
+    Strips overlap by the filter radius, so the result matches the full-frame filter.
+    """
+    height = gray.shape[0]
+    if threads <= 1 or gray.size < PREPROCESS_TILE_MIN_PIXELS:
+        return cv2.bilateralFilter(gray, d, sigma_color, sigma_space)
+    
+    margin = d // 2 + 1
+    bounds = np.linspace(0, height, threads + 1, dtype=int)
+    output = np.empty_like(gray)
+    
+    def filter_strip(top, bottom):
+        padded_top = max(top - margin, 0)
+        padded_bottom = min(bottom + margin, height)
+        strip = cv2.bilateralFilter(gray[padded_top:padded_bottom], d, sigma_color, sigma_space)
+        output[top:bottom] = strip[top - padded_top:bottom - padded_top]
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(filter_strip, bounds[:-1], bounds[1:]))
+    return output
+
+
+class PreprocessedPage(Mapping):
+    """
+    OCR preprocessing variants of one page, built on demand.
+    
+    The shared stages (denoise -> contrast enhancement) are computed once and reused by
+    every variant, and a variant the OCR scheduler never asks for is never built.
+    """
+    
+    def __init__(self, gray, threads=1):
+        self.gray = gray
+        self.threads = threads
+        self._stages = {}
+    
+    def _stage(self, name, build):
+        if name not in self._stages:
+            self._stages[name] = build()
+        return self._stages[name]
+    
+    @property
+    def denoised(self):
+        # 1. Noise reduction
+        return self._stage('denoised', lambda: tiled_bilateral_filter(self.gray, self.threads))
+    
+    @property
+    def enhanced(self):
+        # 2. Contrast enhancement
+        return self._stage('enhanced', lambda: get_clahe().apply(self.denoised))
+    
+    def __getitem__(self, variant):
+        # 3. Thresholding approaches (the old 1x1 MORPH_CLOSE was a no-op and is gone)
+        if variant == 'adaptive':
+            return self._stage('adaptive', lambda: cv2.adaptiveThreshold(
+                self.enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2))
+        if variant == 'otsu':
+            return self._stage('otsu', lambda: cv2.threshold(
+                self.enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1])
+        if variant == 'enhanced':
+            return self.enhanced
+        raise KeyError(variant)
+    
+    def __iter__(self):
+        return iter(PREPROCESSING_VARIANTS)
+    
+    def __len__(self):
+        return len(PREPROCESSING_VARIANTS)
+
+
+# Above this share of the page, cropping to text blocks saves nothing - OCR the whole page
+REGION_MAX_COVERAGE = 0.75
+
+
+def find_text_regions(gray):
+    """
+    Find text blocks on a page with OpenCV, in reading order.
+    
+    Characters are dilated into lines and lines into blocks; each block becomes a
+    padded (x, y, w, h) crop. Returns None when the whole page should be OCR'd
+    (no measurable text height, or the blocks cover most of the page) and an
+    empty list for a blank page.
+    """
+    height, width = gray.shape
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) < 0.001 * width * height:
+        return []
+    
+    text_height = estimate_text_height(gray)
+    if not text_height:
+        return None
+    
+    kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (max(3, int(text_height * 1.5)), max(3, int(text_height * 0.8)))
+    )
+    merged = cv2.dilate(binary, kernel)
+    contours, _ = cv2.findContours(merged, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    pad = max(2, int(text_height * 0.5))
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Specks and thin rules are not text
+        if h < text_height * 0.6 or w < text_height:
+            continue
+        x0, y0 = max(x - pad, 0), max(y - pad, 0)
+        x1, y1 = min(x + w + pad, width), min(y + h + pad, height)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    
+    if not boxes:
+        return []
+    if sum(w * h for _, _, w, h in boxes) > REGION_MAX_COVERAGE * width * height:
+        return None
+    
+    # Reading order: top to bottom, blocks starting on the same line left to right
+    line_step = max(1, int(text_height * 2))
+    return sorted(boxes, key=lambda b: (b[1] // line_step, b[0]))
+
+
+def merge_ocr_data(results, regions):
+    """Merge per-crop image_to_data dicts into one page dict, keeping every crop its own block"""
+    merged = defaultdict(list)
+    for index, (data, (x, y, _, _)) in enumerate(zip(results, regions)):
+        for key, values in data.items():
+            if key == 'block_num':
+                values = [index * 1000 + value for value in values]
+            elif key == 'left':
+                values = [x + value for value in values]
+            elif key == 'top':
+                values = [y + value for value in values]
+            merged[key].extend(values)
+    return dict(merged)
+
+
+def describe_image(image):
+    """Short label for log messages - paths as-is, in-memory images by type and size"""
+    if isinstance(image, np.ndarray):
+        return f"<array {image.shape}>"
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return f"<{len(image)} bytes>"
+    return str(image)
+
+
+def as_page(item):
+    """Normalize a file path or a (filename, filepath, image) tuple into a page tuple"""
+    if isinstance(item, tuple):
+        return item
+    return os.path.basename(item), item, item
+
+
+def choose_pdf_dpi(pdf_path, target_height=TEXT_HEIGHT_TARGET):
+    """Pick a render DPI that puts the PDF's text at the OCR target height, probing page 1 at low DPI"""
+    try:
+        probe = convert_from_path(pdf_path, dpi=PDF_PROBE_DPI, first_page=1, last_page=1, grayscale=True)
+    except Exception:
+        return 300
+    if not probe:
+        return 300
+    
+    text_height = estimate_text_height(np.asarray(probe[0].convert('L')))
+    if not text_height:
+        return 300
+    
+    dpi = PDF_PROBE_DPI * target_height / text_height
+    low, high = PDF_DPI_RANGE
+    return int(round(min(max(dpi, low), high) / 10) * 10)
+
+
+def iter_pdf_pages(pdf_path, dpi=None, window=PDF_RENDER_WINDOW, prefetch=True, grayscale=True, pages=None):
+    """
+    Yield (page_number, PIL image) for a PDF, rendering `window` pages at a time.
+    Pages are rendered in grayscale by default - that is all OCR needs.
+    dpi='auto' renders at the resolution chosen by choose_pdf_dpi.
+    pages limits rendering to those 1-based page numbers (in ascending order).
+    
+    At most two windows are alive at once: the one being consumed and the next one,
+    which is rendered in a background thread while the caller OCRs the current pages.
+    """
+    if pages is None:
+        pages = range(1, pdfinfo_from_path(pdf_path)['Pages'] + 1)
+    pages = list(pages)
+    if not pages:
+        return
+    
+    if dpi == 'auto':
+        dpi = choose_pdf_dpi(pdf_path)
+    render_kwargs = {'dpi': dpi} if dpi else {}
+    render_kwargs['grayscale'] = grayscale
+    
+    # Split the pages into runs of consecutive numbers, at most `window` long
+    windows = []
+    for page_number in pages:
+        if windows and page_number == windows[-1][-1] + 1 and len(windows[-1]) < window:
+            windows[-1].append(page_number)
+        else:
+            windows.append([page_number])
+    
+    def render(page_numbers):
+        images = convert_from_path(pdf_path, first_page=page_numbers[0], last_page=page_numbers[-1], **render_kwargs)
+        return list(zip(page_numbers, images))
+    
+    window_iter = iter(windows)
+    
+    if not prefetch:
+        for page_numbers in window_iter:
+            yield from render(page_numbers)
+        return
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = deque()
+        pending.append(executor.submit(render, next(window_iter)))
+        while pending:
+            rendered = pending.popleft().result()
+            next_window = next(window_iter, None)
+            if next_window is not None:
+                pending.append(executor.submit(render, next_window))
+            for page_number, image in rendered:
+                yield page_number, image
+            del rendered
+
+
+class PageText(str):
+    """Page text taken from a PDF's own text layer - used as-is instead of OCR"""
+
+
+def has_text_layer(text):
+    """True when extracted PDF text looks like real text, not empty or garbage glyph codes"""
+    if not text:
+        return False
+    words = text.split()
+    if len(words) < TEXT_LAYER_MIN_WORDS:
+        return False
+    visible = [c for c in text if not c.isspace()]
+    alnum = sum(1 for c in visible if c.isalnum())
+    return alnum / len(visible) >= 0.6
+
+
+def iter_pdf_page_sources(pdf_path, dpi=None, window=PDF_RENDER_WINDOW):
+    """
+    Yield (page_number, text, image) for every page of a PDF, in page order.
+    
+    Born-digital pages come from the PDF text layer (image is None); only the
+    pages without usable text are rasterized, streamed through iter_pdf_pages.
+    """
+    try:
+        reader = PyPDF2.PdfReader(pdf_path)
+        page_texts = []
+        for page in reader.pages:
+            try:
+                page_texts.append(page.extract_text() or "")
+            except Exception:
+                page_texts.append("")
+    except Exception:
+        # Unreadable/encrypted text layer - OCR everything
+        page_texts = [""] * pdfinfo_from_path(pdf_path)['Pages']
+    
+    scanned_pages = [i for i, text in enumerate(page_texts, 1) if not has_text_layer(text)]
+    rendered = iter_pdf_pages(pdf_path, dpi=dpi, window=window, pages=scanned_pages)
+    
+    for page_number, text in enumerate(page_texts, 1):
+        if has_text_layer(text):
+            yield page_number, PageText(text.strip()), None
+        else:
+            rendered_number, image = next(rendered)
+            yield rendered_number, None, image
+
+
+def iter_input_pages(input_files, verbose=False):
+    """
+    Yield (filename, filepath, source) pages. source is a PageText for PDF pages with a
+    text layer, otherwise an image streamed straight from the renderer (or the image path).
+    """
+    for file_path in input_files:
+        if Path(file_path).suffix.lower() != '.pdf':
+            yield as_page(file_path)
+            continue
+        
+        if verbose:
+            print(f"Converting PDF: {file_path}")
+        try:
+            dpi = PDF_RENDER_DPI if PDF_RENDER_DPI == 'auto' else int(PDF_RENDER_DPI)
+            for page_number, text, img in iter_pdf_page_sources(file_path, dpi=dpi):
+                source = text if text is not None else load_grayscale(img)
+                yield f"{Path(file_path).stem}_page_{page_number - 1}.png", file_path, source
+        except Exception as e:
+            if verbose:
+                print(f"Failed to convert {file_path}: {e}")
+
+
 class EnhancedTopicRepetitionAnalyzer:
-    def __init__(self, output_dir="repetition_analysis", use_lemmatization=True, verbose=False):
+    def __init__(self, output_dir="repetition_analysis", use_lemmatization=True, verbose=False,
+                 ocr_target_confidence=80, ocr_target_words=25, ocr_workers=None, preprocess_threads=None,
+                 corpus=None, user_id=None):
         self.output_dir = output_dir
         self.extracted_texts = []
         self.processed_files = []
-        self.stop_words = set(stopwords.words('english'))
+        # Per-document topic index: each accepted record keeps its topic list in record['topics'],
+        # extracted once; these are the document counts and sources aggregated from those lists
+        self.topic_freq = Counter()
+        self.topic_sources = defaultdict(list)
+        
+        # Persistent per-user corpus (CorpusStore): previously added papers are loaded as metadata
+        # plus their stored topic sets (not their texts), so only new pages are OCR'd and topic-extracted
+        self.corpus = corpus
+        self.user_id = user_id
+        if corpus is not None:
+            self.extracted_texts = corpus.documents(user_id)
+            self.topic_freq = corpus.topic_frequency(user_id)
+            self.topic_sources = corpus.topic_sources(user_id, self.extracted_texts)
+        report_tesseract_version()
+        ensure_nltk_data()
+        self.stop_words = get_stop_words()
         self.use_lemmatization = use_lemmatization
         self.verbose = verbose  # Control logging level
         
+        # OCR early-exit targets: stop searching once a candidate reaches both
+        self.ocr_target_confidence = ocr_target_confidence
+        self.ocr_target_words = ocr_target_words
+        
+        # Number of OCR worker processes (1 = sequential)
+        if ocr_workers is None:
+            ocr_workers = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 1))
+        self.ocr_workers = max(1, ocr_workers)
+        
+        # Threads used inside a single page (tiled preprocessing, parallel OCR of text regions)
+        if preprocess_threads is None:
+            preprocess_threads = int(os.environ.get('PREPROCESS_THREADS', min(4, os.cpu_count() or 1)))
+        self.preprocess_threads = max(1, preprocess_threads)
+        # Thread pool for OCR of a page's text regions - created on first use, stopped by close()
+        self._region_executor = None
+        
         # Enhanced stopwords for academic content
         self.academic_stopwords = {
             'related to computer science', 'computer science and information technology',
@@ -90,6 +483,7 @@ class EnhancedTopicRepetitionAnalyzer:
             'section', 'part', 'what is', 'define', 'list', 'write short note',
             'write note', 'short note', 'give', 'state', 'mention', 'discuss'
         }
+        self.phrase_cleaner = PhraseCleaner(self.academic_stopwords)
         
         # Expanded academic topic keywords for CSIT/Statistics
         self.academic_keywords = {
@@ -111,8 +505,11 @@ class EnhancedTopicRepetitionAnalyzer:
             'big o', 'dynamic programming', 'greedy', 'divide conquer'
         }
         
-        if self.use_lemmatization:
-            self.lemmatizer = WordNetLemmatizer()
+        # Candidate scanner shared by every analyzer with this keyword set: one tokenizer pass
+        # per text produces all four candidate families. Its Aho-Corasick automaton also
+        # serves the keyword checks in the summaries.
+        self.candidate_scanner = get_topic_scanner(frozenset(self.academic_keywords))
+        self.keyword_matcher = self.candidate_scanner.keyword_matcher
         
         # Create output directories (removed debug_images and visualizations)
         os.makedirs(output_dir, exist_ok=True)
@@ -122,100 +519,156 @@ class EnhancedTopicRepetitionAnalyzer:
         if self.verbose:
             print(f"Enhanced analysis output directory: {output_dir}")
 
+    def load_image(self, image_path):
+        """Load a page as a grayscale array from a path, encoded bytes, PIL image or NumPy array"""
+        gray = load_grayscale(image_path)
+        if gray is None:
+            print(f"[ERROR] cv2 failed to load image: {describe_image(image_path)}")
+        elif self.verbose:
+            print(f"[INFO] Image loaded successfully: {describe_image(image_path)}")
+            print(f"[INFO] Image shape: {gray.shape}")
+        return gray
+
     def enhance_image_for_ocr(self, image_path):
-        """Enhanced OCR preprocessing without debug image saving"""
-        img = cv2.imread(image_path)
-        if img is None:
-            print(f"[ERROR] cv2 failed to load image: {image_path}")
-        else:
-            print(f"[INFO] Image loaded successfully: {image_path}")
-            print(f"[INFO] Image shape: {img.shape}")
-        
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Auto-resize for better OCR
-        height, width = gray.shape
-        if height < 800 or width < 600:
-            scale_factor = max(800/height, 600/width, 1.5)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-        
-        # Advanced preprocessing pipeline
-        # 1. Noise reduction
-        denoised = cv2.bilateralFilter(gray, 9, 75, 75)
-        
-        # 2. Contrast enhancement
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(denoised)
+        """
+        Enhanced OCR preprocessing without debug image saving - accepts any load_image input.
+        Returns a lazy mapping of variant name -> image; variants are only built when accessed.
+        """
+        gray = self.load_image(image_path)
         
-        # 3. Multiple thresholding approaches
-        thresh_adaptive = cv2.adaptiveThreshold(enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-        _, thresh_otsu = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # Rescale so the text is the height tesseract reads best (shrinks big photos/renders)
+        gray = normalize_resolution(gray)
         
-        # 4. Morphological operations for text enhancement
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1,1))
-        processed_adaptive = cv2.morphologyEx(thresh_adaptive, cv2.MORPH_CLOSE, kernel)
-        processed_otsu = cv2.morphologyEx(thresh_otsu, cv2.MORPH_CLOSE, kernel)
+        return PreprocessedPage(gray, threads=self.preprocess_threads)
+
+    def ocr_candidates(self):
+        """Return (variant, psm) pairs, historically best-scoring combinations first"""
+        default_order = [
+            (method_name, psm)
+            for method_name in PREPROCESSING_VARIANTS
+            for psm in PSM_MODES
+        ]
+        # sorted() is stable, so untried combinations keep the default priority order
+        return sorted(default_order, key=lambda c: -OCR_CANDIDATE_WINS[f"{c[0]}_psm{c[1]}"])
+
+    def region_executor(self):
+        """
+        Thread pool that OCRs the text regions of a page in parallel, or None for one thread.
+        Its threads - and so their resident Tesseract engines - serve every page until close().
+        """
+        if self.preprocess_threads <= 1:
+            return None
+        if self._region_executor is None:
+            self._region_executor = ThreadPoolExecutor(max_workers=self.preprocess_threads,
+                                                       thread_name_prefix='ocr-region')
+        return self._region_executor
+
+    def close(self):
+        """Stop the region OCR threads (a later page starts them again)"""
+        if self._region_executor is not None:
+            self._region_executor.shutdown(wait=True)
+            self._region_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ocr_regions(self, image, psm, regions, executor=None):
+        """OCR the given crops of a page (the whole page when regions is None) and merge the results"""
+        engine = get_engine()
+        if regions is None:
+            return engine.image_to_data(image, psm=psm, whitelist=OCR_WHITELIST_CHARS)
         
-        methods = {
-            'adaptive': processed_adaptive,
-            'otsu': processed_otsu,
-            'enhanced': enhanced  # Also try the enhanced grayscale
-        }
+        def ocr_crop(box):
+            x, y, w, h = box
+            # get_engine() is per thread, so each crop worker has its own resident engine
+            return get_engine().image_to_data(image[y:y+h, x:x+w], psm=psm, whitelist=OCR_WHITELIST_CHARS)
         
-        return methods
+        if executor is not None:
+            results = list(executor.map(ocr_crop, regions))
+        else:
+            results = [ocr_crop(box) for box in regions]
+        return merge_ocr_data(results, regions)
 
     def extract_text_from_image(self, image_path):
-        """Improved text extraction with better confidence scoring - no debug saving"""
+        """Adaptive OCR candidate search - stops once the quality targets are met"""
         try:
-            processed_methods = self.enhance_image_for_ocr(image_path)
+            gray = self.load_image(image_path)
+            
+            # Same pixels + same search parameters = same result, skip tesseract entirely
+            cache = get_ocr_cache()
+            cache_key = None
+            if cache is not None:
+                cache_key = make_cache_key(
+                    gray,
+                    variants=PREPROCESSING_VARIANTS,
+                    psm_modes=PSM_MODES,
+                    whitelist=OCR_WHITELIST_CHARS,
+                    target_confidence=self.ocr_target_confidence,
+                    target_words=self.ocr_target_words,
+                    text_height=TEXT_HEIGHT_TARGET,
+                    layout=True
+                )
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            processed_methods = self.enhance_image_for_ocr(gray)
+            
+            # Only OCR the text blocks: margins, blank answer space and rules are skipped
+            regions = find_text_regions(processed_methods.gray)
+            if regions == []:
+                return "", 0, ""
             
             best_text = ""
             best_confidence = 0
             best_method = ""
+            executor = self.region_executor() if regions else None
             
-            for method_name, processed in processed_methods.items():
-                pil_img = Image.fromarray(processed)
-                
-                # Try different PSM modes with priority order
-                psm_modes = [6, 8, 3, 7, 4, 11, 12]
-                
-                for psm in psm_modes:
-                    try:
-                        whitelist_chars = r'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:;?!()[]{}"-+=*/\\|@#$%^&_~ \n\t'
-                        config = f'--oem 3 --psm {psm} -c tessedit_char_whitelist="{whitelist_chars}"'
-
+            for method_name, psm in self.ocr_candidates():
+                try:
+                    # A single OCR run gives both the confidences and the text
+                    data = self.ocr_regions(processed_methods[method_name], psm, regions, executor)
+                    
+                    # Calculate confidence more accurately
+                    valid_confidences = [int(float(conf)) for conf in data['conf'] if int(float(conf)) > 30]
+                    
+                    if valid_confidences and len(valid_confidences) > 3:
+                        avg_confidence = sum(valid_confidences) / len(valid_confidences)
+                        text = text_from_ocr_data(data)
+                        if self.verbose:
+                            print(f"[DEBUG] OCR raw output (first 200 chars): {text[:200]!r}")
                         
-                        # Get detailed OCR data
-                        data = pytesseract.image_to_data(pil_img, config=config, output_type=pytesseract.Output.DICT)
+                        # Quality scoring: length * confidence * word ratio
+                        word_count = len([w for w in text.split() if len(w) > 1])
+                        quality_score = word_count * (avg_confidence / 100) * min(word_count / 20, 1.0)
+                        current_score = len(best_text.split()) * (best_confidence / 100)
                         
-                        # Calculate confidence more accurately
-                        valid_confidences = [int(conf) for conf in data['conf'] if int(conf) > 30]
+                        if quality_score > current_score and len(text.strip()) > 15:
+                            best_confidence = avg_confidence
+                            best_text = text
+                            best_method = f"{method_name}_psm{psm}"
                         
-                        if valid_confidences and len(valid_confidences) > 3:
-                            avg_confidence = sum(valid_confidences) / len(valid_confidences)
-                            text = pytesseract.image_to_string(pil_img, config=config).strip()
-                            print(f"[DEBUG] OCR raw output (first 200 chars): {text[:200]!r}")
-
-                            
-                            # Quality scoring: length * confidence * word ratio
-                            word_count = len([w for w in text.split() if len(w) > 1])
-                            quality_score = word_count * (avg_confidence / 100) * min(word_count / 20, 1.0)
-                            current_score = len(best_text.split()) * (best_confidence / 100)
-                            
-                            if quality_score > current_score and len(text.strip()) > 15:
-                                best_confidence = avg_confidence
-                                best_text = text
-                                best_method = f"{method_name}_psm{psm}"
-                    except Exception as e:
-                        continue
+                        # Early exit: good enough, no need to try the remaining combinations
+                        if (best_confidence >= self.ocr_target_confidence
+                                and len(best_text.split()) >= self.ocr_target_words):
+                            break
+                except Exception as e:
+                    continue
+            
+            # Nothing is cached when every candidate failed: the next upload of this page tries again
+            if best_method:
+                OCR_CANDIDATE_WINS[best_method] += 1
+                if cache is not None:
+                    cache.put(cache_key, best_text, best_confidence, best_method)
             
             return best_text, best_confidence, best_method
             
         except Exception as e:
             if self.verbose:
-                print(f"Error extracting from {image_path}: {e}")
+                print(f"Error extracting from {describe_image(image_path)}: {e}")
             return "", 0, "failed"
 
     def extract_date_from_filename(self, filename):
@@ -248,38 +701,102 @@ class EnhancedTopicRepetitionAnalyzer:
         
         return datetime.now()
 
-    def process_multiple_files(self, file_paths):
-        """Enhanced file processing with better error handling - no debug mode"""
-        if self.verbose:
+    def iter_ocr_results(self, pages, workers=None):
+        """Yield (page, (text, confidence, method)) in input order, OCR'ing pages in parallel"""
+        pool_size = workers or self.ocr_workers
+        in_flight = pool_size
+        if hasattr(pages, '__len__'):
+            in_flight = min(in_flight, len(pages))
+        pages = (as_page(item) for item in pages)
+
+        if in_flight <= 1:
+            for page in pages:
+                if isinstance(page[2], PageText):
+                    yield page, (str(page[2]), 100.0, "text_layer")
+                else:
+                    yield page, self.extract_text_from_image(page[2])
+            return
+
+        # The pool outlives this call: its workers keep their analyzer and Tesseract engines
+        pool_settings = (pool_size, self.output_dir, self.ocr_target_confidence, self.ocr_target_words)
+
+        # Keep a bounded number of pages in flight so results stream back in order
+        # and a long PDF never has more than a few rendered pages in memory
+        pending = deque()
+        for page in pages:
+            if isinstance(page[2], PageText):
+                pending.append((page, (str(page[2]), 100.0, "text_layer")))
+            else:
+                pending.append((page, submit_ocr_page(pool_settings, page[2])))
+            if len(pending) >= in_flight * 2:
+                yield self._collect_ocr_result(pool_settings, *pending.popleft())
+        while pending:
+            yield self._collect_ocr_result(pool_settings, *pending.popleft())
+
+    def _collect_ocr_result(self, pool_settings, page, future):
+        # A failing page (or crashed worker) must not take the rest of the upload down
+        if not isinstance(future, Future):
+            return page, future
+        try:
+            try:
+                result, candidate_wins = future.result()
+            except BrokenProcessPool:
+                # A dead worker fails every page in flight, not just the one that killed it.
+                # Retry the page once on a fresh pool: only a page that breaks it again fails.
+                result, candidate_wins = submit_ocr_page(pool_settings, page[2]).result()
+        except Exception as e:
+            if self.verbose:
+                print(f"Error extracting from {page[0]}: {e}")
+            return page, ("", 0, "failed")
+        # The worker's winning candidate joins this process's history, which orders the next pages
+        OCR_CANDIDATE_WINS.update(candidate_wins)
+        return page, result
+
+    def process_multiple_files(self, file_paths, workers=None, on_page=None):
+        """
+        Enhanced file processing with better error handling - pages are OCR'd in parallel.
+        file_paths may be a list or a lazy iterable of paths or (filename, filepath, image) pages.
+        on_page, if given, is called with a summary dict as each page finishes.
+        """
+        if self.verbose and hasattr(file_paths, '__len__'):
             print(f"Processing {len(file_paths)} files...")
         
         successful_extractions = 0
         
-        for i, file_path in enumerate(file_paths, 1):
+        for i, ((filename, file_path, _), (text, confidence, method)) in enumerate(self.iter_ocr_results(file_paths, workers), 1):
+            self.processed_files.append(filename)
             if self.verbose:
-                print(f"Processing file {i}/{len(file_paths)}: {os.path.basename(file_path)}")
-            
-            text, confidence, method = self.extract_text_from_image(file_path)
+                print(f"Processed file {i}: {filename}")
             
-            if text.strip() and len(text.split()) >= 10:  # Minimum word requirement
-                extracted_date = self.extract_date_from_filename(os.path.basename(file_path))
+            accepted = bool(text.strip()) and len(text.split()) >= 10  # Minimum word requirement
+            if accepted:
+                extracted_date = self.extract_date_from_filename(filename)
                 
                 file_data = {
-                    'filename': os.path.basename(file_path),
+                    'filename': filename,
                     'filepath': file_path,
                     'text': text,
                     'confidence': confidence,
                     'method': method,
+                    'source': 'text_layer' if method == 'text_layer' else 'ocr',
                     'date': extracted_date.strftime('%Y-%m-%d'),
                     'word_count': len(text.split()),
                     'char_count': len(text)
                 }
                 
+                if self.corpus is not None:
+                    file_data['topics'] = self.extract_academic_topics(text)
+                    file_data['doc_id'] = self.corpus.add_document(self.user_id, file_data, file_data['topics'])
+                    if file_data['doc_id'] is None:
+                        # Same text is already in the corpus - keep the stored copy
+                        accepted = False
+                
+            if accepted:
                 self.extracted_texts.append(file_data)
                 successful_extractions += 1
                 
                 # Save individual text file
-                safe_filename = re.sub(r'[^\w\-_.]', '_', os.path.basename(file_path))
+                safe_filename = re.sub(r'[^\w\-_.]', '_', filename)
                 text_filename = f"{self.output_dir}/extracted_texts/{safe_filename}.txt"
                 
                 with open(text_filename, 'w', encoding='utf-8') as f:
@@ -292,78 +809,66 @@ class EnhancedTopicRepetitionAnalyzer:
                 
                 if self.verbose:
                     print(f"   Extracted {len(text.split())} words (confidence: {confidence:.1f}%)")
+                
+                self.track_document_topics(file_data)
+            
+            if on_page is not None:
+                on_page({
+                    'page': i,
+                    'filename': filename,
+                    'confidence': confidence,
+                    'word_count': len(text.split()),
+                    'source': 'text_layer' if method == 'text_layer' else 'ocr',
+                    'accepted': accepted
+                })
         
         if self.verbose:
-            print(f"Successfully processed {successful_extractions}/{len(file_paths)} files")
+            print(f"Successfully processed {successful_extractions}/{len(self.processed_files)} files")
         
         return self.extracted_texts
 
-    def normalize_phrase(self, phrase):
-        """Normalize phrases for better matching"""
-        # Convert to lowercase and split into words
-        words = phrase.lower().split()
-        
-        # Remove common stop words
-        filtered_words = [w for w in words if w not in self.stop_words and len(w) > 2]
-        
-        # Sort words to handle different orderings (e.g., "sampling distribution" vs "distribution sampling")
-        if len(filtered_words) <= 3:  # Only sort for short phrases
-            filtered_words.sort()
-        
-        # Apply lemmatization if enabled
-        if self.use_lemmatization and filtered_words:
-            try:
-                filtered_words = [self.lemmatizer.lemmatize(word) for word in filtered_words]
-            except:
-                pass
+    def add_documents(self, file_paths, workers=None, on_page=None):
+        """
+        Add new papers to the attached corpus.
+        Only the given pages are OCR'd and topic-extracted; stored documents are left untouched
+        and the corpus topic counts are updated in place.
+        """
+        if self.corpus is None:
+            raise ValueError("add_documents needs an analyzer created with a corpus")
+        return self.process_multiple_files(file_paths, workers=workers, on_page=on_page)
+
+    def remove_document(self, doc_id):
+        """Remove a paper from the attached corpus and subtract its topics from the running counts"""
+        if self.corpus is None:
+            raise ValueError("remove_document needs an analyzer created with a corpus")
+        if not self.corpus.remove_document(self.user_id, doc_id):
+            return False
         
-        return ' '.join(filtered_words)
+        removed = [data for data in self.extracted_texts if data.get('doc_id') == doc_id]
+        self.extracted_texts = [data for data in self.extracted_texts if data.get('doc_id') != doc_id]
+        for data in removed:
+            self.topic_freq.subtract(data['topics'])
+            for topic in data['topics']:
+                # By document, not filename: two stored papers can share a filename
+                self.topic_sources[topic] = [
+                    source for source in self.topic_sources[topic] if source['doc_id'] != doc_id
+                ]
+                if not self.topic_sources[topic]:
+                    del self.topic_sources[topic]
+        self.topic_freq += Counter()  # drop topics whose count reached zero
+        return True
+
+    def normalize_phrase(self, phrase):
+        """Normalize phrases for better matching (memoized process-wide, see normalize_topic_phrase)"""
+        return normalize_topic_phrase(phrase, self.stop_words, self.use_lemmatization)
 
     def clean_topic_phrase(self, phrase):
         """Enhanced phrase cleaning to remove question numbers and noise"""
-        # Remove leading/trailing whitespace
-        phrase = phrase.strip()
-        
-        # Skip if it's just a number or too short
-        if re.match(r'^\d+$', phrase) or len(phrase) < 3:
-            return None
-            
-        # Remove question number patterns at the start
-        phrase = re.sub(r'^\d+\.?\s*', '', phrase)  # "1. " or "1 "
-        phrase = re.sub(r'^Q\d+\.?\s*', '', phrase, flags=re.IGNORECASE)  # "Q1. "
-        phrase = re.sub(r'^Question\s*\d+\.?\s*', '', phrase, flags=re.IGNORECASE)  # "Question 1: "
-        phrase = re.sub(r'^\d+\s*[\)\]\}]\s*', '', phrase)  # "1) " or "1] "
-        phrase = re.sub(r'^[a-z]\)\s*', '', phrase, flags=re.IGNORECASE)  # "a) "
-        
-        # Remove common prefixes and suffixes
-        prefixes_to_remove = [
-            r'^what\s+is\s+', r'^define\s+', r'^explain\s+', r'^describe\s+',
-            r'^write\s+short\s+note\s+on\s+', r'^discuss\s+', r'^list\s+',
-            r'^briefly\s+explain\s+', r'^give\s+', r'^state\s+', r'^mention\s+',
-            r'^how\s+', r'^why\s+', r'^when\s+', r'^where\s+'
-        ]
-        
-        for prefix in prefixes_to_remove:
-            phrase = re.sub(prefix, '', phrase, flags=re.IGNORECASE)
-        
-        # Remove trailing marks/points references
-        phrase = re.sub(r'\s*\(\d+\s*marks?\)', '', phrase, flags=re.IGNORECASE)
-        phrase = re.sub(r'\s*\[\d+\s*marks?\]', '', phrase, flags=re.IGNORECASE)
-        phrase = re.sub(r'\s*\d+\s*marks?$', '', phrase, flags=re.IGNORECASE)
-        
-        # Clean up whitespace and punctuation
-        phrase = re.sub(r'[^\w\s-]', ' ', phrase)  # Replace punctuation with spaces
-        phrase = ' '.join(phrase.split())  # Normalize whitespace
-        
-        # Skip if too short after cleaning
-        if len(phrase.split()) < 2:
-            return None
-            
-        # Skip if it's just common academic boilerplate
-        if phrase.lower() in self.academic_stopwords:
-            return None
-        
-        return phrase
+        return self.phrase_cleaner.clean(phrase)
+
+    def clean_topic_phrases(self, phrases):
+        """Clean a batch of candidate phrases - returns clean_topic_phrase(p) for each, in order"""
+        return self.phrase_cleaner.clean_batch(phrases)
 
     def extract_academic_topics(self, text):
         """Enhanced topic extraction with better patterns and normalization"""
@@ -373,59 +878,15 @@ class EnhancedTopicRepetitionAnalyzer:
         
         topics = set()  # Use set to avoid duplicates
         
-        # Pattern 1: Extract n-grams (2-4 words) that contain academic keywords
-        words = text.lower().split()
-        for i in range(len(words)):
-            # Extract 2-grams, 3-grams, and 4-grams
-            for n in [2, 3, 4]:
-                if i + n <= len(words):
-                    ngram = ' '.join(words[i:i+n])
-                    
-                    # Check if n-gram contains academic keywords
-                    if any(keyword in ngram for keyword in self.academic_keywords):
-                        cleaned = self.clean_topic_phrase(ngram)
-                        if cleaned:
-                            normalized = self.normalize_phrase(cleaned)
-                            if normalized and len(normalized.split()) >= 2:
-                                topics.add(normalized)
-        
-        # Pattern 2: Extract capitalized phrases (likely proper nouns/concepts)
-        capitalized_patterns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        for pattern in capitalized_patterns:
-            if len(pattern.split()) >= 2:  # At least 2 words
-                cleaned = self.clean_topic_phrase(pattern)
-                if cleaned:
-                    normalized = self.normalize_phrase(cleaned)
-                    if normalized and len(normalized.split()) >= 2:
-                        topics.add(normalized)
-        
-        # Pattern 3: Statistical/Mathematical terms with common suffixes
-        stat_patterns = re.findall(
-            r'\b(?:test|analysis|method|distribution|design|model|algorithm|theory|principle|technique|approach|procedure)\b[^.]*?(?:[.!?]|$)', 
-            text, re.IGNORECASE
-        )
-        for pattern in stat_patterns:
-            # Take first 5 words max to avoid overly long phrases
-            words_in_pattern = pattern.strip('.,!?').split()[:5]
-            if len(words_in_pattern) >= 2:
-                cleaned = self.clean_topic_phrase(' '.join(words_in_pattern))
-                if cleaned:
-                    normalized = self.normalize_phrase(cleaned)
-                    if normalized and len(normalized.split()) >= 2:
-                        topics.add(normalized)
-        
-        # Pattern 4: Direct keyword matching with context
-        for keyword in self.academic_keywords:
-            if keyword in text.lower():
-                # Find occurrences and extract surrounding context
-                pattern = r'\b\w*\s*' + re.escape(keyword) + r'\s*\w*\b'
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    cleaned = self.clean_topic_phrase(match)
-                    if cleaned:
-                        normalized = self.normalize_phrase(cleaned)
-                        if normalized and len(normalized.split()) >= 2:
-                            topics.add(normalized)
+        # Raw candidates from all four patterns (keyword n-grams, capitalized phrases,
+        # statistical terms, keyword context) in one scan, cleaned together in one batch
+        candidates = self.candidate_scanner.scan(text)
+        
+        for cleaned in set(self.clean_topic_phrases(candidates)):
+            if cleaned:
+                normalized = self.normalize_phrase(cleaned)
+                if normalized and len(normalized.split()) >= 2:
+                    topics.add(normalized)
         
         return list(topics)
 
@@ -437,37 +898,26 @@ class EnhancedTopicRepetitionAnalyzer:
         if self.verbose:
             print("Analyzing enhanced topic frequency patterns...")
         
-        all_topics = []
-        topic_sources = defaultdict(list)
-        
-        # Extract topics from each document
-        for data in self.extracted_texts:
-            topics = self.extract_academic_topics(data['text'])
-            if self.verbose:
-                print(f"   {data['filename']}: Found {len(topics)} topics")
-            
-            all_topics.extend(topics)
-            
-            for topic in topics:
-                topic_sources[topic].append({
-                    'filename': data['filename'],
-                    'date': data['date']
-                })
+        # Topics come from the per-document index - nothing is re-extracted here
+        self.ensure_topic_index()
         
         if self.verbose:
-            print(f"   Total topics extracted: {len(all_topics)}")
-            print(f"   Unique topics: {len(set(all_topics))}")
-        
-        # Count topic frequencies
-        topic_freq = Counter(all_topics)
+            print(f"   Total topics extracted: {sum(self.topic_freq.values())}")
+            print(f"   Unique topics: {len(self.topic_freq)}")
         
+        # Copy the source lists so the returned analysis does not change as documents are added later
+        topic_sources = {topic: list(sources) for topic, sources in self.topic_sources.items()}
+        return self.summarize_topic_frequency(+self.topic_freq, topic_sources, len(self.extracted_texts))
+
+    def summarize_topic_frequency(self, topic_freq, topic_sources, total_documents):
+        """Apply the repetition thresholds and coverage stats to topic counts and their sources"""
         # LOWERED THRESHOLD: Include topics that appear even once but in academic context
         # OR appear multiple times
         repeated_topics = {}
         for topic, freq in topic_freq.items():
             if freq >= 2:  # Traditional repeated topics
                 repeated_topics[topic] = freq
-            elif freq == 1 and any(keyword in topic.lower() for keyword in self.academic_keywords):
+            elif freq == 1 and self.keyword_matcher.search(topic.lower()):
                 # Include single-occurrence academic topics
                 repeated_topics[topic] = freq
         
@@ -478,7 +928,7 @@ class EnhancedTopicRepetitionAnalyzer:
         topic_coverage = {}
         for topic, freq in repeated_topics.items():
             unique_docs = len(set(source['filename'] for source in topic_sources[topic]))
-            coverage_percentage = (unique_docs / len(self.extracted_texts)) * 100
+            coverage_percentage = (unique_docs / total_documents) * 100
             topic_coverage[topic] = {
                 'frequency': freq,
                 'document_count': unique_docs,
@@ -493,12 +943,43 @@ class EnhancedTopicRepetitionAnalyzer:
         
         return {
             'repeated_topics': sorted_topics,
-            'total_unique_topics': len(set(all_topics)),
-            'total_documents': len(self.extracted_texts),
+            'total_unique_topics': len(topic_freq),
+            'total_documents': total_documents,
             'topic_sources': dict(topic_sources),
-            'all_topics_list': list(set(all_topics))  # Add this for fallback recommendations
+            'all_topics_list': list(topic_freq)  # Add this for fallback recommendations
         }
 
+    def track_document_topics(self, data):
+        """Add one document to the topic index, extracting its topics unless the record already has them"""
+        if 'topics' not in data:
+            data['topics'] = self.extract_academic_topics(data['text'])
+        topics = data['topics']
+        if self.verbose:
+            print(f"   {data['filename']}: Found {len(topics)} topics")
+        self.topic_freq.update(topics)
+        for topic in topics:
+            self.topic_sources[topic].append({
+                'doc_id': data.get('doc_id'),
+                'filename': data['filename'],
+                'date': data['date']
+            })
+        return topics
+
+    def ensure_topic_index(self):
+        """Index any extracted_texts records that were added without going through process_multiple_files"""
+        for data in self.extracted_texts:
+            if 'topics' not in data:
+                self.track_document_topics(data)
+
+    def provisional_predictions(self, top_n=10):
+        """Top-N predictions from the documents processed so far"""
+        if not self.extracted_texts:
+            return []
+        topic_analysis = self.summarize_topic_frequency(
+            self.topic_freq, self.topic_sources, len(self.extracted_texts)
+        )
+        return self.calculate_enhanced_predictions(topic_analysis)[:top_n]
+
     def calculate_enhanced_predictions(self, topic_analysis):
         """Enhanced prediction system with ADJUSTED likelihood calculation"""
         if not topic_analysis or not topic_analysis['repeated_topics']:
@@ -532,7 +1013,7 @@ class EnhancedTopicRepetitionAnalyzer:
             consistency_score = frequency / doc_count if doc_count > 0 else 0
             
             # Check if it's an important academic topic
-            academic_bonus = 0.2 if any(keyword in topic.lower() for keyword in self.academic_keywords) else 0
+            academic_bonus = 0.2 if self.keyword_matcher.search(topic.lower()) else 0
             
             # Weighted likelihood score with academic bonus
             likelihood_score = (frequency_score * 0.4) + (spread_score * 0.4) + (consistency_score * 0.2) + academic_bonus
@@ -568,13 +1049,10 @@ class EnhancedTopicRepetitionAnalyzer:
             return []
         
         heat_index = []
-        all_topic_counts = Counter()
         
-        # Count all topics (including single occurrences)
-        for data in self.extracted_texts:
-            topics = self.extract_academic_topics(data['text'])
-            for topic in topics:
-                all_topic_counts[topic] += 1
+        # Count all topics (including single occurrences) - read from the topic index
+        self.ensure_topic_index()
+        all_topic_counts = self.topic_freq
         
         # Create heat index
         for topic, count in all_topic_counts.most_common(15):  # Top 15
@@ -777,23 +1255,17 @@ class EnhancedTopicRepetitionAnalyzer:
         if self.verbose:
             print("Finding semantic topic groups...")
         
-        # Extract all academic topics
-        all_topics = []
-        topic_sources = []
-        
-        for data in self.extracted_texts:
-            topics = self.extract_academic_topics(data['text'])
-            for topic in topics:
-                all_topics.append(topic)
-                topic_sources.append({
-                    'topic': topic,
-                    'filename': data['filename'],
-                    'date': data['date']
-                })
+        # Each distinct topic is grouped once; its document sources come from the topic index
+        self.ensure_topic_index()
+        all_topics = [topic for topic, count in self.topic_freq.items() if count > 0]
         
         if len(all_topics) < 2:
             return []
         
+        # scikit-learn and SciPy take over a second to import - only pay for it when grouping
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from scipy import sparse
+        
         try:
             # Use TF-IDF for semantic similarity
             vectorizer = TfidfVectorizer(
@@ -804,40 +1276,50 @@ class EnhancedTopicRepetitionAnalyzer:
             )
             
             tfidf_matrix = vectorizer.fit_transform(all_topics)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
             
-            # Find semantic groups
+            # Rows are L2-normalized, so this sparse product is the cosine similarity - and only
+            # pairs sharing a term are ever stored. Keep pairs (i, j > i) above the threshold.
+            similarity = sparse.triu(tfidf_matrix @ tfidf_matrix.T, k=1).tocsr()
+            similarity.data[similarity.data <= similarity_threshold] = 0
+            similarity.eliminate_zeros()
+            similarity.sort_indices()
+            
+            # Find semantic groups: each unassigned topic, in first-seen order, takes all its
+            # unassigned later neighbours
             semantic_groups = []
-            processed_indices = set()
+            assigned = np.zeros(len(all_topics), dtype=bool)
             
-            for i in range(len(all_topics)):
-                if i in processed_indices:
+            for i in np.flatnonzero(np.diff(similarity.indptr)):
+                if assigned[i]:
                     continue
                 
-                similar_indices = [i]
-                for j in range(i + 1, len(all_topics)):
-                    if j in processed_indices:
-                        continue
-                    
-                    if similarity_matrix[i][j] > similarity_threshold:
-                        similar_indices.append(j)
+                row = slice(similarity.indptr[i], similarity.indptr[i + 1])
+                neighbours = similarity.indices[row]
+                scores = similarity.data[row]
+                free = ~assigned[neighbours]
+                if not free.any():
+                    continue
                 
-                if len(similar_indices) > 1:  # Group has multiple topics
-                    processed_indices.update(similar_indices)
-                    
-                    group = {
-                        'group_size': len(similar_indices),
-                        'avg_similarity': np.mean([similarity_matrix[i][j] for j in similar_indices[1:]]),
-                        'topics': []
-                    }
-                    
-                    for idx in similar_indices:
-                        group['topics'].append({
-                            'topic': all_topics[idx],
-                            'source': topic_sources[idx]
-                        })
-                    
-                    semantic_groups.append(group)
+                members = neighbours[free]
+                assigned[i] = True
+                assigned[members] = True
+                
+                group = {
+                    'group_size': len(members) + 1,
+                    'avg_similarity': float(scores[free].mean()),
+                    'topics': []
+                }
+                
+                for idx in [i, *members]:
+                    topic = all_topics[idx]
+                    sources = self.topic_sources[topic]
+                    group['topics'].append({
+                        'topic': topic,
+                        'source': {'topic': topic, **sources[0]},
+                        'sources': sources
+                    })
+                
+                semantic_groups.append(group)
             
             # Sort by group size and similarity
             semantic_groups.sort(key=lambda x: (x['group_size'], x['avg_similarity']), reverse=True)
@@ -848,14 +1330,91 @@ class EnhancedTopicRepetitionAnalyzer:
                 print(f"Error in semantic grouping: {e}")
             return []
 
-def analyze_enhanced_topic_repetitions(image_input, debug=False, use_lemmatization=True, verbose=False):
-    """Enhanced analysis accepts either folder path or list of files"""
+# Per-process analyzer used by the OCR worker pool
+_worker_analyzer = None
+
+# Long-lived OCR worker pools keyed by (workers, output_dir, target_confidence, target_words)
+_ocr_pools = {}
+_ocr_pools_lock = threading.Lock()
+
+
+def get_ocr_pool(settings):
+    """Return the OCR worker pool for these settings, starting it on first use"""
+    with _ocr_pools_lock:
+        pool = _ocr_pools.get(settings)
+        if pool is None:
+            workers, *initargs = settings
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker, initargs=tuple(initargs))
+            _ocr_pools[settings] = pool
+        return pool
+
 
-    from tempfile import TemporaryDirectory
-    from pathlib import Path
-    import os
+def discard_ocr_pool(settings, pool):
+    """Drop a pool that lost a worker process - the next page starts a fresh one"""
+    with _ocr_pools_lock:
+        if _ocr_pools.get(settings) is pool:
+            del _ocr_pools[settings]
+    pool.shutdown(wait=False, cancel_futures=True)
 
-    analyzer = EnhancedTopicRepetitionAnalyzer(use_lemmatization=use_lemmatization, verbose=verbose)
+
+@atexit.register
+def shutdown_ocr_pools():
+    """Stop every OCR worker pool (at interpreter exit)"""
+    with _ocr_pools_lock:
+        pools = list(_ocr_pools.values())
+        _ocr_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def submit_ocr_page(settings, image):
+    """Queue one page on the OCR worker pool; returns a Future of (result, candidate_wins)"""
+    pool = get_ocr_pool(settings)
+    try:
+        return pool.submit(_ocr_worker, image, dict(OCR_CANDIDATE_WINS))
+    except BrokenProcessPool:
+        discard_ocr_pool(settings, pool)
+        return get_ocr_pool(settings).submit(_ocr_worker, image, dict(OCR_CANDIDATE_WINS))
+
+
+def _init_ocr_worker(output_dir, target_confidence, target_words):
+    global _worker_analyzer
+    # One OpenCV thread per worker process - the pool already uses every core (Tesseract's
+    # OpenMP limit is set in ocr_service, before libtesseract is loaded)
+    cv2.setNumThreads(1)
+    _worker_analyzer = EnhancedTopicRepetitionAnalyzer(
+        output_dir=output_dir,
+        use_lemmatization=False,
+        ocr_target_confidence=target_confidence,
+        ocr_target_words=target_words,
+        ocr_workers=1,
+        preprocess_threads=1
+    )
+
+
+def _ocr_worker(image, candidate_wins):
+    """
+    OCR one page in a pool worker, ordering the candidates by the parent's history.
+    Returns the page result and the candidate win it adds, for the parent to merge.
+    """
+    OCR_CANDIDATE_WINS.clear()
+    OCR_CANDIDATE_WINS.update(candidate_wins)
+    result = _worker_analyzer.extract_text_from_image(image)
+    return result, dict(OCR_CANDIDATE_WINS - Counter(candidate_wins))
+
+
+def analyze_enhanced_topic_repetitions(image_input, debug=False, use_lemmatization=True, verbose=False, workers=None,
+                                       on_page=None, top_n=10, corpus=None, user_id=None):
+    """
+    Enhanced analysis accepts either folder path or list of files.
+    on_page, if given, receives a progress event per page: the page's confidence and word
+    count plus the running topic counts and a provisional top_n prediction list.
+    With a corpus (CorpusStore), the files are added to user_id's stored papers and the
+    whole corpus is analysed - previously added papers are not processed again.
+    """
+
+    analyzer = EnhancedTopicRepetitionAnalyzer(use_lemmatization=use_lemmatization, verbose=verbose, ocr_workers=workers,
+                                               corpus=corpus, user_id=user_id)
 
     image_extensions = ['.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp']
     pdf_extension = '.pdf'
@@ -883,75 +1442,71 @@ def analyze_enhanced_topic_repetitions(image_input, debug=False, use_lemmatizati
     if verbose:
         print(f"Found {len(input_files)} files to process")
 
-    final_image_files = []
+    report_page = None
+    if on_page is not None:
+        def report_page(page_info):
+            page_info['topic_counts'] = dict(analyzer.topic_freq.most_common(20))
+            page_info['predictions'] = analyzer.provisional_predictions(top_n)
+            on_page(page_info)
 
-    with TemporaryDirectory() as temp_dir:
-        # Convert PDFs to images if needed
-        for file_path in input_files:
-            ext = Path(file_path).suffix.lower()
-
-            if ext == '.pdf':
-                if verbose:
-                    print(f"Converting PDF: {file_path}")
-                try:
-                    images = convert_from_path(file_path)
-                    for i, img in enumerate(images):
-                        image_path = os.path.join(temp_dir, f"{Path(file_path).stem}_page_{i}.png")
-                        img.save(image_path, "PNG")
-                        final_image_files.append(image_path)
-                except Exception as e:
-                    if verbose:
-                        print(f"Failed to convert {file_path}: {e}")
-            else:
-                final_image_files.append(file_path)
+    # PDF pages are rendered in small windows and handed to OCR as they arrive. The analyzer's
+    # region OCR threads stop once the pages are read, also when a page raises.
+    pages = iter_input_pages(input_files, verbose=verbose)
+    with analyzer:
+        if corpus is not None:
+            extracted_data = analyzer.add_documents(pages, on_page=report_page)
+        else:
+            extracted_data = analyzer.process_multiple_files(pages, on_page=report_page)
 
-        extracted_data = analyzer.process_multiple_files(final_image_files)
+    if not extracted_data:
+        if verbose:
+            print("No text was extracted from any files!")
+        return None
 
-        if not extracted_data:
-            if verbose:
-                print("No text was extracted from any files!")
-            return None
+    topic_analysis = analyzer.analyze_enhanced_topic_frequency()
+    if not topic_analysis:
+        if verbose:
+            print("No topics could be analyzed!")
+        return None
 
-        topic_analysis = analyzer.analyze_enhanced_topic_frequency()
-        if not topic_analysis:
-            if verbose:
-                print("No topics could be analyzed!")
-            return None
+    predictions = analyzer.calculate_enhanced_predictions(topic_analysis)
+    semantic_groups = analyzer.find_semantic_topic_groups()
+    analyzer.generate_enhanced_report(predictions, topic_analysis)
 
-        predictions = analyzer.calculate_enhanced_predictions(topic_analysis)
-        semantic_groups = analyzer.find_semantic_topic_groups()
-        analyzer.generate_enhanced_report(predictions, topic_analysis)
-
-        result = {
-            'analyzer': analyzer,
-            'predictions': predictions,
-            'topic_analysis': topic_analysis,
-            'semantic_groups': semantic_groups,
-            'summary': {
-                'total_files': len(final_image_files),
-                'successful_extractions': len(extracted_data),
-                'total_topics': len(predictions) if predictions else 0,
-                'high_priority_topics': len([p for p in predictions if p['likelihood_category'] in ['Very High', 'High']]) if predictions else 0,
-                'output_directory': analyzer.output_dir
-            }
+    result = {
+        'analyzer': analyzer,
+        'predictions': predictions,
+        'topic_analysis': topic_analysis,
+        'semantic_groups': semantic_groups,
+        'summary': {
+            'total_files': len(analyzer.processed_files),
+            'successful_extractions': len(extracted_data),
+            'text_layer_pages': len([d for d in extracted_data if d['source'] == 'text_layer']),
+            'total_topics': len(predictions) if predictions else 0,
+            'high_priority_topics': len([p for p in predictions if p['likelihood_category'] in ['Very High', 'High']]) if predictions else 0,
+            'output_directory': analyzer.output_dir
         }
+    }
 
-        if verbose:
-            print("Enhanced Topic Repetition Analysis Complete!")
-            if predictions:
-                very_high_count = len([p for p in predictions if p['likelihood_category'] == 'Very High'])
-                high_count = len([p for p in predictions if p['likelihood_category'] == 'High'])
-                medium_count = len([p for p in predictions if p['likelihood_category'] == 'Medium'])
+    if verbose:
+        print("Enhanced Topic Repetition Analysis Complete!")
+        if predictions:
+            very_high_count = len([p for p in predictions if p['likelihood_category'] == 'Very High'])
+            high_count = len([p for p in predictions if p['likelihood_category'] == 'High'])
+            medium_count = len([p for p in predictions if p['likelihood_category'] == 'Medium'])
 
-                print(f"Prediction Summary:")
-                print(f"   • Very High Priority: {very_high_count} topics")
-                print(f"   • High Priority: {high_count} topics")
-                print(f"   • Medium Priority: {medium_count} topics")
-                print(f"   • Total Predictions: {len(predictions)} topics")
+            print(f"Prediction Summary:")
+            print(f"   • Very High Priority: {very_high_count} topics")
+            print(f"   • High Priority: {high_count} topics")
+            print(f"   • Medium Priority: {medium_count} topics")
+            print(f"   • Total Predictions: {len(predictions)} topics")
 
-            print(f"Results saved to: {analyzer.output_dir}")
+        cache_stats = normalization_cache_stats()
+        print(f"Normalization cache hit rate: phrases {cache_stats['phrase']['hit_rate']:.1%}, "
+              f"lemmas {cache_stats['lemma']['hit_rate']:.1%}")
+        print(f"Results saved to: {analyzer.output_dir}")
 
-        return result
+    return result
 
 
 
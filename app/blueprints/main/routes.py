@@ -1,4 +1,4 @@
-from flask import render_template, request, redirect, flash, url_for, session, jsonify, abort, current_app
+from flask import render_template, request, redirect, flash, url_for, session, jsonify, current_app
 from app.blueprints.main import bp
 from werkzeug.utils import secure_filename
 from app.extensions import db, mail
@@ -6,20 +6,23 @@ from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from app.utils.token import generate_reset_token
 from app.utils.send_email import send_reset_email
-from app.utils.helpers import ping_database, login_required
+from app.utils.helpers import ping_database, login_required, require_admin_token
 from app.models import User, Subscriber
 from flask_mail import Message
 from datetime import datetime
 import os
 import uuid
 from app.blueprints.analyzer import analyze_enhanced_topic_repetitions
+from app.blueprints.analyzer.analyze import iter_pdf_page_sources
 from app.centralizepath import config
 from pathlib import Path
 import PyPDF2
 from app.services.summarize import generate_summary
-import pytesseract
-from PIL import Image
-from keybert import KeyBERT
+from app.services.ocr_service import get_engine, load_grayscale, normalize_resolution
+from app.services.ocr_cache import get_ocr_cache, make_cache_key
+from app.services.nlp_service import normalization_cache_stats
+from app.services.model_registry import models
+from app.services.summary_cache import get_summary_cache
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
 
@@ -183,16 +186,8 @@ def db_test():
 
 
 @bp.route('/admin/db_check')
+@require_admin_token
 def db_check():
-    token = request.args.get('token')
-    secret_token = os.getenv('DB_CHECK_TOKEN')  
-
-    from urllib.parse import unquote
-    decoded_token = unquote(secret_token)  
-
-    if token != decoded_token:
-        abort(403)
-
     try:
         ping_database()  # wakes DB if needed
 
@@ -226,6 +221,36 @@ def db_check():
         )
 
 
+@bp.route('/admin/ocr_cache')
+@require_admin_token
+def ocr_cache_stats():
+    cache = get_ocr_cache()
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+
+@bp.route('/admin/summary_cache')
+@require_admin_token
+def summary_cache_stats():
+    cache = get_summary_cache()
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+
+@bp.route('/admin/nlp_cache')
+@require_admin_token
+def nlp_cache_stats():
+    return jsonify(normalization_cache_stats())
+
+
+@bp.route('/admin/models')
+@require_admin_token
+def model_stats():
+    return jsonify(models.memory_report())
+
+
 @bp.route('/forgot_password.html', methods=["GET", "POST"])
 def forgot_password():
     reset_url = None
@@ -316,6 +341,26 @@ def summarize():
     summary_result = generate_summary(text)
     return jsonify({"summary": summary_result})
 
+def ocr_page_text(image):
+    """OCR a single page, reusing the cached text when these pixels were seen before"""
+    pixels = load_grayscale(image)
+    if pixels is None:
+        raise ValueError("Could not decode image")
+    pixels = normalize_resolution(pixels)
+
+    cache = get_ocr_cache()
+    cache_key = make_cache_key(pixels, route='extract_text', psm=3) if cache is not None else None
+
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached[0]
+
+    text = get_engine().image_to_string(pixels)
+    if cache is not None:
+        cache.put(cache_key, text, 0, 'psm3')
+    return text
+
 @bp.route('/extract_text', methods=["POST"])
 @login_required  # optional, if you want only logged-in users
 def extract_text():
@@ -330,28 +375,39 @@ def extract_text():
         return jsonify({"error": "File type not allowed"}), 400
 
     filename = secure_filename(file.filename)
-    unique_filename = f"{uuid.uuid4()}_{filename}"
-    filepath = os.path.join(image_folder_path, unique_filename)
+    filepath = None
 
     try:
-        # Save the uploaded file
-        file.save(filepath)
-
-        # Extract text with pytesseract
+        # Extract text with the resident Tesseract engine
         if filename.lower().endswith('pdf'):
-            from pdf2image import convert_from_path
-            pages = convert_from_path(filepath, dpi=300)
+            # Poppler needs the PDF on disk; its pages are then streamed to OCR in memory
+            unique_filename = f"{uuid.uuid4()}_{filename}"
+            filepath = os.path.join(image_folder_path, unique_filename)
+            file.save(filepath)
+
+            # Pages with a text layer are read directly, only scanned pages are OCR'd
             text = ""
-            for page in pages:
-                text += pytesseract.image_to_string(page)
+            pages = []
+            for page_number, page_text, page in iter_pdf_page_sources(filepath, dpi='auto'):
+                if page_text is not None:
+                    text += page_text + "\n"
+                    pages.append({"page": page_number, "source": "text_layer"})
+                else:
+                    text += ocr_page_text(page)
+                    pages.append({"page": page_number, "source": "ocr"})
         else:
-            text = pytesseract.image_to_string(Image.open(filepath))
+            # Images are decoded straight from the upload stream - no temp file
+            text = ocr_page_text(file.read())
+            pages = [{"page": 1, "source": "ocr"}]
 
-        return jsonify({"text": text})
+        return jsonify({"text": text, "pages": pages})
 
     except Exception as e:
         print(f"[OCR Error] {e}")
         return jsonify({"error": str(e)}), 500
+    finally:
+        if filepath and os.path.exists(filepath):
+            os.remove(filepath)
     
 @bp.route('/predict_topics', methods=['POST'])
 @login_required
@@ -364,7 +420,8 @@ def predict_topics():
     if not text:
         return jsonify({"error": "No text provided"}), 400
 
-    kw_model = KeyBERT()
+    # One KeyBERT (and sentence-transformer) per process, shared by every request
+    kw_model = models.get('keybert')
     keywords = kw_model.extract_keywords(
         text,
         keyphrase_ngram_range=(1, 2),  # allow single + bi-grams
@@ -1,5 +1,5 @@
 # config.py - Create a centralized configuration file
-from flask import render_template,abort,url_for, request, session, jsonify, current_app
+from flask import render_template,abort,url_for, request, session, jsonify, current_app, Response, stream_with_context
 from app.blueprints.main import bp
 from werkzeug.utils import secure_filename
 from app.utils.helpers import login_required
@@ -8,10 +8,27 @@ import os
 from pathlib import Path
 from app.blueprints.analyzer import analyze_enhanced_topic_repetitions
 from .config import config  # Import our config
+from app.services.job_queue import JobQueue
+from app.services.corpus_store import CorpusStore
+from app.services.result_store import ResultStore
 import os
+import json
+import time
+import shutil
+from collections import deque
 from pathlib import Path
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
+SSE_POLL_INTERVAL = 0.5
+# Each events request ends after this long and the browser reconnects with Last-Event-ID,
+# so a long analysis never pins a gunicorn thread or runs into the worker timeout
+SSE_STREAM_SECONDS = float(os.environ.get('SSE_STREAM_SECONDS', 20))
+SSE_RETRY_MS = 1000
+PREDICTIONS_PER_PAGE = 20
+# Page summaries kept in a running job's progress - enough for an events stream polling
+# every SSE_POLL_INTERVAL to see every page, without the progress growing with the upload
+PROGRESS_RECENT_PAGES = 20
+PREDICTIONS_MAX_PER_PAGE = 100
 
 class Config:
     def __init__(self):
@@ -72,8 +89,7 @@ def upload():
         return render_template('report.html', error="No files provided")
 
     
-    saved_filenames = []
-    saved_file_paths = []
+    uploads = []
 
     for file in files:
         if file and file.filename != '':
@@ -84,55 +100,84 @@ def upload():
             # Add timestamp to avoid conflicts
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             unique_filename = f"{timestamp}_{filename}"
-            
-            file_path = config.get_upload_path(unique_filename)
-
-            try:
-                current_app.logger.info(f"Trying to save to {file_path}")
-                file.save(str(file_path))  # Convert Path to string for save()
-                current_app.logger.info(f"File saved to {file_path}")
-
-                if not Path(file_path).exists():
-                    current_app.logger.warning(f"File does NOT exist after save: {file_path}")
-                else:
-                    current_app.logger.info(f"Confirmed file exists after save: {file_path}")
-                
-                saved_filenames.append(unique_filename)
-                saved_file_paths.append(str(file_path))
-                current_app.logger.info(f"Saved file: {file_path}")
-
-            except Exception as e:
-                current_app.logger.error(f"Failed to save file {filename}: {e}")
-                return jsonify({'status': 'error', 'message': 'File saving failed'}), 500
-
-    # Verify files were actually saved
-    existing_files = []
-    for file_path in saved_file_paths:
-        if Path(file_path).exists():
-            existing_files.append(file_path)
-        else:
-            current_app.logger.warning(f"File not found after save: {file_path}")
 
-    if not existing_files:
+            data = file.read()
+            if not data:
+                current_app.logger.warning(f"Skipping empty upload: {filename}")
+                continue
+            uploads.append((unique_filename, data))
+
+    if not uploads:
         return jsonify({'status': 'error', 'message': 'No files were successfully saved'}), 500
 
-    current_app.logger.info(f"Processing {len(existing_files)} files: {existing_files}")
+    current_app.logger.info(f"Queueing analysis of {len(uploads)} files: {[name for name, _ in uploads]}")
+
+    # Analysis runs on the background job workers - the request returns right away. The files
+    # are stored with the job, so whichever worker process or instance claims it can read them.
+    job_id = analysis_jobs.enqueue({
+        'add_to_corpus': request.form.get('add_to_corpus') == 'on'
+    }, user_id=session.get('user_id'), files=uploads)
+
+    return jsonify({
+        'status': 'queued',
+        'message': f'Analysis queued for {len(uploads)} files.',
+        'job_id': job_id,
+        'status_url': f'/jobs/{job_id}',
+        'events_url': f'/jobs/{job_id}/events'
+    }), 202
+
+
+def run_analysis_job(job_id, payload):
+    """Job handler: analyze the job's uploaded files and store the report payload in the result store"""
+    user_id = analysis_jobs.get(job_id)['user_id']
+
+    # The stored uploads are written to a scratch folder for this run only
+    job_folder = config.get_upload_path(job_id)
+    job_folder.mkdir(parents=True, exist_ok=True)
+
+    pages_done = 0
+    recent_pages = deque(maxlen=PROGRESS_RECENT_PAGES)
+
+    def on_page(page_info):
+        # Latest running topic counts/predictions, the page count and the last few page
+        # summaries - each write stays the same size however many pages the upload has
+        nonlocal pages_done
+        pages_done += 1
+        recent_pages.append({key: page_info[key] for key in ('page', 'filename', 'confidence', 'word_count', 'source', 'accepted')})
+        analysis_jobs.update_progress(job_id, {
+            'pages_done': pages_done,
+            'recent_pages': list(recent_pages),
+            'topic_counts': page_info['topic_counts'],
+            'predictions': page_info['predictions']
+        })
+
+    # Optionally add the files to the user's stored papers and analyse the whole corpus
+    corpus_options = {}
+    if payload.get('add_to_corpus'):
+        corpus_options = {'corpus': corpus_store, 'user_id': user_id}
 
     try:
+        file_paths = []
+        for filename, data in analysis_jobs.files(job_id):
+            file_path = job_folder / filename
+            file_path.write_bytes(data)
+            file_paths.append(str(file_path))
+        print(f"[Analysis Job {job_id}] Processing {len(file_paths)} files")
+
         # Pass the list of file paths directly to the analyzer
         result = analyze_enhanced_topic_repetitions(
-            existing_files,  # Pass file list instead of folder
+            file_paths,  # Pass file list instead of folder
             debug=False,
             use_lemmatization=True,
-            verbose=True  # Enable verbose for debugging
+            verbose=True,  # Enable verbose for debugging
+            on_page=on_page,
+            **corpus_options
         )
 
         if not result:
-            current_app.logger.error("Analysis returned no results")
-            return jsonify({'status': 'error', 'message': 'Analysis failed or no valid files'}), 500
+            raise RuntimeError('Analysis failed or no valid files')
 
-        # Store result in session for report page
-        session['analysis_result'] = {
+        result_id = result_store.save({
             'predictions': result.get('predictions', []),
             'summary': result.get('summary', {}),
             'analyzer_data': {
@@ -146,36 +191,162 @@ def upload():
                     for data in result['analyzer'].extracted_texts
                 ]
             }
-        }
+        }, user_id=user_id)
 
-        return jsonify({
-            'status': 'success',
-            'message': f'Analysis complete! Processed {len(existing_files)} files.',
-            'summary': result.get("summary", {}),
-            'predictions': result.get("predictions", []),
-            'redirect_url': '/report.html'
-        }), 200
+        # The job row only keeps the result ID and summary - the report itself stays in the result store
+        return {
+            'result_id': result_id,
+            'summary': result.get('summary', {})
+        }
 
-    except Exception as e:
-        current_app.logger.error(f"Analysis error: {e}")
-        return jsonify({'status': 'error', 'message': f'Analysis failed: {str(e)}'}), 500
     finally:
-
         config.cleanup_temp_files()
-        # Clean up uploaded files after analysis (important for Render)
-        
-        try:
-            for file_path in saved_file_paths:
-                if Path(file_path).exists():
-                    Path(file_path).unlink()
-        except Exception as e:
-            current_app.logger.warning(f"Could not clean up {file_path}: {e}")
+        # The job's stored files are dropped when it finishes - the local copies go now
+        shutil.rmtree(job_folder, ignore_errors=True)
+
+
+result_store = ResultStore()
+
+corpus_store = CorpusStore()
+
+analysis_jobs = JobQueue(
+    handler=run_analysis_job,
+    workers=int(os.environ.get('ANALYSIS_WORKERS', 1))
+)
+
+
+@bp.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = analysis_jobs.get(job_id)
+    if not job or job['user_id'] != session.get('user_id'):
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+
+    response = {
+        'job_id': job_id,
+        'status': job['status'],
+        'progress': job['progress']
+    }
+
+    if job['status'] == 'done':
+        result = job['result']
+        # Only the opaque result ID goes in the session cookie - the report is loaded server-side
+        session['analysis_result_id'] = result['result_id']
+        response.update({
+            'message': f"Analysis complete! Processed {result['summary'].get('total_files', 0)} files.",
+            'summary': result['summary'],
+            'result_id': result['result_id'],
+            'predictions_url': f"/results/{result['result_id']}/predictions",
+            'redirect_url': f"/report.html?result={result['result_id']}"
+        })
+    elif job['status'] == 'failed':
+        response['message'] = f"Analysis failed: {job['error']}"
+
+    return jsonify(response), 200
+
+@bp.route('/jobs/<job_id>/events')
+@login_required
+def job_events(job_id):
+    """
+    Server-sent events: one 'page' event per finished page, then 'done' or 'failed'.
+
+    A stream lasts at most SSE_STREAM_SECONDS. EventSource then reconnects on its own
+    and sends the id of the last page it got as Last-Event-ID, so it resumes there.
+    Only the last PROGRESS_RECENT_PAGES pages are stored, so a client that falls further
+    behind skips to them - every event carries the full running counts and predictions.
+    """
+    job = analysis_jobs.get(job_id)
+    if not job or job['user_id'] != session.get('user_id'):
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    resume_from = int(last_event_id) if last_event_id.isdigit() else 0
+
+    def generate():
+        sent = resume_from
+        deadline = time.monotonic() + SSE_STREAM_SECONDS
+        idle_polls = 0
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            job = analysis_jobs.get(job_id)
+            progress = job['progress'] or {}
+            pages_done = progress.get('pages_done', 0)
+            recent_pages = progress.get('recent_pages', [])
+
+            for number, page in enumerate(recent_pages, start=pages_done - len(recent_pages) + 1):
+                if number <= sent:
+                    continue
+                event = dict(page, topic_counts=progress.get('topic_counts', {}), predictions=progress.get('predictions', []))
+                yield f"id: {number}\nevent: page\ndata: {json.dumps(event)}\n\n"
+            if pages_done > sent:
+                sent = pages_done
+                idle_polls = 0
+
+            if job['status'] in ('done', 'failed'):
+                yield f"event: {job['status']}\ndata: {json.dumps({'status': job['status'], 'error': job['error']})}\n\n"
+                return
+
+            if time.monotonic() >= deadline:
+                return
+
+            # Comment line keeps proxies from closing an idle stream
+            idle_polls += 1
+            if idle_polls % 20 == 0:
+                yield ": keep-alive\n\n"
+            time.sleep(SSE_POLL_INTERVAL)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@bp.route('/corpus')
+@login_required
+def corpus_documents():
+    """List the papers stored in the user's corpus"""
+    documents = corpus_store.list_documents(session.get('user_id'))
+    return jsonify({'status': 'success', 'documents': documents, 'total': len(documents)}), 200
+
+
+@bp.route('/corpus/<int:doc_id>', methods=['DELETE'])
+@login_required
+def remove_corpus_document(doc_id):
+    """Remove one paper from the user's corpus - its topics are subtracted from the stored counts"""
+    if not corpus_store.remove_document(session.get('user_id'), doc_id):
+        return jsonify({'status': 'error', 'message': 'Document not found'}), 404
+    return jsonify({'status': 'success', 'message': 'Document removed'}), 200
+
+
+@bp.route('/results/<result_id>/predictions')
+@login_required
+def result_predictions(result_id):
+    """Paginated predictions of a stored analysis result (?page=1&per_page=20)"""
+    analysis_result = result_store.load(result_id, session.get('user_id'))
+    if analysis_result is None:
+        return jsonify({'status': 'error', 'message': 'Result not found'}), 404
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', PREDICTIONS_PER_PAGE, type=int), 1), PREDICTIONS_MAX_PER_PAGE)
+
+    predictions = analysis_result.get('predictions', [])
+    start = (page - 1) * per_page
+    return jsonify({
+        'status': 'success',
+        'predictions': predictions[start:start + per_page],
+        'page': page,
+        'per_page': per_page,
+        'total': len(predictions),
+        'pages': (len(predictions) + per_page - 1) // per_page
+    }), 200
+
 
 @bp.route('/report.html')
 def report():
     try:
-        # Load analysis_result from session
-        analysis_result = session.get('analysis_result')
+        # Load analysis_result from the server-side result store
+        result_id = request.args.get('result') or session.get('analysis_result_id')
+        analysis_result = result_store.load(result_id, session.get('user_id')) if result_id else None
         if not analysis_result:
             return render_template('error.html', message="No analysis data found. Please upload and analyze files first.")
 
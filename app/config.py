@@ -59,6 +59,10 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD") 
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")  
 
+    # Background analysis workers: 'now' starts them in every process that builds the app,
+    # 'fork' in every process forked from it (gunicorn --preload), 'off' never (one-off CLI commands)
+    JOB_QUEUE_START = os.getenv("JOB_QUEUE_START", "now")
+
     def cleanup_temp_files(self):
         """Clean up temporary files (important for Render's ephemeral filesystem)"""
         import shutil
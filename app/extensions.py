@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_mail import Mail
 
 db = SQLAlchemy()
+migrate = Migrate()
 limiter = Limiter(key_func=get_remote_address)
 mail = Mail()
\ No newline at end of file
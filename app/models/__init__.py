@@ -1,3 +1,7 @@
 from .user import User
 from .Subscriber import Subscriber
-
+from .analysis_job import AnalysisJob
+from .corpus_document import CorpusDocument
+from .corpus_topic import CorpusTopic
+from .analysis_result import AnalysisResult
+from .job_file import JobFile
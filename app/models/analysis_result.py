@@ -0,0 +1,12 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class AnalysisResult(db.Model):
+    __tablename__ = 'analysis_results'
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    # zlib-compressed JSON report
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
@@ -0,0 +1,26 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class CorpusDocument(db.Model):
+    __tablename__ = 'corpus_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    text_hash = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    filepath = db.Column(db.Text, nullable=True)
+    date = db.Column(db.String(10), nullable=True)
+    # Kept for re-indexing only; analysis uses the stored topic set, so the text is never loaded with the row
+    text = db.deferred(db.Column(db.Text, nullable=False))
+    confidence = db.Column(db.Float, nullable=True)
+    method = db.Column(db.String(32), nullable=True)
+    source = db.Column(db.String(16), nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    char_count = db.Column(db.Integer, nullable=True)
+    topics = db.Column(db.JSON, nullable=False)
+    added_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'text_hash', name='uq_corpus_documents_user_text'),
+    )
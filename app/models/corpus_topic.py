@@ -0,0 +1,15 @@
+from app.extensions import db
+
+
+class CorpusTopic(db.Model):
+    """Running per-user count of corpus documents that contain a topic"""
+    __tablename__ = 'corpus_topics'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    topic = db.Column(db.Text, nullable=False)
+    frequency = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'topic', name='uq_corpus_topics_user_topic'),
+    )
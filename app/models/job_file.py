@@ -0,0 +1,11 @@
+from app.extensions import db
+
+
+class JobFile(db.Model):
+    __tablename__ = 'job_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), db.ForeignKey('analysis_jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    # Uploaded file contents, kept until the job finishes so any worker process or instance can run it
+    data = db.Column(db.LargeBinary, nullable=False)
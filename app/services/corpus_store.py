@@ -0,0 +1,144 @@
+import hashlib
+from collections import Counter, defaultdict
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import CorpusDocument, CorpusTopic
+
+# extracted_texts fields loaded back for every corpus document - everything but the text,
+# which the analysis never needs again once the document's topic set is stored
+DOCUMENT_FIELDS = ['filename', 'filepath', 'date', 'confidence', 'method', 'source', 'word_count', 'char_count']
+
+
+class CorpusStore:
+    """
+    Persistent per-user paper corpus in the app database.
+
+    Each document's extracted text and topic set are stored once. Per-topic document
+    counts are kept as running aggregates (CorpusTopic), updated when a document is
+    added or removed, so analysing the corpus never re-OCRs or re-extracts old papers
+    and only loads document metadata, topic sets and the counts - never the texts.
+    The same text is only stored once per user.
+    """
+
+    def add_document(self, user_id, record, topics):
+        """
+        Store one extracted document and fold its topics into the user's aggregates.
+
+        Args:
+            user_id (int): Corpus owner.
+            record (dict): An extracted_texts record (filename, text, confidence, ...).
+            topics (list[str]): The document's topic set from extract_academic_topics.
+
+        Returns:
+            int | None: The new document ID, or None if this text is already in the corpus.
+        """
+        text_hash = hashlib.sha256(record['text'].encode('utf-8')).hexdigest()
+        topics = list(dict.fromkeys(topics))
+
+        if self._document_id(user_id, text_hash) is not None:
+            return None
+
+        document = CorpusDocument(user_id=user_id, text_hash=text_hash, text=record['text'], topics=topics,
+                                  **{field: record.get(field) for field in DOCUMENT_FIELDS})
+        db.session.add(document)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # A concurrent upload stored the same text after the check above (unique
+            # user_id/text_hash): roll this attempt back and keep the stored copy
+            db.session.rollback()
+            if self._document_id(user_id, text_hash) is not None:
+                return None
+            raise
+
+        counted = self._topic_rows(user_id, topics)
+        for topic in topics:
+            if topic in counted:
+                counted[topic].frequency += 1
+            else:
+                db.session.add(CorpusTopic(user_id=user_id, topic=topic, frequency=1))
+
+        db.session.commit()
+        return document.id
+
+    def _document_id(self, user_id, text_hash):
+        return db.session.execute(
+            select(CorpusDocument.id).where(CorpusDocument.user_id == user_id, CorpusDocument.text_hash == text_hash)
+        ).scalar()
+
+    def remove_document(self, user_id, doc_id):
+        """Remove a document and subtract its topics from the aggregates. Returns False if not found"""
+        document = db.session.execute(
+            select(CorpusDocument).where(CorpusDocument.id == doc_id, CorpusDocument.user_id == user_id)
+        ).scalar_one_or_none()
+        if document is None:
+            return False
+
+        if document.topics:
+            db.session.execute(
+                update(CorpusTopic)
+                .where(CorpusTopic.user_id == user_id, CorpusTopic.topic.in_(document.topics))
+                .values(frequency=CorpusTopic.frequency - 1)
+            )
+        db.session.execute(delete(CorpusTopic).where(CorpusTopic.user_id == user_id, CorpusTopic.frequency <= 0))
+        db.session.delete(document)
+        db.session.commit()
+        return True
+
+    def _topic_rows(self, user_id, topics):
+        if not topics:
+            return {}
+        rows = db.session.execute(
+            select(CorpusTopic).where(CorpusTopic.user_id == user_id, CorpusTopic.topic.in_(topics))
+        ).scalars()
+        return {row.topic: row for row in rows}
+
+    def documents(self, user_id):
+        """Return the user's documents as extracted_texts records (with 'doc_id' and 'topics', without 'text')"""
+        rows = db.session.execute(
+            select(CorpusDocument).where(CorpusDocument.user_id == user_id).order_by(CorpusDocument.id)
+        ).scalars()
+
+        records = []
+        for row in rows:
+            record = {field: getattr(row, field) for field in DOCUMENT_FIELDS}
+            record['doc_id'] = row.id
+            record['topics'] = list(row.topics)
+            records.append(record)
+        return records
+
+    def list_documents(self, user_id):
+        """Document metadata only (no text or topics) - for listing the corpus"""
+        rows = db.session.execute(
+            select(CorpusDocument.id, CorpusDocument.filename, CorpusDocument.date, CorpusDocument.confidence,
+                   CorpusDocument.word_count, CorpusDocument.source, CorpusDocument.added_at)
+            .where(CorpusDocument.user_id == user_id).order_by(CorpusDocument.id)
+        ).mappings()
+        return [dict(row, doc_id=row['id'], added_at=row['added_at'].isoformat()) for row in rows]
+
+    def document_count(self, user_id):
+        return db.session.execute(
+            select(db.func.count()).select_from(CorpusDocument).where(CorpusDocument.user_id == user_id)
+        ).scalar()
+
+    def topic_frequency(self, user_id):
+        """Counter of topic -> number of documents containing it, in first-seen order, read from the aggregates"""
+        rows = db.session.execute(
+            select(CorpusTopic.topic, CorpusTopic.frequency)
+            .where(CorpusTopic.user_id == user_id).order_by(CorpusTopic.id)
+        )
+        return Counter({topic: frequency for topic, frequency in rows})
+
+    def topic_sources(self, user_id, documents=None):
+        """
+        topic -> [{'doc_id', 'filename', 'date'}] for every stored document that contains it.
+
+        Args:
+            documents (list[dict] | None): The user's documents() records, when already loaded.
+        """
+        sources = defaultdict(list)
+        for record in documents if documents is not None else self.documents(user_id):
+            for topic in record['topics']:
+                sources[topic].append({'doc_id': record['doc_id'], 'filename': record['filename'], 'date': record['date']})
+        return sources
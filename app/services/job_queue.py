@@ -0,0 +1,255 @@
+import os
+import uuid
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import AnalysisJob, JobFile
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+# A running job's worker refreshes heartbeat_at every HEARTBEAT_INTERVAL seconds. A job
+# whose heartbeat is older than STALE_AFTER lost its worker (killed, redeployed, OOM).
+HEARTBEAT_INTERVAL = float(os.environ.get('JOB_HEARTBEAT_INTERVAL', 10))
+STALE_AFTER = float(os.environ.get('JOB_STALE_AFTER', 60))
+MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
+
+def utcnow():
+    # Naive UTC: the DateTime columns store and hand back naive values, so comparisons
+    # against them must not mix in aware datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    """
+    Durable background job queue stored in the app database - no external broker.
+
+    Jobs survive restarts and redeploys: a running job's worker keeps a heartbeat, and a
+    job whose heartbeat goes stale is put back in the queue (or failed once it has been
+    tried max_attempts times). A job's input files are stored with it in the database
+    until it finishes, not on local disk. Every process that calls start() runs its own
+    worker threads, and jobs are claimed with a conditional UPDATE, so several gunicorn
+    workers or instances can share the queue.
+
+    Args:
+        handler (callable): handler(job_id, payload) -> JSON-serializable result.
+            Runs inside an app context. Raising marks the job failed with the exception message.
+        workers (int): Worker threads per process.
+        heartbeat_interval (float): Seconds between heartbeats of a running job.
+        stale_after (float): Seconds without a heartbeat before a running job is requeued.
+        max_attempts (int): Claims per job before a stale job is failed instead of requeued.
+    """
+
+    def __init__(self, handler, workers=1, poll_interval=1.0, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 stale_after=STALE_AFTER, max_attempts=MAX_ATTEMPTS):
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.app = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self._forked_from = None
+
+    def enqueue(self, payload, user_id=None, files=None):
+        """
+        Add a job.
+
+        Args:
+            payload (dict): JSON-serializable handler input.
+            user_id (int | None): Owner of the job.
+            files (list[tuple[str, bytes]] | None): (filename, contents) pairs the handler reads
+                back with files(); they are deleted once the job is done or failed.
+
+        Returns:
+            str: Job ID.
+        """
+        job_id = uuid.uuid4().hex
+        db.session.add(AnalysisJob(id=job_id, user_id=user_id, status='queued', payload=payload, attempts=0))
+        for filename, data in files or []:
+            db.session.add(JobFile(job_id=job_id, filename=filename, data=data))
+        db.session.commit()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return the job as a dict, or None"""
+        # populate_existing: a long-lived session (an SSE stream) must see the worker's updates
+        job = db.session.get(AnalysisJob, job_id, populate_existing=True)
+        return job.to_dict() if job is not None else None
+
+    def files(self, job_id):
+        """Return the job's stored files as (filename, contents) pairs, in upload order"""
+        rows = db.session.execute(
+            select(JobFile.filename, JobFile.data).where(JobFile.job_id == job_id).order_by(JobFile.id)
+        )
+        return [(filename, data) for filename, data in rows]
+
+    def update_progress(self, job_id, progress):
+        """Store a JSON-serializable progress snapshot for a running job"""
+        db.session.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(progress=progress))
+        db.session.commit()
+
+    def claim(self):
+        """
+        Mark the oldest queued job running.
+
+        Returns:
+            tuple | None: (job_id, payload), or None when the queue is empty.
+        """
+        while True:
+            job_id = db.session.execute(
+                select(AnalysisJob.id).where(AnalysisJob.status == 'queued')
+                .order_by(AnalysisJob.created_at).limit(1)
+            ).scalar()
+            if job_id is None:
+                db.session.rollback()
+                return None
+
+            now = utcnow()
+            # Only one worker's UPDATE matches while the job is still queued
+            claimed = db.session.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job_id, AnalysisJob.status == 'queued')
+                .values(status='running', started_at=now, heartbeat_at=now, attempts=AnalysisJob.attempts + 1)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return job_id, self.get(job_id)['payload']
+
+    def heartbeat(self, job_id):
+        """Record that the worker running job_id is still alive"""
+        db.session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.status == 'running')
+            .values(heartbeat_at=utcnow())
+        )
+        db.session.commit()
+
+    def complete(self, job_id, result):
+        self._finish(job_id, 'done', result=result)
+
+    def fail(self, job_id, error):
+        self._finish(job_id, 'failed', error=error)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        db.session.execute(
+            update(AnalysisJob).where(AnalysisJob.id == job_id)
+            .values(status=status, result=result, error=error, finished_at=utcnow())
+        )
+        db.session.execute(delete(JobFile).where(JobFile.job_id == job_id))
+        db.session.commit()
+
+    def requeue_stale(self, now=None):
+        """
+        Put running jobs whose heartbeat went stale back in the queue, and fail
+        the ones that already used up their attempts.
+
+        Returns:
+            int: Number of jobs requeued or failed.
+        """
+        now = now or utcnow()
+        stale = (AnalysisJob.status == 'running') & (AnalysisJob.heartbeat_at < now - timedelta(seconds=self.stale_after))
+
+        requeued = db.session.execute(
+            update(AnalysisJob).where(stale, AnalysisJob.attempts < self.max_attempts)
+            .values(status='queued', started_at=None, heartbeat_at=None)
+        ).rowcount
+        failed = db.session.execute(
+            update(AnalysisJob).where(stale, AnalysisJob.attempts >= self.max_attempts)
+            .values(status='failed', finished_at=now,
+                    error=f'Worker stopped responding ({self.max_attempts} attempts)')
+        ).rowcount
+        if failed:
+            db.session.execute(delete(JobFile).where(
+                JobFile.job_id.in_(select(AnalysisJob.id).where(AnalysisJob.status == 'failed'))
+            ))
+        db.session.commit()
+
+        if requeued or failed:
+            print(f"[JobQueue] Requeued {requeued} and failed {failed} stale jobs")
+        return requeued + failed
+
+    def init_app(self, app):
+        """
+        Run this queue's workers for app, as app.config['JOB_QUEUE_START'] says:
+        'now' (the default) starts them in this process, 'fork' in every process forked
+        from it, and 'off' leaves them stopped.
+
+        'fork' is for gunicorn --preload, which builds the app in the master and then forks
+        the workers: threads do not survive a fork, and the master must not run jobs.
+        """
+        self.app = app
+        mode = app.config.get('JOB_QUEUE_START', 'now')
+        if mode == 'now':
+            self.start(app)
+        elif mode == 'fork' and self._forked_from is None:
+            self._forked_from = os.getpid()
+            os.register_at_fork(after_in_child=self._start_in_child)
+
+    def _start_in_child(self):
+        # Only the master's direct children - not processes the workers fork themselves (OCR pool)
+        if os.getppid() == self._forked_from:
+            self.start(self.app)
+
+    def start(self, app=None):
+        """Start this process's worker threads (idempotent, and restarts them after a fork)"""
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self.app = app or self.app or current_app._get_current_object()
+            self._started_pid = os.getpid()
+            self._wakeup = threading.Event()
+            for i in range(self.workers):
+                threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    claimed = self.claim()
+                    if claimed is None:
+                        self.requeue_stale()
+                except SQLAlchemyError as e:
+                    print(f"[JobQueue] Failed to claim job: {e}")
+                    db.session.rollback()
+                    claimed = None
+
+                if claimed is not None:
+                    self._run(*claimed)
+                    continue
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _run(self, job_id, payload):
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_alive, args=(job_id, stop),
+                                     name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+        heartbeat.start()
+        try:
+            result = self.handler(job_id, payload)
+            self.complete(job_id, result)
+        except Exception as e:
+            traceback.print_exc()
+            db.session.rollback()
+            self.fail(job_id, str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def _keep_alive(self, job_id, stop):
+        with self.app.app_context():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    self.heartbeat(job_id)
+                except SQLAlchemyError as e:
+                    print(f"[JobQueue] Heartbeat for job {job_id} failed: {e}")
+                    db.session.rollback()
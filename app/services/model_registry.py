@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+
+# Models loaded by warm_up() at app start: comma-separated names, "all", or empty for none
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', '')
+
+SUMMARIZATION_MODEL = os.environ.get('SUMMARIZATION_MODEL', 'facebook/bart-large-cnn')
+KEYBERT_MODEL = os.environ.get('KEYBERT_MODEL', 'all-MiniLM-L6-v2')
+
+
+def current_rss_bytes():
+    """Resident memory of this process, or None where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def parameter_bytes(model):
+    """
+    Size of a model's weights in bytes.
+
+    Args:
+        model: A torch module, or a wrapper holding one as .model / .embedding_model
+            (transformers pipelines, KeyBERT).
+
+    Returns:
+        int | None: Total parameter and buffer bytes, or None if no torch module is found.
+    """
+    for _ in range(3):
+        if callable(getattr(model, 'parameters', None)):
+            tensors = list(model.parameters()) + list(getattr(model, 'buffers', lambda: [])())
+            return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+        model = getattr(model, 'model', None) or getattr(model, 'embedding_model', None)
+        if model is None:
+            return None
+    return None
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of named models, each loaded at most once.
+
+    Loaders are registered up front and run on the first get(), under a per-model lock,
+    so concurrent requests never build a second copy. warm_up() loads models ahead of
+    the first request; called at app start under gunicorn --preload it runs once in the
+    master, and the forked workers share the loaded weights copy-on-write.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Register a model loader.
+
+        Args:
+            name (str): Registry key, e.g. 'summarizer'.
+            loader (callable): Zero-argument function that imports and builds the model.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """Return the named model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                rss_before = current_rss_bytes()
+                started = time.perf_counter()
+                model = self._loaders[name]()
+                load_seconds = time.perf_counter() - started
+                rss_after = current_rss_bytes()
+
+                self._stats[name] = {
+                    'load_seconds': round(load_seconds, 3),
+                    'parameter_bytes': parameter_bytes(model),
+                    'rss_delta_bytes': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+                    'loaded_at': time.time(),
+                }
+                self._models[name] = model
+                print(f"[INFO] Loaded model '{name}' in {load_seconds:.2f}s")
+        return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warm_up(self, names=None):
+        """
+        Load models ahead of the first request.
+
+        Args:
+            names (list[str] | None): Models to load; all registered models if None.
+
+        Returns:
+            dict: name -> None when loaded, or the error message if loading failed.
+        """
+        results = {}
+        for name in (list(self._loaders) if names is None else names):
+            try:
+                self.get(name)
+                results[name] = None
+            except Exception as e:
+                print(f"[ERROR] Warm-up of model '{name}' failed: {e}")
+                results[name] = str(e)
+        return results
+
+    def unload(self, name):
+        """Drop a loaded model so the next get() loads it again"""
+        with self._locks.get(name, self._lock):
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def memory_report(self):
+        """
+        Load state and memory use of every registered model.
+
+        Returns:
+            dict: 'models' (name -> loaded, load_seconds, parameter_bytes, rss_delta_bytes)
+            and 'process_rss_bytes'. rss_delta_bytes is the resident memory added while the
+            model loaded, including the libraries imported for it.
+        """
+        report = {}
+        for name in self._loaders:
+            stats = self._stats.get(name)
+            report[name] = {'loaded': stats is not None, **(stats or {})}
+        return {'models': report, 'process_rss_bytes': current_rss_bytes()}
+
+
+def load_summarizer():
+    # The backend (fp32 / int8) is chosen in the summarize service
+    from app.services.summarize import load_summarizer as load_summarization_backend
+    return load_summarization_backend()
+
+
+def load_keybert():
+    from keybert import KeyBERT
+    return KeyBERT(model=KEYBERT_MODEL)
+
+
+models = ModelRegistry()
+models.register('summarizer', load_summarizer)
+models.register('keybert', load_keybert)
+
+
+def warm_up_models(setting=MODEL_WARMUP):
+    """
+    App-start hook: load the models named in MODEL_WARMUP.
+
+    Args:
+        setting (str): Comma-separated model names, "all", or empty to load lazily.
+
+    Returns:
+        dict: warm_up() results, empty when nothing was requested.
+    """
+    setting = (setting or '').strip()
+    if not setting:
+        return {}
+    names = None if setting == 'all' else [name.strip() for name in setting.split(',') if name.strip()]
+    return models.warm_up(names)
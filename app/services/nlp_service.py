@@ -0,0 +1,527 @@
+import os
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import lru_cache
+import numpy as np
+
+# Entry bounds for the process-wide normalization caches
+LEMMA_CACHE_SIZE = int(os.environ.get('LEMMA_CACHE_SIZE', 50_000))
+PHRASE_CACHE_SIZE = int(os.environ.get('PHRASE_CACHE_SIZE', 200_000))
+
+# Question-number patterns stripped from the start of a phrase, in the order they are applied
+QUESTION_NUMBER_PATTERNS = [
+    r'\d+\.?\s*',                 # "1. " or "1 "
+    r'Q\d+\.?\s*',                # "Q1. "
+    r'Question\s*\d+\.?\s*',      # "Question 1: "
+    r'\d+\s*[\)\]\}]\s*',         # "1) " or "1] "
+    r'[a-z]\)\s*',                # "a) "
+]
+
+# Instruction words stripped from the start of a phrase, in the order they are applied
+QUESTION_PREFIX_PATTERNS = [
+    r'what\s+is\s+', r'define\s+', r'explain\s+', r'describe\s+',
+    r'write\s+short\s+note\s+on\s+', r'discuss\s+', r'list\s+',
+    r'briefly\s+explain\s+', r'give\s+', r'state\s+', r'mention\s+',
+    r'how\s+', r'why\s+', r'when\s+', r'where\s+'
+]
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+
+    Finds every occurrence of every keyword - overlapping ones included - in a single
+    left-to-right pass over the text, so matching cost grows with the text length
+    rather than text length x number of keywords. Matching is case-sensitive; lowercase
+    both the keywords and the text for case-insensitive use.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword in sorted(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = (keyword,)
+
+        # Breadth-first pass: failure links, and each state inherits the outputs of its failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def _step(self, state, char):
+        goto, fail = self._goto, self._fail
+        while state and char not in goto[state]:
+            state = fail[state]
+        return goto[state].get(char, 0)
+
+    def finditer(self, text):
+        """
+        Yield every keyword occurrence in text.
+
+        Args:
+            text (str): Text to scan.
+
+        Yields:
+            tuple[int, int, str]: (start, end, keyword) with text[start:end] == keyword,
+            in order of their end position.
+        """
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for index, char in enumerate(text):
+            # _step, inlined - this loop runs once per character of every document
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for keyword in output[state]:
+                    yield index + 1 - len(keyword), index + 1, keyword
+
+    def search(self, text):
+        """Return True if any keyword occurs in text"""
+        state = 0
+        output = self._output
+        for char in text:
+            state = self._step(state, char)
+            if output[state]:
+                return True
+        return False
+
+    def found(self, text):
+        """Return the set of keywords that occur in text"""
+        return {keyword for _, _, keyword in self.finditer(text)}
+
+
+class PhraseCleaner:
+    """
+    Strips question numbers, instruction words and marks references from candidate topic phrases.
+
+    The leading patterns are compiled into a single anchored regex of optional groups. Each
+    group is greedy and every later group may match empty, so the regex never backtracks
+    into an earlier group and strips exactly what applying the patterns one after another
+    would. The marks patterns only run when the phrase mentions "mark".
+
+    Args:
+        stopwords (set[str]): Lowercase phrases rejected after cleaning (kept by reference).
+    """
+
+    LEADING = re.compile(
+        '^' + ''.join(f'(?:{pattern})?' for pattern in QUESTION_NUMBER_PATTERNS + QUESTION_PREFIX_PATTERNS),
+        re.IGNORECASE
+    )
+    ONLY_DIGITS = re.compile(r'^\d+$')
+    # Applied in this order - removing one can expose a match for the next
+    MARKS_SUFFIXES = [
+        re.compile(r'\s*\(\d+\s*marks?\)', re.IGNORECASE),
+        re.compile(r'\s*\[\d+\s*marks?\]', re.IGNORECASE),
+        re.compile(r'\s*\d+\s*marks?$', re.IGNORECASE),
+    ]
+    PUNCTUATION = re.compile(r'[^\w\s-]')
+
+    def __init__(self, stopwords=()):
+        self.stopwords = stopwords
+
+    def clean(self, phrase):
+        """
+        Clean one candidate phrase.
+
+        Args:
+            phrase (str): Raw candidate (an n-gram, capitalized run, keyword context, ...).
+
+        Returns:
+            str | None: The cleaned phrase, or None if nothing topic-like is left.
+        """
+        phrase = phrase.strip()
+
+        # Skip if it's just a number or too short
+        if len(phrase) < 3 or self.ONLY_DIGITS.match(phrase):
+            return None
+
+        phrase = self.LEADING.sub('', phrase, count=1)
+
+        if 'mark' in phrase.lower():
+            for pattern in self.MARKS_SUFFIXES:
+                phrase = pattern.sub('', phrase)
+
+        # Punctuation to spaces, then normalize whitespace
+        words = self.PUNCTUATION.sub(' ', phrase).split()
+        if len(words) < 2:
+            return None
+
+        phrase = ' '.join(words)
+        if phrase.lower() in self.stopwords:
+            return None
+        return phrase
+
+    def clean_batch(self, phrases):
+        """
+        Clean many candidates in one call - repeated candidates are only cleaned once.
+
+        Args:
+            phrases (Iterable[str]): Raw candidates.
+
+        Returns:
+            list[str | None]: clean(phrase) for each input, in order.
+        """
+        cleaned = {}
+        results = []
+        for phrase in phrases:
+            if phrase not in cleaned:
+                cleaned[phrase] = self.clean(phrase)
+            results.append(cleaned[phrase])
+        return results
+
+
+@lru_cache(maxsize=16)
+def get_keyword_matcher(keywords):
+    """Return the shared KeywordMatcher for a frozenset of keywords, building it on first use"""
+    return KeywordMatcher(keywords)
+
+
+class TopicCandidateScanner:
+    """
+    Generates the raw topic candidates of a document in one tokenizer pass.
+
+    The text is turned into a character-class array (word / space / other, as the re
+    module defines \\w and \\s), from which the class runs and the whitespace-separated
+    tokens are taken as offset arrays. All four candidate families come from these arrays:
+
+    1. 2-4 token n-grams that contain an academic keyword (lowercased)
+    2. runs of Capitalized words
+    3. the first 5 words of each statistical-term span, up to the next . ! or ?
+    4. each keyword occurrence with the word around it
+
+    N-grams are deduplicated on token IDs before any string is built, and the keyword
+    context regexes only run at the few positions where a match can start. The output
+    is the same multiset of candidates as the four original regex passes. The few
+    characters that change length when lowercased or case-fold onto ASCII letters are
+    first replaced by those letters, so offsets in the text and its lowercase copy agree.
+
+    Args:
+        keywords (frozenset[str]): Lowercase academic keywords.
+    """
+
+    STAT_TERMS = frozenset({
+        'test', 'analysis', 'method', 'distribution', 'design', 'model', 'algorithm',
+        'theory', 'principle', 'technique', 'approach', 'procedure'
+    })
+    STAT_PATTERN = re.compile(
+        r'\b(?:' + '|'.join(sorted(STAT_TERMS)) + r')\b[^.]*?(?:[.!?]|$)', re.IGNORECASE
+    )
+    CAPITALIZED_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+    STAT_TERM_LENGTHS = sorted({len(term) for term in STAT_TERMS})
+    STAT_TERM_INITIALS = sorted({ord(term[0]) for term in STAT_TERMS})
+    STAT_SPAN_WORDS = 5
+    NGRAM_SIZES = (2, 3, 4)
+
+    # Characters for which lower() changes the length or re.IGNORECASE matches an ASCII letter,
+    # and the ASCII letters they are folded onto before scanning
+    SPECIAL_CASE_CHARS = re.compile('[İıſK]')
+    SPECIAL_CASE_FOLD = str.maketrans({'İ': 'I', 'ı': 'i', 'ſ': 's', '\u212a': 'K'})
+
+    WORD, SPACE, OTHER = 0, 1, 2
+    ASCII_CLASS = np.array(
+        [0 if (chr(c).isalnum() or c == 95) else 1 if chr(c).isspace() else 2 for c in range(128)],
+        dtype=np.uint8
+    )
+
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        self.keyword_matcher = get_keyword_matcher(self.keywords)
+        self.context_patterns = {
+            keyword: re.compile(r'\b\w*\s*' + re.escape(keyword) + r'\s*\w*\b', re.IGNORECASE)
+            for keyword in self.keywords
+        }
+
+    def scan(self, text):
+        """
+        Return the raw topic candidates of a whitespace-normalized text.
+
+        Args:
+            text (str): Document text with every whitespace run already replaced by one space.
+
+        Returns:
+            list[str]: Candidates for PhraseCleaner, in no particular order.
+        """
+        if not text:
+            return []
+        if self.SPECIAL_CASE_CHARS.search(text):
+            text = text.translate(self.SPECIAL_CASE_FOLD)
+
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        char_class = self._classify(codes)
+        lowered = text.lower()
+
+        # Runs of one character class (word / space / other) ...
+        run_starts = np.flatnonzero(np.diff(char_class, prepend=np.uint8(255)))
+        run_ends = np.append(run_starts[1:], len(codes))
+        run_class = char_class[run_starts]
+
+        # ... and whitespace-separated tokens, as used by str.split()
+        edges = np.diff((char_class != self.SPACE).astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+        token_starts = np.flatnonzero(edges == 1)
+        token_ends = np.flatnonzero(edges == -1)
+
+        hits = list(self.keyword_matcher.finditer(lowered))
+        hit_starts = np.fromiter((hit[0] for hit in hits), dtype=np.int64, count=len(hits))
+        hit_ends = np.fromiter((hit[1] for hit in hits), dtype=np.int64, count=len(hits))
+
+        candidates = self._keyword_ngrams(lowered, token_starts, token_ends, hit_starts, hit_ends)
+        candidates += self._capitalized_runs(text, codes, run_starts, run_ends, run_class)
+        candidates += self._stat_spans(text, lowered, codes, run_starts, run_ends, run_class, token_starts, token_ends)
+        candidates += self._keyword_contexts(text, run_starts, run_class, hits, hit_starts)
+        return candidates
+
+    def _classify(self, codes):
+        char_class = np.empty(len(codes), dtype=np.uint8)
+        is_ascii = codes < 128
+        char_class[is_ascii] = self.ASCII_CLASS[codes[is_ascii]]
+        if not is_ascii.all():
+            unique_codes, inverse = np.unique(codes[~is_ascii], return_inverse=True)
+            classes = np.array([
+                self.WORD if chr(c).isalnum() else self.SPACE if chr(c).isspace() else self.OTHER
+                for c in unique_codes.tolist()
+            ], dtype=np.uint8)
+            char_class[~is_ascii] = classes[inverse]
+        return char_class
+
+    def _keyword_ngrams(self, lowered, token_starts, token_ends, hit_starts, hit_ends):
+        """Pattern 1: n-grams containing a keyword hit that starts and ends inside them"""
+        token_count = len(token_starts)
+        if not len(hit_starts) or token_count < 2:
+            return []
+
+        # finditer reports hits by end position: latest hit start among hits ending by each token's end
+        latest_start = np.maximum.accumulate(hit_starts)
+        hits_before = np.searchsorted(hit_ends, token_ends, side='right')
+        latest_hit_start = np.where(hits_before > 0, latest_start[np.maximum(hits_before - 1, 0)], -1)
+
+        vocabulary = {}
+        token_ids = np.fromiter(
+            (vocabulary.setdefault(lowered[start:end], len(vocabulary))
+             for start, end in zip(token_starts.tolist(), token_ends.tolist())),
+            dtype=np.int64, count=token_count
+        )
+
+        # window_ids[i] identifies the n tokens from i on: equal IDs <=> equal n-grams
+        candidates = []
+        window_ids = token_ids
+        for n in self.NGRAM_SIZES:
+            if token_count < n:
+                break
+            window_count = token_count - n + 1
+            _, window_ids = np.unique(window_ids[:window_count] * len(vocabulary) + token_ids[n - 1:],
+                                      return_inverse=True)
+            first = np.flatnonzero(latest_hit_start[n - 1:] >= token_starts[:window_count])
+            # Each distinct n-gram string is built once
+            _, distinct = np.unique(window_ids[first], return_index=True)
+            for i in first[distinct].tolist():
+                candidates.append(lowered[token_starts[i]:token_ends[i + n - 1]])
+        return candidates
+
+    def _capitalized_runs(self, text, codes, run_starts, run_ends, run_class):
+        """Pattern 2: two or more [A-Z][a-z]+ words separated only by whitespace"""
+        is_lower = (codes >= 97) & (codes <= 122)
+        lower_counts = np.concatenate(([0], np.cumsum(is_lower)))
+        starts = np.minimum(run_starts + 1, len(codes))
+
+        capitalized = (
+            (run_class == self.WORD) & (run_ends - run_starts >= 2) &
+            (codes[run_starts] >= 65) & (codes[run_starts] <= 90) &
+            (lower_counts[run_ends] - lower_counts[starts] == run_ends - run_starts - 1)
+        )
+        indices = np.flatnonzero(capitalized)
+        if len(indices) < 2:
+            return []
+
+        # Consecutive capitalized runs chain when exactly one whitespace run lies between them
+        linked = (np.diff(indices) == 2) & (run_class[indices[:-1] + 1] == self.SPACE)
+        chain_starts = np.flatnonzero(np.concatenate(([True], ~linked)))
+        chain_ends = np.append(chain_starts[1:], len(indices)) - 1
+
+        return [
+            text[run_starts[indices[first]]:run_ends[indices[last]]]
+            for first, last in zip(chain_starts.tolist(), chain_ends.tolist())
+            if last > first
+        ]
+
+    def _stat_spans(self, text, lowered, codes, run_starts, run_ends, run_class, token_starts, token_ends):
+        """Pattern 3: statistical term up to the next . ! ? (first 5 words, trailing .,!? stripped)"""
+        # Only word runs with a term's length and first letter are looked up
+        possible = np.flatnonzero(
+            (run_class == self.WORD) &
+            np.isin(run_ends - run_starts, self.STAT_TERM_LENGTHS) &
+            np.isin(codes[np.minimum(run_starts, len(codes) - 1)] | 32, self.STAT_TERM_INITIALS)
+        )
+        if not len(possible):
+            return []
+
+        terminators = np.flatnonzero((codes == 46) | (codes == 33) | (codes == 63)).tolist()
+        token_starts, token_ends = token_starts.tolist(), token_ends.tolist()
+        token_count = len(token_starts)
+
+        candidates = []
+        span_end = 0
+        for start, end in zip(run_starts[possible].tolist(), run_ends[possible].tolist()):
+            if start < span_end or lowered[start:end] not in self.STAT_TERMS:
+                continue
+
+            # Lazy [^.]*? stops at the first terminator, or runs to the end of the text
+            next_terminator = bisect_left(terminators, end)
+            span_end = terminators[next_terminator] + 1 if next_terminator < len(terminators) else len(text)
+
+            token = bisect_right(token_ends, start)
+            words = [text[start:min(token_ends[token], span_end)]]
+            token += 1
+            while len(words) <= self.STAT_SPAN_WORDS and token < token_count and token_starts[token] < span_end:
+                words.append(text[token_starts[token]:min(token_ends[token], span_end)])
+                token += 1
+            if token_ends[token - 1] >= span_end:
+                # The span ends inside its last word, which is included - strip('.,!?') only ever touches it
+                words[-1] = words[-1].rstrip('.,!?')
+                if not words[-1]:
+                    words.pop()
+
+            words = words[:self.STAT_SPAN_WORDS]
+            if len(words) >= 2:
+                candidates.append(' '.join(words))
+        return candidates
+
+    def _keyword_contexts(self, text, run_starts, run_class, hits, hit_starts):
+        """Pattern 4: \\b\\w*\\s*<keyword>\\s*\\w*\\b matches, as findall would return them"""
+        if not hits:
+            return []
+
+        # A match containing a hit can only start at the start of the hit's word run or, when the
+        # hit starts a run, at the hit itself, the whitespace run before it or the word run before that
+        runs = np.searchsorted(run_starts, hit_starts, side='right') - 1
+        inside_run = run_starts[runs] < hit_starts
+        previous_class = run_class[np.maximum(runs - 1, 0)]
+        after_space = ~inside_run & (runs >= 1) & (previous_class == self.SPACE)
+        after_word = after_space & (runs >= 2) & (run_class[np.maximum(runs - 2, 0)] == self.WORD)
+
+        keyword_index = {}
+        keyword_ids = np.fromiter((keyword_index.setdefault(hit[2], len(keyword_index)) for hit in hits),
+                                  dtype=np.int64, count=len(hits))
+        positions = np.concatenate((
+            np.where(inside_run, run_starts[runs], hit_starts),
+            run_starts[runs[after_space] - 1],
+            run_starts[runs[after_word] - 2],
+        ))
+        owners = np.concatenate((keyword_ids, keyword_ids[after_space], keyword_ids[after_word]))
+        # Sorted by keyword, then position
+        order = np.unique(owners * (len(text) + 1) + positions)
+
+        keywords = list(keyword_index)
+        candidates = []
+        current, match_end = -1, 0
+        for owner, start in zip((order // (len(text) + 1)).tolist(), (order % (len(text) + 1)).tolist()):
+            if owner != current:
+                current, match_end = owner, 0
+                pattern = self.context_patterns[keywords[owner]]
+            if start < match_end:
+                continue
+            match = pattern.match(text, start)
+            if match:
+                candidates.append(match.group())
+                match_end = match.end()
+        return candidates
+
+
+@lru_cache(maxsize=16)
+def get_topic_scanner(keywords):
+    """Return the shared TopicCandidateScanner for a frozenset of keywords, building it on first use"""
+    return TopicCandidateScanner(keywords)
+
+
+_lemmatizer = None
+
+
+def get_lemmatizer():
+    """Return the process-wide WordNetLemmatizer, creating it on first use"""
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer
+
+
+@lru_cache(maxsize=1)
+def get_stop_words():
+    """Return NLTK's English stopwords as a frozenset, importing NLTK on first use"""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize_word(word):
+    """WordNet lemma of a single word, memoized for every analyzer in this process"""
+    return get_lemmatizer().lemmatize(word)
+
+
+@lru_cache(maxsize=PHRASE_CACHE_SIZE)
+def normalize_topic_phrase(phrase, stop_words, use_lemmatization=True):
+    """
+    Normalize a topic phrase for matching, memoized for every analyzer in this process.
+
+    Lowercases, drops stop words and words of 2 characters or fewer, sorts short phrases
+    so word order does not matter and lemmatizes the words.
+
+    Args:
+        phrase (str): Cleaned topic phrase.
+        stop_words (frozenset[str]): Words to drop (must be hashable - part of the cache key).
+        use_lemmatization (bool): Lemmatize the remaining words with WordNet.
+
+    Returns:
+        str: Space-joined normalized words (may be empty).
+    """
+    words = phrase.lower().split()
+    filtered_words = [w for w in words if w not in stop_words and len(w) > 2]
+
+    # Sort words to handle different orderings (e.g., "sampling distribution" vs "distribution sampling")
+    if len(filtered_words) <= 3:
+        filtered_words.sort()
+
+    if use_lemmatization and filtered_words:
+        try:
+            filtered_words = [lemmatize_word(word) for word in filtered_words]
+        except Exception:
+            # WordNet data missing - keep the words as they are
+            pass
+
+    return ' '.join(filtered_words)
+
+
+def normalization_cache_stats():
+    """Return hit/miss counters, hit rate and size of the lemma and phrase caches in this process"""
+    stats = {}
+    for name, cached in (('lemma', lemmatize_word), ('phrase', normalize_topic_phrase)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'entries': info.currsize,
+            'max_entries': info.maxsize
+        }
+    return stats
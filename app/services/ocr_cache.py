@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import numpy as np
+from app.services.sqlite_store import connect, evict_lru
+
+OCR_CACHE_PATH = os.environ.get(
+    'OCR_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'papalyze_ocr_cache.sqlite3')
+)
+OCR_CACHE_MAX_BYTES = int(os.environ.get('OCR_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+def make_cache_key(pixels, **params):
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        pixels (np.ndarray): Decoded page pixels.
+        **params: OCR parameters that affect the result (preprocessing, PSM modes, ...).
+
+    Returns:
+        str: Hex SHA-256 digest of the pixels, their shape and the parameters.
+    """
+    pixels = np.ascontiguousarray(pixels)
+    digest = hashlib.sha256()
+    digest.update(f"{pixels.shape}|{pixels.dtype}".encode())
+    digest.update(memoryview(pixels).cast('B'))
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Persistent OCR result cache in a local SQLite file.
+
+    Entries hold (text, confidence, method) and are evicted least-recently-used
+    first once the stored text exceeds max_bytes. Hit/miss counters are kept in
+    the same file so every worker process contributes to one set of stats.
+    """
+
+    def __init__(self, path=OCR_CACHE_PATH, max_bytes=OCR_CACHE_MAX_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        with connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_results (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    method TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_results_access ON ocr_results (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS ocr_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO ocr_stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+
+    def get(self, key):
+        """Return (text, confidence, method) for key, or None on a miss"""
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT text, confidence, method FROM ocr_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                conn.execute("UPDATE ocr_stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            conn.execute("UPDATE ocr_results SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.execute("UPDATE ocr_stats SET value = value + 1 WHERE name = 'hits'")
+            return row[0], row[1], row[2]
+
+    def put(self, key, text, confidence, method):
+        """Store a result for key - an empty one (no text or no winning method) is not stored"""
+        if not text or not method:
+            return
+        size = len(text.encode('utf-8'))
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, float(confidence), method, size, time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        evicted = evict_lru(conn, 'ocr_results', self.max_bytes)
+        if evicted:
+            conn.execute("UPDATE ocr_stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    def stats(self):
+        """Return hit/miss counters, hit rate and current size of the cache"""
+        with connect(self.path) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM ocr_stats").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+            ).fetchone()
+
+        lookups = counters.get('hits', 0) + counters.get('misses', 0)
+        return {
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'evictions': counters.get('evictions', 0),
+            'hit_rate': counters.get('hits', 0) / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes
+        }
+
+    def clear(self):
+        with connect(self.path) as conn:
+            conn.execute("DELETE FROM ocr_results")
+            conn.execute("UPDATE ocr_stats SET value = 0")
+
+
+_cache = None
+
+
+def get_ocr_cache():
+    """Return the process-wide OCRCache, or None when OCR_CACHE_ENABLED=0"""
+    global _cache
+    if os.environ.get('OCR_CACHE_ENABLED', '1') == '0':
+        return None
+    if _cache is None:
+        _cache = OCRCache()
+    return _cache
@@ -0,0 +1,265 @@
+import os
+import platform
+import threading
+from functools import lru_cache
+import cv2
+import numpy as np
+from PIL import Image
+
+# libtesseract's OpenMP runtime reads this once, when the library is loaded. OCR already runs
+# one page per worker process, and extra OpenMP threads per page only contend for the cores.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+try:
+    import tesserocr
+except ImportError:
+    # Optional: without the libtesseract bindings we fall back to the pytesseract CLI wrapper
+    tesserocr = None
+
+
+@lru_cache(maxsize=1)
+def get_pytesseract():
+    """
+    Import and configure pytesseract on first use.
+
+    It is only needed when tesserocr is missing, and importing it also imports pandas,
+    which would otherwise add almost half a second to every app start.
+    """
+    import pytesseract
+
+    if platform.system() == "Windows":
+        # Change this path to your local tesseract installation path
+        pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+    else:
+        # Linux / Docker environment path
+        pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
+    return pytesseract
+
+
+TESSERACT_LANG = os.environ.get('TESSERACT_LANG', 'eng')
+
+# Tesseract is most accurate with a text x-height of roughly 20-30 pixels
+TEXT_HEIGHT_TARGET = int(os.environ.get('OCR_TEXT_HEIGHT', 24))
+TEXT_HEIGHT_PROBE_WIDTH = 1200
+
+# Column order of tesseract's TSV output (same keys as pytesseract.Output.DICT)
+TSV_COLUMNS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text']
+
+
+def to_pixel_array(image):
+    """
+    Convert an image to a contiguous uint8 NumPy array (gray or RGB).
+
+    Args:
+        image (np.ndarray | PIL.Image.Image): Raw pixel buffer or PIL image.
+
+    Returns:
+        np.ndarray: 2D (gray) or 3D (RGB/RGBA) uint8 array.
+    """
+    if isinstance(image, Image.Image):
+        if image.mode not in ('L', 'RGB', 'RGBA'):
+            image = image.convert('RGB')
+        image = np.asarray(image)
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+def load_grayscale(image):
+    """
+    Decode a page straight into a grayscale uint8 array, without temp files.
+
+    Args:
+        image: One of
+            - str / os.PathLike: image file on disk
+            - bytes / bytearray / memoryview: encoded image file contents (PNG, JPEG, ...)
+            - PIL.Image.Image
+            - np.ndarray: 2D gray, or 3/4-channel BGR(A) in OpenCV channel order
+
+    Returns:
+        np.ndarray | None: 2D uint8 array, or None when the image cannot be decoded.
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return image
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    if isinstance(image, Image.Image):
+        return np.asarray(image if image.mode == 'L' else image.convert('L'))
+
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    return cv2.imread(os.fspath(image), cv2.IMREAD_GRAYSCALE)
+
+
+def estimate_text_height(gray):
+    """
+    Estimate the typical text height of a page in pixels.
+
+    Binarizes a downscaled copy of the page and takes the median height of the
+    connected components that are shaped like characters.
+
+    Args:
+        gray (np.ndarray): 2D uint8 page.
+
+    Returns:
+        float | None: Median character height at the page's resolution, or None
+        when the page has too few character-like components (blank or photo).
+    """
+    height, width = gray.shape
+    probe_scale = min(1.0, TEXT_HEIGHT_PROBE_WIDTH / width)
+    probe = gray
+    if probe_scale < 1.0:
+        probe = cv2.resize(gray, (int(width * probe_scale), int(height * probe_scale)), interpolation=cv2.INTER_AREA)
+
+    _, binary = cv2.threshold(probe, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+    comp_w = stats[1:, cv2.CC_STAT_WIDTH]
+    comp_h = stats[1:, cv2.CC_STAT_HEIGHT]
+    # Character-like: not specks, not lines/rules, not large figures
+    is_char = (
+        (comp_h >= 3) & (comp_h <= probe.shape[0] / 10) &
+        (comp_w >= 1) & (comp_w <= comp_h * 3) & (comp_h <= comp_w * 8)
+    )
+    if is_char.sum() < 20:
+        return None
+
+    return float(np.median(comp_h[is_char])) / probe_scale
+
+
+def normalize_resolution(gray, target_height=TEXT_HEIGHT_TARGET):
+    """
+    Rescale a page so its text is about target_height pixels tall.
+
+    Large photos and high-dpi renders are shrunk (cutting the cost of every later
+    stage), tiny scans are enlarged. Pages without measurable text fall back to
+    upscaling only when they are below 800x600.
+    """
+    height, width = gray.shape
+    text_height = estimate_text_height(gray)
+
+    if text_height is None:
+        if height < 800 or width < 600:
+            scale_factor = max(800/height, 600/width, 1.5)
+        else:
+            return gray
+    else:
+        scale_factor = min(max(target_height / text_height, 0.25), 4.0)
+        # Close enough - not worth a resample
+        if 0.85 <= scale_factor <= 1.15:
+            return gray
+
+    new_size = (max(1, int(width * scale_factor)), max(1, int(height * scale_factor)))
+    interpolation = cv2.INTER_AREA if scale_factor < 1 else cv2.INTER_CUBIC
+    return cv2.resize(gray, new_size, interpolation=interpolation)
+
+
+def parse_tsv(tsv_text):
+    """Parse tesseract TSV output into a pytesseract-style dict of columns"""
+    data = {column: [] for column in TSV_COLUMNS}
+    for row in tsv_text.splitlines():
+        fields = row.split('\t')
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == 'level':
+            continue
+        if len(fields) == len(TSV_COLUMNS) - 1:
+            fields.append('')
+        for column, value in zip(TSV_COLUMNS, fields):
+            if column == 'text':
+                data[column].append(value)
+            elif column == 'conf':
+                data[column].append(float(value))
+            else:
+                data[column].append(int(value))
+    return data
+
+
+class TesseractEngine:
+    """
+    A long-lived Tesseract instance that keeps the language model loaded.
+
+    With tesserocr installed the engine wraps libtesseract in-process, so each
+    call only pays for recognition - no process start, temp image or traineddata
+    reload. Without it, calls go through pytesseract (one subprocess per call).
+
+    An engine is not thread-safe; use get_engine() to get one per worker thread.
+    """
+
+    def __init__(self, lang=TESSERACT_LANG, oem=3, dpi=300):
+        self.lang = lang
+        self.oem = oem
+        self.dpi = dpi
+        self.api = None
+        if tesserocr is not None:
+            self.api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+
+    @property
+    def in_process(self):
+        return self.api is not None
+
+    def _set_image(self, image, psm, whitelist):
+        pixels = to_pixel_array(image)
+        height, width = pixels.shape[:2]
+        bytes_per_pixel = 1 if pixels.ndim == 2 else pixels.shape[2]
+
+        self.api.SetPageSegMode(psm)
+        self.api.SetVariable('tessedit_char_whitelist', whitelist or '')
+        self.api.SetImageBytes(pixels.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        self.api.SetSourceResolution(self.dpi)
+
+    def _cli_config(self, psm, whitelist):
+        config = f'--oem {self.oem} --psm {psm}'
+        if whitelist:
+            config += f' -c tessedit_char_whitelist="{whitelist}"'
+        return config
+
+    def image_to_data(self, image, psm=3, whitelist=None):
+        """
+        Run OCR and return word-level results.
+
+        Args:
+            image (np.ndarray | PIL.Image.Image): Page or crop to recognise.
+            psm (int): Tesseract page segmentation mode.
+            whitelist (str | None): Restrict recognition to these characters.
+
+        Returns:
+            dict: Columns of pytesseract.Output.DICT ('text', 'conf', 'block_num', ...).
+        """
+        if not self.in_process:
+            pytesseract = get_pytesseract()
+            return pytesseract.image_to_data(
+                to_pixel_array(image), lang=self.lang,
+                config=self._cli_config(psm, whitelist), output_type=pytesseract.Output.DICT
+            )
+
+        self._set_image(image, psm, whitelist)
+        return parse_tsv(self.api.GetTSVText(0))
+
+    def image_to_string(self, image, psm=3, whitelist=None):
+        """Run OCR and return the recognised text"""
+        if not self.in_process:
+            return get_pytesseract().image_to_string(
+                to_pixel_array(image), lang=self.lang, config=self._cli_config(psm, whitelist)
+            )
+
+        self._set_image(image, psm, whitelist)
+        return self.api.GetUTF8Text()
+
+    def close(self):
+        if self.api is not None:
+            self.api.End()
+            self.api = None
+
+
+_local = threading.local()
+
+
+def get_engine():
+    """Return this thread's resident TesseractEngine, creating it on first use"""
+    engine = getattr(_local, 'engine', None)
+    if engine is None:
+        engine = TesseractEngine()
+        _local.engine = engine
+    return engine
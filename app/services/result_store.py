@@ -0,0 +1,57 @@
+import os
+import json
+import zlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from app.extensions import db
+from app.models import AnalysisResult
+
+# Finished reports are kept this long (seconds) before being purged
+RESULT_TTL = int(os.environ.get('RESULT_TTL', 7 * 24 * 3600))
+
+
+class ResultStore:
+    """
+    Server-side store for analysis results, kept zlib-compressed in the app database.
+
+    Results are keyed by an opaque random ID, so only that ID needs to travel in the
+    session cookie or URL however large the report is. Entries older than ttl seconds
+    are purged whenever a new result is saved.
+    """
+
+    def __init__(self, ttl=RESULT_TTL):
+        self.ttl = ttl
+
+    def _expired_before(self):
+        # Naive UTC, as the DateTime columns hand it back
+        return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.ttl)
+
+    def save(self, result, user_id=None):
+        """
+        Compress and store a result.
+
+        Args:
+            result (dict): JSON-serializable analysis result.
+            user_id (int | None): Owner; load() only returns the result to this user.
+
+        Returns:
+            str: Opaque result ID.
+        """
+        result_id = secrets.token_urlsafe(16)
+        data = zlib.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'), 6)
+        db.session.add(AnalysisResult(id=result_id, user_id=user_id, data=data))
+        db.session.execute(delete(AnalysisResult).where(AnalysisResult.created_at < self._expired_before()))
+        db.session.commit()
+        return result_id
+
+    def load(self, result_id, user_id=None):
+        """Return the stored result, or None if it is unknown, expired or owned by another user"""
+        row = db.session.get(AnalysisResult, result_id)
+        if row is None or row.user_id != user_id or row.created_at < self._expired_before():
+            return None
+        return json.loads(zlib.decompress(row.data).decode('utf-8'))
+
+    def delete(self, result_id):
+        db.session.execute(delete(AnalysisResult).where(AnalysisResult.id == result_id))
+        db.session.commit()
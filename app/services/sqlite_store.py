@@ -0,0 +1,52 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect(path):
+    """
+    Open a short-lived WAL connection to a local SQLite file and run one transaction.
+
+    A connection per call keeps the file-backed caches safe across threads and forked
+    workers. The transaction commits when the block exits and rolls back if it raises.
+
+    Args:
+        path (str): SQLite file.
+
+    Yields:
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def evict_lru(conn, table, max_bytes):
+    """
+    Delete the least-recently-used rows of a cache table until it fits in max_bytes.
+
+    Args:
+        conn (sqlite3.Connection): Open connection, inside the caller's transaction.
+        table (str): Table with key, size and last_access columns.
+        max_bytes (int): Size budget for the sum of the size column.
+
+    Returns:
+        int: Number of rows evicted.
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+
+    evicted = 0
+    rows = conn.execute(f"SELECT key, size FROM {table} ORDER BY last_access ASC").fetchall()
+    for key, size in rows:
+        if total <= max_bytes:
+            break
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        total -= size
+        evicted += 1
+    return evicted
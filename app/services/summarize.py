@@ -1,21 +1,276 @@
-from transformers import pipeline
+import gc
+import os
+import re
+import ctypes
+from app.services.model_registry import models, SUMMARIZATION_MODEL
+from app.services.summary_cache import get_summary_cache, make_summary_key
 
-# Load summarization pipeline (only once at startup)
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+# Generation settings for every summarizer call
+SUMMARY_MAX_LENGTH = 150
+SUMMARY_MIN_LENGTH = 50
 
-def generate_summary(text):
+# Chunks are filled with whole sentences up to this many tokens (BART reads at most 1024)
+CHUNK_MAX_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', 900))
+
+# Chunks summarized per padded batch
+SUMMARY_BATCH_SIZE = int(os.environ.get('SUMMARY_BATCH_SIZE', 4))
+
+# 'concat' joins the chunk summaries, 'map_reduce' summarizes them again until they fit in
+# one chunk, 'auto' uses map_reduce once a document has MAP_REDUCE_MIN_CHUNKS chunks
+SUMMARY_MODE = os.environ.get('SUMMARY_MODE', 'auto')
+MAP_REDUCE_MIN_CHUNKS = int(os.environ.get('SUMMARY_MAP_REDUCE_CHUNKS', 6))
+MAX_REDUCE_ROUNDS = 3
+
+# Sentence ends (.!? then whitespace) and paragraph breaks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+
+# Inference backend: 'fp32' (the plain transformers pipeline) or 'int8' (the same model with
+# its Linear layers dynamically quantized to int8 - for CPU-only servers)
+SUMMARY_BACKEND = os.environ.get('SUMMARY_BACKEND', 'fp32')
+
+# Torch intra-op threads per process (0 keeps torch's default of one per core)
+SUMMARY_TORCH_THREADS = int(os.environ.get('SUMMARY_TORCH_THREADS', 0))
+
+
+def get_summarizer():
+    """
+    Return the summarization pipeline from the model registry.
+
+    Importing transformers and loading the BART weights takes several seconds, so it
+    happens once per process, on the first summary request or at warm-up.
+    """
+    return models.get('summarizer')
+
+
+def load_fp32_pipeline(model_name):
+    """The unmodified Hugging Face summarization pipeline"""
+    from transformers import pipeline
+    return pipeline("summarization", model=model_name)
+
+
+def load_int8_pipeline(model_name):
+    """
+    Summarization pipeline on a dynamically int8-quantized copy of the model.
+
+    Linear layer weights are stored as int8 and activations are quantized on the fly,
+    which cuts weight memory to about a quarter and speeds up CPU matmuls. Runs on CPU only.
+    """
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_name, state_dict=read_checkpoint(model_name), torch_dtype=torch.float32
+    )
+    model.eval()
+    # In place, so the fp32 Linear weights are released instead of kept alongside the copy
+    torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    release_freed_memory()
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
+
+
+def read_checkpoint(model_name):
+    """
+    Load a single-file safetensors checkpoint as a state dict, straight from its path.
+
+    from_pretrained memory-maps safetensors files, and the mapping stays resident after
+    quantization has replaced the fp32 weights. Passing the state dict in lets those
+    weights be freed. load_file reads the tensors from the path, so the raw file bytes
+    are never held next to them. Returns None (normal loading) for other checkpoint layouts.
+    """
+    from safetensors.torch import load_file
+    from transformers.utils import cached_file
+
+    try:
+        path = cached_file(model_name, 'model.safetensors')
+    except OSError:
+        return None
+    if path is None:
+        return None
+    return load_file(path)
+
+
+def release_freed_memory():
+    """Hand memory freed by dropped fp32 weights back to the OS (glibc keeps it otherwise)"""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+SUMMARY_BACKENDS = {
+    'fp32': load_fp32_pipeline,
+    'int8': load_int8_pipeline,
+}
+
+
+def load_summarizer(backend=None, model_name=None):
+    """
+    Build a summarization pipeline with the configured backend.
+
+    Args:
+        backend (str | None): A SUMMARY_BACKENDS key; SUMMARY_BACKEND if None.
+        model_name (str | None): Hub name or local directory; SUMMARIZATION_MODEL if None.
+
+    Returns:
+        A pipeline object: callable on a list of texts, with a .tokenizer.
+    """
+    backend = backend or SUMMARY_BACKEND
+    if backend not in SUMMARY_BACKENDS:
+        raise ValueError(f"Unknown summary backend '{backend}', expected one of {sorted(SUMMARY_BACKENDS)}")
+
+    if SUMMARY_TORCH_THREADS:
+        import torch
+        torch.set_num_threads(SUMMARY_TORCH_THREADS)
+    return SUMMARY_BACKENDS[backend](model_name or SUMMARIZATION_MODEL)
+
+
+def split_sentences(text):
+    """Split text into sentences, with whitespace inside each sentence collapsed"""
+    sentences = (' '.join(part.split()) for part in SENTENCE_BOUNDARY.split(text))
+    return [sentence for sentence in sentences if sentence]
+
+
+def pack_sentences(sentences, token_counts, max_tokens=CHUNK_MAX_TOKENS):
+    """
+    Group consecutive sentences into chunks of at most max_tokens tokens.
+
+    Args:
+        sentences (list[str]): Sentences in document order.
+        token_counts (list[int]): Token count of each sentence.
+        max_tokens (int): Chunk budget. A sentence longer than this gets a chunk of its own.
+
+    Returns:
+        list[list[int]]: Sentence indices of each chunk.
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for index, count in enumerate(token_counts):
+        if current and current_tokens + count > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += count
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_text(text, tokenizer, max_tokens=CHUNK_MAX_TOKENS):
+    """
+    Split text into chunks that end on sentence boundaries and fit the model's input.
+
+    Sentences are tokenized in one batch call. A sentence longer than max_tokens is
+    cut into max_tokens windows of its own tokens.
+
+    Args:
+        text (str): Notes or extracted PDF text.
+        tokenizer: The summarizer's Hugging Face tokenizer.
+        max_tokens (int): Token budget per chunk.
+
+    Returns:
+        list[str]: Chunk texts in document order.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    token_ids = tokenizer(sentences, add_special_tokens=False)['input_ids']
+
+    pieces, counts = [], []
+    for sentence, ids in zip(sentences, token_ids):
+        if len(ids) <= max_tokens:
+            pieces.append(sentence)
+            counts.append(len(ids))
+            continue
+        for start in range(0, len(ids), max_tokens):
+            window = ids[start:start + max_tokens]
+            pieces.append(tokenizer.decode(window, skip_special_tokens=True).strip())
+            counts.append(len(window))
+
+    return [' '.join(pieces[i] for i in chunk) for chunk in pack_sentences(pieces, counts, max_tokens)]
+
+
+def generation_params():
+    """Settings that change a chunk's summary - part of every summary cache key"""
+    return {
+        'model': SUMMARIZATION_MODEL,
+        'backend': SUMMARY_BACKEND,
+        'max_length': SUMMARY_MAX_LENGTH,
+        'min_length': SUMMARY_MIN_LENGTH,
+    }
+
+
+def summarize_chunks(summarizer, chunks, cache=None):
+    """
+    Summarize chunks in padded batches of SUMMARY_BATCH_SIZE, keeping their order.
+
+    Args:
+        summarizer: The summarization pipeline.
+        chunks (list[str]): Chunk texts.
+        cache (SummaryCache | None): Chunks already summarized with the same settings are
+            read from here, and only the rest go through the model.
+
+    Returns:
+        list[str]: One summary per chunk.
+    """
+    if not chunks:
+        return []
+
+    params = generation_params()
+    keys = [make_summary_key(chunk, **params) for chunk in chunks]
+    summaries = cache.get_many(keys, 'chunk') if cache is not None else [None] * len(chunks)
+
+    # Identical chunks are summarized once
+    missing = list(dict.fromkeys(chunks[i] for i, summary in enumerate(summaries) if summary is None))
+    if missing:
+        outputs = summarizer(
+            missing, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, do_sample=False,
+            truncation=True, batch_size=SUMMARY_BATCH_SIZE
+        )
+        fresh = {chunk: output['summary_text'] for chunk, output in zip(missing, outputs)}
+        if cache is not None:
+            cache.put_many([(make_summary_key(chunk, **params), summary) for chunk, summary in fresh.items()], 'chunk')
+        summaries = [summary if summary is not None else fresh[chunk] for chunk, summary in zip(chunks, summaries)]
+    return summaries
+
+
+def generate_summary(text, mode=None):
     """
     text: str -> notes or extracted PDF text
+    mode: str | None -> 'concat', 'map_reduce' or 'auto' (default: SUMMARY_MODE)
     returns: str -> summary
     """
-    # Split long text into chunks of ~500-1000 words if necessary
-    max_chunk = 1000
-    chunks = [text[i:i+max_chunk] for i in range(0, len(text), max_chunk)]
+    mode = mode or SUMMARY_MODE
+
+    # A document seen before with the same settings needs neither the model nor chunking
+    cache = get_summary_cache()
+    document_key = make_summary_key(
+        text, **generation_params(), mode=mode, chunk_tokens=CHUNK_MAX_TOKENS,
+        map_reduce_min_chunks=MAP_REDUCE_MIN_CHUNKS
+    )
+    if cache is not None:
+        cached = cache.get(document_key, 'document')
+        if cached is not None:
+            return cached
+
+    summarizer = get_summarizer()
+    tokenizer = summarizer.tokenizer
+
+    chunks = chunk_text(text, tokenizer)
+    summaries = summarize_chunks(summarizer, chunks, cache)
+
+    reduce = mode == 'map_reduce' or (mode == 'auto' and len(chunks) >= MAP_REDUCE_MIN_CHUNKS)
+    if reduce:
+        # Hierarchical map-reduce: summarize the chunk summaries until they fit in one chunk
+        for _ in range(MAX_REDUCE_ROUNDS):
+            if len(summaries) <= 1:
+                break
+            summaries = summarize_chunks(summarizer, chunk_text(' '.join(summaries), tokenizer), cache)
 
-    summaries = []
-    for chunk in chunks:
-        summary = summarizer(chunk, max_length=150, min_length=50, do_sample=False)
-        summaries.append(summary[0]['summary_text'])
-    
     # Combine all chunks
-    return " ".join(summaries)
+    summary = " ".join(summaries)
+    if cache is not None:
+        cache.put(document_key, summary, 'document')
+    return summary
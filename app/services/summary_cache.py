@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from app.services.sqlite_store import connect, evict_lru
+
+SUMMARY_CACHE_PATH = os.environ.get(
+    'SUMMARY_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'papalyze_summary_cache.sqlite3')
+)
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get('SUMMARY_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+SUMMARY_CACHE_TTL = int(os.environ.get('SUMMARY_CACHE_TTL', 30 * 24 * 3600))
+
+# Keys per SELECT ... IN (...) lookup
+LOOKUP_BATCH = 500
+
+# Entry kinds: one summary per chunk, and the final summary of a whole document
+KINDS = ('chunk', 'document')
+
+
+def make_summary_key(text, **params):
+    """
+    Build a content-addressed summary cache key.
+
+    Args:
+        text (str): Chunk or document text. Whitespace is normalized first, so re-extracted
+            text that only differs in spacing or line breaks maps to the same key.
+        **params: Generation parameters that affect the summary (model, lengths, mode, ...).
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized text and the parameters.
+    """
+    digest = hashlib.sha256()
+    digest.update(' '.join(text.split()).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent summary cache in a local SQLite file.
+
+    Chunk summaries and whole-document summaries are stored separately, so an edited
+    document only re-summarizes the chunks whose text changed. Entries expire ttl
+    seconds after they were written and are evicted least-recently-used first once the
+    stored summaries exceed max_bytes. Hit/miss counters per kind are kept in the same
+    file so every worker process contributes to one set of stats.
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, max_bytes=SUMMARY_CACHE_MAX_BYTES, ttl=SUMMARY_CACHE_TTL):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        with connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_access ON summaries (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_created ON summaries (created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS summary_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO summary_stats VALUES (?, 0)",
+                [(f'{kind}_{counter}',) for kind in KINDS for counter in ('hits', 'misses')] +
+                [('evictions',), ('expirations',)]
+            )
+
+    def get_many(self, keys, kind):
+        """
+        Look up several summaries in one transaction.
+
+        Args:
+            keys (list[str]): Keys from make_summary_key().
+            kind (str): 'chunk' or 'document' - selects the hit/miss counters.
+
+        Returns:
+            list[str | None]: The cached summary for each key, None on a miss or expired entry.
+        """
+        if not keys:
+            return []
+
+        now = time.time()
+        unique_keys = list(dict.fromkeys(keys))
+        rows = {}
+        with connect(self.path) as conn:
+            # Batched to stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), LOOKUP_BATCH):
+                batch = unique_keys[start:start + LOOKUP_BATCH]
+                rows.update(conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({', '.join('?' * len(batch))}) AND created_at >= ?",
+                    batch + [now - self.ttl]
+                ).fetchall())
+
+            found = [key for key in keys if key in rows]
+            if found:
+                conn.executemany("UPDATE summaries SET last_access = ? WHERE key = ?", [(now, key) for key in set(found)])
+            conn.execute(f"UPDATE summary_stats SET value = value + ? WHERE name = '{kind}_hits'", (len(found),))
+            conn.execute(f"UPDATE summary_stats SET value = value + ? WHERE name = '{kind}_misses'", (len(keys) - len(found),))
+        return [rows.get(key) for key in keys]
+
+    def get(self, key, kind):
+        """Return the cached summary for key, or None on a miss"""
+        return self.get_many([key], kind)[0]
+
+    def put_many(self, entries, kind):
+        """
+        Store summaries.
+
+        Args:
+            entries (list[tuple[str, str]]): (key, summary) pairs.
+            kind (str): 'chunk' or 'document'.
+        """
+        if not entries:
+            return
+        now = time.time()
+        with connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, kind, summary, len(summary.encode('utf-8')), now, now) for key, summary in entries]
+            )
+            self._evict(conn, now)
+
+    def put(self, key, summary, kind):
+        self.put_many([(key, summary)], kind)
+
+    def _evict(self, conn, now):
+        expired = conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.ttl,)).rowcount
+        if expired:
+            conn.execute("UPDATE summary_stats SET value = value + ? WHERE name = 'expirations'", (expired,))
+
+        evicted = evict_lru(conn, 'summaries', self.max_bytes)
+        if evicted:
+            conn.execute("UPDATE summary_stats SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    def stats(self):
+        """Return hit/miss counters and hit rate per kind, and current size of the cache"""
+        with connect(self.path) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM summary_stats").fetchall())
+            sizes = {
+                kind: (entries, size) for kind, entries, size in conn.execute(
+                    "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM summaries GROUP BY kind"
+                ).fetchall()
+            }
+
+        report = {}
+        for kind in KINDS:
+            hits, misses = counters.get(f'{kind}_hits', 0), counters.get(f'{kind}_misses', 0)
+            entries, size = sizes.get(kind, (0, 0))
+            report[kind] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'entries': entries,
+                'size_bytes': size
+            }
+        report.update({
+            'evictions': counters.get('evictions', 0),
+            'expirations': counters.get('expirations', 0),
+            'size_bytes': sum(size for _, size in sizes.values()),
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl
+        })
+        return report
+
+    def clear(self):
+        with connect(self.path) as conn:
+            conn.execute("DELETE FROM summaries")
+            conn.execute("UPDATE summary_stats SET value = 0")
+
+
+_cache = None
+
+
+def get_summary_cache():
+    """Return the process-wide SummaryCache, or None when SUMMARY_CACHE_ENABLED=0"""
+    global _cache
+    if os.environ.get('SUMMARY_CACHE_ENABLED', '1') == '0':
+        return None
+    if _cache is None:
+        _cache = SummaryCache()
+    return _cache
@@ -74,6 +74,44 @@ removeFile.addEventListener('click', () => {
     analyzeBtn.classList.add('opacity-50', 'cursor-not-allowed');
 });
 
+// Reconnects in a row before giving up on the stream and polling /jobs/<id> instead
+const MAX_EVENT_RECONNECTS = 5;
+
+function followJobEvents(job) {
+    return new Promise(resolve => {
+        const source = new EventSource(job.events_url);
+        let reconnects = 0;
+
+        source.onopen = () => { reconnects = 0; };
+
+        source.addEventListener('page', (e) => {
+            const page = JSON.parse(e.data);
+            const topTopic = page.predictions && page.predictions.length ? ` Top topic so far: ${page.predictions[0].topic}.` : '';
+            progressText.textContent = `Page ${page.page} done (${Math.round(page.confidence)}% confidence, ${page.word_count} words).${topTopic}`;
+        });
+
+        const finish = async () => {
+            source.close();
+            // The status endpoint also stores the finished result for the report page
+            const statusResponse = await fetch(job.status_url || `/jobs/${job.job_id}`);
+            resolve({ ...job, ...(await statusResponse.json()) });
+        };
+        source.addEventListener('done', finish);
+        source.addEventListener('failed', finish);
+
+        // The server ends each stream after a few seconds; the browser reconnects
+        // and resumes from the last page it got (Last-Event-ID)
+        source.onerror = () => {
+            reconnects += 1;
+            if (source.readyState === EventSource.CONNECTING && reconnects <= MAX_EVENT_RECONNECTS) {
+                return;
+            }
+            source.close();
+            resolve(job);
+        };
+    });
+}
+
 uploadForm.addEventListener('submit', async (e) => {
     e.preventDefault();
 
@@ -97,7 +135,7 @@ uploadForm.addEventListener('submit', async (e) => {
     });
 
     // Append selected checkboxes
-    ['extract_questions', 'difficulty_analysis', 'topic_classification', 'answer_suggestions'].forEach(id => {
+    ['extract_questions', 'difficulty_analysis', 'topic_classification', 'answer_suggestions', 'add_to_corpus'].forEach(id => {
         const checkbox = uploadForm.querySelector(`input[name="${id}"]`);
         if (checkbox && checkbox.checked) formData.append(id, 'on');
     });
@@ -108,18 +146,32 @@ uploadForm.addEventListener('submit', async (e) => {
             body: formData
         });
 
-        const data = await response.json();
+        let data = await response.json();
 
-        // Simulate progress steps (you can replace this with polling later)
-        const steps = [
-            'Analyzing question patterns...',
-            'Classifying topics and difficulty...',
-            'Generating insights and suggestions...'
-        ];
+        if (!response.ok) {
+            progressText.textContent = data.message || 'Something went wrong. Please try again.';
+            return;
+        }
+
+        // Analysis runs as a background job - follow its per-page event stream,
+        // falling back to polling the status endpoint if streaming is unavailable
+        if (window.EventSource && data.events_url) {
+            data = await followJobEvents(data);
+        }
 
-        for (let i = 0; i < steps.length; i++) {
-            await new Promise(res => setTimeout(res, 1500));
-            progressText.textContent = steps[i];
+        while (data.status === 'queued' || data.status === 'running') {
+            progressText.textContent = data.status === 'queued'
+                ? 'Waiting for an analysis worker...'
+                : 'Processing OCR and extracting text...';
+            await new Promise(res => setTimeout(res, 2000));
+            const statusResponse = await fetch(data.status_url || `/jobs/${data.job_id}`);
+            const status = await statusResponse.json();
+            data = { ...data, ...status };
+        }
+
+        if (data.status === 'failed' || data.status === 'error') {
+            progressText.textContent = data.message || 'Analysis failed. Please try again.';
+            return;
         }
 
         progressText.textContent = data.message || 'Analysis complete!';
@@ -1,6 +1,8 @@
 from functools import wraps
+import hmac
 import os
-from flask import session, redirect, url_for, flash
+from urllib.parse import unquote
+from flask import session, redirect, url_for, flash, request, abort
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -40,6 +42,24 @@ def login_required(f):
     
     return decorated_function
 
+
+def require_admin_token(f):
+    """
+    Decorator that restricts admin endpoints to requests carrying ?token=<DB_CHECK_TOKEN>.
+
+    The configured secret is URL-decoded before comparing, so a secret stored
+    percent-encoded matches its plain form. Without DB_CHECK_TOKEN every request gets a 403.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        secret_token = os.getenv('DB_CHECK_TOKEN')
+        token = request.args.get('token', '')
+        if not secret_token or not hmac.compare_digest(token.encode(), unquote(secret_token).encode()):
+            abort(403)
+        return f(*args, **kwargs)
+
+    return decorated_function
+
 def convert_pdf_to_images(pdf_path, output_folder="temp_images", dpi=300):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
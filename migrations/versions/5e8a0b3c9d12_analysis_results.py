@@ -0,0 +1,34 @@
+"""analysis results
+
+Revision ID: 5e8a0b3c9d12
+Revises: c7d2e5a81f36
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a0b3c9d12'
+down_revision = 'c7d2e5a81f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analysis_results',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analysis_results_created_at', 'analysis_results', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_analysis_results_created_at', table_name='analysis_results')
+    op.drop_table('analysis_results')
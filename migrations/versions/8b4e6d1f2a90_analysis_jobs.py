@@ -0,0 +1,44 @@
+"""analysis jobs
+
+Revision ID: 8b4e6d1f2a90
+Revises: 3f1a9c2b7d45
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d1f2a90'
+down_revision = '3f1a9c2b7d45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analysis_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('progress', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analysis_jobs_user_id', 'analysis_jobs', ['user_id'])
+    op.create_index('ix_analysis_jobs_status_created_at', 'analysis_jobs', ['status', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_analysis_jobs_status_created_at', table_name='analysis_jobs')
+    op.drop_index('ix_analysis_jobs_user_id', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
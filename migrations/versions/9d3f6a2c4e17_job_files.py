@@ -0,0 +1,34 @@
+"""job files
+
+Revision ID: 9d3f6a2c4e17
+Revises: 5e8a0b3c9d12
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6a2c4e17'
+down_revision = '5e8a0b3c9d12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=32), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['analysis_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_files_job_id', 'job_files', ['job_id'])
+
+
+def downgrade():
+    op.drop_index('ix_job_files_job_id', table_name='job_files')
+    op.drop_table('job_files')
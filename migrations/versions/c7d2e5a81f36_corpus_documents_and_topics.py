@@ -0,0 +1,54 @@
+"""corpus documents and topics
+
+Revision ID: c7d2e5a81f36
+Revises: 8b4e6d1f2a90
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e5a81f36'
+down_revision = '8b4e6d1f2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'corpus_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('text_hash', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('filepath', sa.Text(), nullable=True),
+        sa.Column('date', sa.String(length=10), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('method', sa.String(length=32), nullable=True),
+        sa.Column('source', sa.String(length=16), nullable=True),
+        sa.Column('word_count', sa.Integer(), nullable=True),
+        sa.Column('char_count', sa.Integer(), nullable=True),
+        sa.Column('topics', sa.JSON(), nullable=False),
+        sa.Column('added_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'text_hash', name='uq_corpus_documents_user_text')
+    )
+    op.create_table(
+        'corpus_topics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.Text(), nullable=False),
+        sa.Column('frequency', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'topic', name='uq_corpus_topics_user_topic')
+    )
+
+
+def downgrade():
+    op.drop_table('corpus_topics')
+    op.drop_table('corpus_documents')
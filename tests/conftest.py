@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / 'migrations'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-benchmarks', action='store_true', default=False,
+                     help='also run the wall-clock benchmark tests')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: wall-clock timing test, only run with --run-benchmarks')
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timings depend on the machine and its load - keep them out of the default run
+    if config.getoption('--run-benchmarks'):
+        return
+    skip = pytest.mark.skip(reason='benchmark - run with --run-benchmarks')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The app on a fresh SQLite database, migrated to the latest revision"""
+    from flask_migrate import upgrade
+    from app import create_app
+    from app.config import Config
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "app.db"}'
+        # Tests run jobs themselves - no background workers
+        JOB_QUEUE_START = 'off'
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        upgrade(directory=str(MIGRATIONS))
+        yield app
+
+
+@pytest.fixture
+def user(app):
+    from app.extensions import db
+    from app.models import User
+
+    user = User(email='student@example.com', fullname='Test Student', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
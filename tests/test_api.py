@@ -0,0 +1,248 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cold start budget (seconds) for importing the app and running create_app()
+STARTUP_BUDGET = float(os.environ.get('STARTUP_BUDGET', 3.0))
+
+# Modules that must only be imported on first use, never at app start
+HEAVY_MODULES = ['sklearn', 'nltk', 'keybert', 'transformers', 'torch', 'sentence_transformers', 'pytesseract', 'pandas']
+
+STARTUP_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+from app.config import Config
+app = create_app(Config)
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_cold_start(tmp_path):
+    """Import the app and build it in a fresh interpreter, as a gunicorn worker boot would"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), RENDER='1', SECRET_KEY='test', JOB_QUEUE_START='off',
+               DATABASE_URL=f'sqlite:///{tmp_path / "startup.db"}')
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, f"app failed to start:\n{result.stderr}"
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdStart:
+    def test_heavy_dependencies_are_lazy(self, tmp_path):
+        assert measure_cold_start(tmp_path)['loaded'] == []
+
+    @pytest.mark.benchmark
+    def test_startup_within_budget(self, tmp_path):
+        timings = sorted(measure_cold_start(tmp_path)['seconds'] for _ in range(3))
+        print(f"\n   cold start: median {timings[1]:.3f}s (budget {STARTUP_BUDGET:.1f}s)")
+        assert timings[1] < STARTUP_BUDGET
+
+
+def parse_events(body):
+    """Split a text/event-stream body into dicts of its fields (comments dropped)"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if fields:
+            events.append(fields)
+    return events
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user.id
+    return client
+
+
+def add_job(user_id, status, pages):
+    from app.extensions import db
+    from app.models import AnalysisJob
+
+    from app.centralizepath import PROGRESS_RECENT_PAGES
+
+    recent_pages = [{'page': n} for n in range(max(pages - PROGRESS_RECENT_PAGES, 0) + 1, pages + 1)]
+    job = AnalysisJob(id=f'job{pages}{status}', user_id=user_id, status=status, payload={}, attempts=1,
+                      progress={'pages_done': pages, 'recent_pages': recent_pages, 'topic_counts': {}, 'predictions': []})
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def run_next_job():
+    """Claim and run the oldest queued job in this process, as a background worker would"""
+    from app import centralizepath
+
+    job_id, payload = centralizepath.analysis_jobs.claim()
+    centralizepath.analysis_jobs._run(job_id, payload)
+    return job_id
+
+
+class TestUploadJob:
+    def upload(self, client, *files):
+        data = {'paper_files': [(io.BytesIO(content), name) for name, content in files]}
+        response = client.post('/upload', data=data, content_type='multipart/form-data')
+        assert response.status_code == 202
+        body = response.get_json()
+        assert body['status'] == 'queued' and body['status_url'] == f"/jobs/{body['job_id']}"
+        return body['job_id']
+
+    def test_finished_job_sets_the_session_result(self, client, monkeypatch):
+        from app import centralizepath
+
+        analysed = []
+
+        def analyze(file_paths, on_page=None, **options):
+            analysed.extend(Path(path).read_bytes() for path in file_paths)
+            for number, path in enumerate(file_paths, 1):
+                on_page({'page': number, 'filename': Path(path).name, 'confidence': 90.0, 'word_count': 120,
+                         'source': 'ocr', 'accepted': True, 'topic_counts': {'hashing': number},
+                         'predictions': [{'topic': 'hashing'}]})
+            texts = [{'filename': Path(path).name, 'confidence': 90.0, 'word_count': 120, 'date': '2024-05-01'}
+                     for path in file_paths]
+            return {'predictions': [{'topic': 'hashing'}], 'summary': {'total_files': len(file_paths)},
+                    'analyzer': SimpleNamespace(extracted_texts=texts)}
+
+        monkeypatch.setattr(centralizepath, 'analyze_enhanced_topic_repetitions', analyze)
+        job_id = self.upload(client, ('paper1.pdf', b'%PDF-1 first'), ('paper2.png', b'second'))
+        assert client.get(f'/jobs/{job_id}').get_json()['status'] == 'queued'
+
+        assert run_next_job() == job_id
+        body = client.get(f'/jobs/{job_id}').get_json()
+        assert body['status'] == 'done' and body['summary'] == {'total_files': 2}
+        assert analysed == [b'%PDF-1 first', b'second']
+        assert body['progress']['pages_done'] == 2
+        assert [page['page'] for page in body['progress']['recent_pages']] == [1, 2]
+        assert body['progress']['topic_counts'] == {'hashing': 2}
+        with client.session_transaction() as session:
+            assert session['analysis_result_id'] == body['result_id']
+        assert client.get(body['predictions_url']).get_json()['predictions'] == [{'topic': 'hashing'}]
+        # The uploads lived with the job only until it finished
+        assert centralizepath.analysis_jobs.files(job_id) == []
+
+    def test_failed_job(self, client, monkeypatch):
+        from app import centralizepath
+
+        def handler(job_id, payload):
+            raise RuntimeError('Analysis failed or no valid files')
+
+        monkeypatch.setattr(centralizepath.analysis_jobs, 'handler', handler)
+        job_id = self.upload(client, ('paper.pdf', b'%PDF-1 scan'))
+        run_next_job()
+
+        body = client.get(f'/jobs/{job_id}').get_json()
+        assert body['status'] == 'failed'
+        assert body['message'] == 'Analysis failed: Analysis failed or no valid files'
+        with client.session_transaction() as session:
+            assert 'analysis_result_id' not in session
+
+    def test_rejected_uploads(self, client):
+        assert client.post('/upload', data={}, headers={'Accept': 'application/json'}).status_code == 400
+        data = {'paper_files': [(io.BytesIO(b'MZ'), 'tool.exe')]}
+        assert client.post('/upload', data=data, content_type='multipart/form-data').status_code == 400
+
+
+class TestJobEvents:
+    def test_stream_resumes_after_last_event_id(self, client, user):
+        job_id = add_job(user.id, 'done', pages=3)
+        response = client.get(f'/jobs/{job_id}/events', headers={'Last-Event-ID': '2'})
+        events = parse_events(response.get_data(as_text=True))
+
+        assert events[0] == {'retry': '1000'}
+        assert [(e.get('id'), e.get('event')) for e in events[1:]] == [('3', 'page'), (None, 'done')]
+        assert json.loads(events[1]['data'])['page'] == 3
+
+    def test_stream_ends_before_the_job_does(self, client, user, monkeypatch):
+        from app import centralizepath
+
+        monkeypatch.setattr(centralizepath, 'SSE_STREAM_SECONDS', 0)
+        job_id = add_job(user.id, 'running', pages=2)
+        events = parse_events(client.get(f'/jobs/{job_id}/events').get_data(as_text=True))
+
+        # Both pages, then the stream closes without a final event so the browser reconnects
+        assert [e.get('event') for e in events] == [None, 'page', 'page']
+        assert [e.get('id') for e in events[1:]] == ['1', '2']
+
+    def test_stream_skips_to_the_stored_pages(self, client, user):
+        from app.centralizepath import PROGRESS_RECENT_PAGES
+
+        job_id = add_job(user.id, 'done', pages=PROGRESS_RECENT_PAGES + 10)
+        events = parse_events(client.get(f'/jobs/{job_id}/events').get_data(as_text=True))
+
+        ids = [int(e['id']) for e in events if e.get('event') == 'page']
+        assert ids == list(range(11, PROGRESS_RECENT_PAGES + 11))
+        assert [json.loads(e['data'])['page'] for e in events if e.get('event') == 'page'] == ids
+
+    def test_other_users_job_is_hidden(self, client):
+        job_id = add_job(None, 'done', pages=1)
+        assert client.get(f'/jobs/{job_id}/events').status_code == 404
+
+
+class TestResultPredictions:
+    @pytest.fixture
+    def result_id(self, app, user):
+        from app import centralizepath
+        from tests.test_results import REPORT
+
+        return centralizepath.result_store.save(REPORT, user_id=user.id)
+
+    def test_first_page_by_default(self, client, result_id):
+        body = client.get(f'/results/{result_id}/predictions').get_json()
+
+        assert (body['page'], body['per_page'], body['total'], body['pages']) == (1, 20, 45, 3)
+        assert [p['topic'] for p in body['predictions']] == [f'topic {n}' for n in range(20)]
+
+    def test_last_partial_page(self, client, result_id):
+        body = client.get(f'/results/{result_id}/predictions?page=3').get_json()
+        assert [p['topic'] for p in body['predictions']] == [f'topic {n}' for n in range(40, 45)]
+
+    def test_page_size_is_clamped(self, client, result_id):
+        body = client.get(f'/results/{result_id}/predictions?per_page=1000&page=0').get_json()
+        assert (body['page'], body['per_page'], body['pages']) == (1, 100, 1)
+        assert len(body['predictions']) == 45
+
+        assert client.get(f'/results/{result_id}/predictions?page=9').get_json()['predictions'] == []
+
+    def test_unknown_or_foreign_result(self, client, app, result_id):
+        assert client.get('/results/unknown/predictions').status_code == 404
+
+        with client.session_transaction() as session:
+            session['user_id'] = 999
+        assert client.get(f'/results/{result_id}/predictions').status_code == 404
+
+
+class TestAdminToken:
+    ENDPOINTS = ['/admin/ocr_cache', '/admin/summary_cache', '/admin/nlp_cache', '/admin/models']
+
+    @pytest.fixture(autouse=True)
+    def no_caches(self, monkeypatch):
+        monkeypatch.setenv('OCR_CACHE_ENABLED', '0')
+        monkeypatch.setenv('SUMMARY_CACHE_ENABLED', '0')
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS)
+    def test_token_required(self, app, endpoint, monkeypatch):
+        monkeypatch.setenv('DB_CHECK_TOKEN', 's%40cret')
+        client = app.test_client()
+
+        assert client.get(endpoint).status_code == 403
+        assert client.get(f'{endpoint}?token=wrong').status_code == 403
+        # The configured secret is compared URL-decoded
+        assert client.get(f'{endpoint}?token=s%40cret').status_code == 200
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS + ['/admin/db_check'])
+    def test_refused_without_configured_token(self, app, endpoint, monkeypatch):
+        monkeypatch.delenv('DB_CHECK_TOKEN', raising=False)
+        assert app.test_client().get(f'{endpoint}?token=').status_code == 403
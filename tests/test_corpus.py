@@ -0,0 +1,136 @@
+import pytest
+
+from app.blueprints.analyzer.analyze import EnhancedTopicRepetitionAnalyzer, iter_input_pages
+from app.extensions import db
+from app.models import User
+from app.services.corpus_store import CorpusStore
+from tests.test_ocr import QUESTION_PAGES, text_pdf
+
+
+def record(text, filename='paper.png'):
+    return {'filename': filename, 'filepath': f'/uploads/{filename}', 'date': '2024-05-01', 'text': text,
+            'confidence': 91.5, 'method': 'psm6', 'source': 'ocr', 'word_count': len(text.split()), 'char_count': len(text)}
+
+
+@pytest.fixture
+def store(app):
+    return CorpusStore()
+
+
+@pytest.fixture
+def other_user(app):
+    user = User(email='other@example.com', fullname='Other Student', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+class TestCorpusStore:
+    def test_add_document(self, store, user):
+        doc_id = store.add_document(user.id, record('Explain regression'), ['regression', 'regression', 'variance'])
+        documents = store.documents(user.id)
+
+        assert [document['doc_id'] for document in documents] == [doc_id]
+        assert documents[0]['topics'] == ['regression', 'variance']
+        assert documents[0]['filename'] == 'paper.png' and documents[0]['confidence'] == 91.5
+        # Loading the corpus only needs metadata and topics
+        assert 'text' not in documents[0]
+
+    def test_same_text_is_stored_once(self, store, user):
+        assert store.add_document(user.id, record('Explain regression'), ['regression']) is not None
+        assert store.add_document(user.id, record('Explain regression', 'copy.png'), ['regression']) is None
+        assert store.document_count(user.id) == 1
+        assert store.topic_frequency(user.id) == {'regression': 1}
+
+    def test_concurrent_duplicate_keeps_the_stored_copy(self, store, user, monkeypatch):
+        first = store.add_document(user.id, record('Explain regression', 'first.png'), ['regression'])
+
+        # The duplicate check ran before the other upload committed - the insert hits the unique constraint
+        checks = iter([None])
+        document_id = store._document_id
+        monkeypatch.setattr(store, '_document_id', lambda user_id, text_hash: next(checks, document_id(user_id, text_hash)))
+
+        assert store.add_document(user.id, record('Explain regression', 'second.png'), ['regression', 'variance']) is None
+        assert [document['doc_id'] for document in store.documents(user.id)] == [first]
+        assert store.topic_frequency(user.id) == {'regression': 1}
+
+    def test_topic_aggregates(self, store, user):
+        store.add_document(user.id, record('one', 'a.png'), ['regression', 'variance'])
+        store.add_document(user.id, record('two', 'b.png'), ['sampling', 'regression'])
+
+        frequency = store.topic_frequency(user.id)
+        assert list(frequency) == ['regression', 'variance', 'sampling']
+        assert frequency == {'regression': 2, 'variance': 1, 'sampling': 1}
+        assert [(source['doc_id'], source['filename']) for source in store.topic_sources(user.id)['regression']] == \
+            [(document['doc_id'], document['filename']) for document in store.documents(user.id)]
+
+    def test_remove_document(self, store, user):
+        first = store.add_document(user.id, record('one', 'a.png'), ['regression', 'variance'])
+        store.add_document(user.id, record('two', 'b.png'), ['regression'])
+
+        assert store.remove_document(user.id, first)
+        assert store.topic_frequency(user.id) == {'regression': 1}
+        assert [document['filename'] for document in store.list_documents(user.id)] == ['b.png']
+        assert not store.remove_document(user.id, first)
+
+    def test_corpora_are_per_user(self, store, user, other_user):
+        doc_id = store.add_document(user.id, record('Explain regression'), ['regression'])
+
+        assert store.add_document(other_user.id, record('Explain regression'), ['regression']) is not None
+        assert not store.remove_document(other_user.id, doc_id)
+        assert store.topic_frequency(user.id) == {'regression': 1}
+        assert store.topic_frequency(other_user.id) == {'regression': 1}
+
+
+@pytest.fixture
+def corpus_analyzer(store, user, tmp_path):
+    def build():
+        try:
+            return EnhancedTopicRepetitionAnalyzer(output_dir=str(tmp_path / 'analysis'), use_lemmatization=False,
+                                                   ocr_workers=1, preprocess_threads=1, corpus=store, user_id=user.id)
+        except LookupError as e:
+            pytest.skip(f"NLTK data not installed: {e}")
+    return build
+
+
+class TestCorpusAnalyzer:
+    def test_add_documents(self, corpus_analyzer, store, user, tmp_path):
+        pdf = text_pdf(tmp_path / 'paper.pdf', QUESTION_PAGES)
+        analyzer = corpus_analyzer()
+        added = analyzer.add_documents(iter_input_pages([str(pdf)]))
+
+        assert len(added) == 2 and all(data['doc_id'] is not None for data in added)
+        assert store.document_count(user.id) == 2
+
+        # A new analyzer picks the corpus up from the stored topic sets - nothing is re-extracted
+        reloaded = corpus_analyzer()
+        assert [data['doc_id'] for data in reloaded.extracted_texts] == [data['doc_id'] for data in added]
+        assert [data['topics'] for data in reloaded.extracted_texts] == [data['topics'] for data in added]
+        assert +reloaded.topic_freq == +analyzer.topic_freq
+
+        # The same pages again are recognised as already stored
+        assert len(reloaded.add_documents(iter_input_pages([str(pdf)]))) == 2
+        assert store.document_count(user.id) == 2
+
+    def test_remove_document(self, corpus_analyzer, store, user, tmp_path):
+        analyzer = corpus_analyzer()
+        first, second = analyzer.add_documents(iter_input_pages([str(text_pdf(tmp_path / 'paper.pdf', QUESTION_PAGES))]))
+
+        assert analyzer.remove_document(first['doc_id'])
+        assert [data['doc_id'] for data in analyzer.extracted_texts] == [second['doc_id']]
+        assert +analyzer.topic_freq == store.topic_frequency(user.id)
+        assert all(source['filename'] == second['filename']
+                   for sources in analyzer.topic_sources.values() for source in sources)
+        assert not analyzer.remove_document(first['doc_id'])
+
+    def test_remove_one_of_two_papers_with_the_same_filename(self, corpus_analyzer, tmp_path):
+        analyzer = corpus_analyzer()
+        pdf = text_pdf(tmp_path / 'paper.pdf', QUESTION_PAGES[:1])
+        first = analyzer.add_documents(iter_input_pages([str(pdf)]))[-1]
+        second = analyzer.add_documents(iter_input_pages([str(text_pdf(pdf, QUESTION_PAGES[1:]))]))[-1]
+        assert first['filename'] == second['filename']
+
+        assert analyzer.remove_document(first['doc_id'])
+        assert {source['doc_id'] for topic in second['topics'] for source in analyzer.topic_sources[topic]} == \
+            {second['doc_id']}
+        assert all(topic in analyzer.topic_sources for topic in second['topics'])
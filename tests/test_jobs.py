@@ -0,0 +1,226 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from app.extensions import db
+from app.models import AnalysisJob
+from app.services.job_queue import JobQueue, utcnow
+
+
+def wait_for(queue, job_id, statuses=('done', 'failed'), timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']} after {timeout}s")
+
+
+def age_heartbeat(job_id, seconds):
+    db.session.get(AnalysisJob, job_id).heartbeat_at = utcnow() - timedelta(seconds=seconds)
+    db.session.commit()
+
+
+# Builds the app with JOB_QUEUE_START=fork, as gunicorn --preload does in its master, then forks a
+# "worker", which forks a process of its own (like the OCR pool). Prints which of them run job workers.
+PRELOAD_SCRIPT = """
+import json, os
+from app import create_app
+from app.config import Config
+
+class PreloadConfig(Config):
+    JOB_QUEUE_START = 'fork'
+
+def started():
+    return analysis_jobs._started_pid == os.getpid()
+
+def in_child(report):
+    read, write = os.pipe()
+    if os.fork() == 0:
+        os.write(write, json.dumps(report()).encode())
+        os._exit(0)
+    os.close(write)
+    os.wait()
+    return json.loads(os.read(read, 1024))
+
+app = create_app(PreloadConfig)
+from app.centralizepath import analysis_jobs
+result = {'master': started()}
+result.update(in_child(lambda: {'worker': started(), 'worker_child': in_child(started)}))
+print(json.dumps(result))
+"""
+
+
+@pytest.fixture
+def queue(app):
+    return JobQueue(handler=None, stale_after=60, max_attempts=2)
+
+
+class TestJobQueue:
+    def test_enqueue(self, queue, user):
+        job_id = queue.enqueue({'files': ['a.pdf']}, user_id=user.id)
+        job = queue.get(job_id)
+
+        assert job['status'] == 'queued' and job['attempts'] == 0
+        assert job['payload'] == {'files': ['a.pdf']} and job['user_id'] == user.id
+        assert queue.get('missing') is None
+
+    def test_claim_oldest_first(self, queue):
+        first = queue.enqueue({'n': 1})
+        second = queue.enqueue({'n': 2})
+
+        assert queue.claim() == (first, {'n': 1})
+        assert queue.claim() == (second, {'n': 2})
+        assert queue.claim() is None
+
+        job = queue.get(first)
+        assert job['status'] == 'running' and job['attempts'] == 1
+        assert job['started_at'] is not None and job['heartbeat_at'] is not None
+
+    def test_concurrent_claims_take_each_job_once(self, app, queue):
+        job_ids = {queue.enqueue({'n': n}) for n in range(4)}
+        claimed, lock = [], threading.Lock()
+
+        def claim():
+            with app.app_context():
+                while (job := queue.claim()) is not None:
+                    with lock:
+                        claimed.append(job[0])
+
+        threads = [threading.Thread(target=claim) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(claimed) == sorted(job_ids)
+
+    def test_complete_and_fail(self, queue):
+        done, failed = queue.enqueue({}), queue.enqueue({})
+        queue.claim(), queue.claim()
+
+        queue.complete(done, {'result_id': 'abc'})
+        queue.fail(failed, 'No valid files')
+
+        assert queue.get(done)['status'] == 'done'
+        assert queue.get(done)['result'] == {'result_id': 'abc'}
+        assert queue.get(failed)['status'] == 'failed'
+        assert queue.get(failed)['error'] == 'No valid files'
+        assert queue.get(failed)['finished_at'] is not None
+
+    def test_files_are_kept_until_the_job_finishes(self, queue):
+        job_id = queue.enqueue({}, files=[('paper.pdf', b'%PDF-1'), ('scan.png', b'\x89PNG')])
+        other = queue.enqueue({}, files=[('other.pdf', b'%PDF-2')])
+        assert queue.files(job_id) == [('paper.pdf', b'%PDF-1'), ('scan.png', b'\x89PNG')]
+
+        queue.claim()
+        queue.complete(job_id, {})
+        assert queue.files(job_id) == []
+        assert queue.files(other) == [('other.pdf', b'%PDF-2')]
+
+    def test_timestamps_are_naive_utc(self, queue):
+        job_id = queue.enqueue({})
+        queue.claim()
+        job = queue.get(job_id)
+        assert all(job[column].tzinfo is None for column in ('created_at', 'started_at', 'heartbeat_at'))
+        assert abs(job['heartbeat_at'] - utcnow()) < timedelta(seconds=5)
+
+    def test_update_progress(self, queue):
+        job_id = queue.enqueue({})
+        queue.update_progress(job_id, {'pages': [{'page': 1}]})
+        assert queue.get(job_id)['progress'] == {'pages': [{'page': 1}]}
+
+    def test_requeue_stale(self, queue):
+        stale, alive = queue.enqueue({}), queue.enqueue({})
+        queue.claim(), queue.claim()
+        age_heartbeat(stale, 120)
+        queue.heartbeat(alive)
+
+        assert queue.requeue_stale() == 1
+        assert queue.get(stale)['status'] == 'queued' and queue.get(stale)['heartbeat_at'] is None
+        assert queue.get(alive)['status'] == 'running'
+
+    def test_heartbeat_keeps_long_jobs_running(self, queue):
+        job_id = queue.enqueue({})
+        queue.claim()
+        age_heartbeat(job_id, 120)
+        queue.heartbeat(job_id)
+
+        assert queue.requeue_stale() == 0
+        assert queue.get(job_id)['status'] == 'running'
+
+    def test_stale_job_fails_after_max_attempts(self, queue):
+        job_id = queue.enqueue({}, files=[('paper.pdf', b'%PDF-1')])
+        for _ in range(2):
+            assert queue.claim()[0] == job_id
+            age_heartbeat(job_id, 120)
+            queue.requeue_stale()
+
+        job = queue.get(job_id)
+        assert job['status'] == 'failed' and job['attempts'] == 2
+        assert 'stopped responding' in job['error']
+        assert queue.files(job_id) == []
+
+
+class TestWorkers:
+    def test_worker_runs_jobs(self, app):
+        def handler(job_id, payload):
+            queue.update_progress(job_id, {'pages': [{'page': 1}]})
+            if payload.get('broken'):
+                raise RuntimeError('Analysis failed or no valid files')
+            return {'total': sum(payload['numbers'])}
+
+        queue = JobQueue(handler=handler, poll_interval=0.05)
+        queue.start(app)
+        ok = queue.enqueue({'numbers': [1, 2, 3]})
+        broken = queue.enqueue({'broken': True})
+
+        assert wait_for(queue, ok)['result'] == {'total': 6}
+        assert wait_for(queue, ok)['progress'] == {'pages': [{'page': 1}]}
+        assert wait_for(queue, broken)['error'] == 'Analysis failed or no valid files'
+
+    def test_init_app_starts_workers_unless_off(self, app):
+        queue = JobQueue(handler=lambda job_id, payload: {'ok': True}, poll_interval=0.05)
+        queue.init_app(app)
+        assert queue._started_pid is None
+
+        app.config['JOB_QUEUE_START'] = 'now'
+        queue.init_app(app)
+        assert wait_for(queue, queue.enqueue({}))['result'] == {'ok': True}
+
+    def test_preloaded_app_starts_workers_in_each_forked_worker(self, tmp_path):
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent), SECRET_KEY='test',
+                   DATABASE_URL=f'sqlite:///{tmp_path / "preload.db"}')
+        result = subprocess.run([sys.executable, '-c', PRELOAD_SCRIPT], cwd=tmp_path, env=env,
+                                capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+
+        started = json.loads(result.stdout.strip().splitlines()[-1])
+        assert started == {'master': False, 'worker': True, 'worker_child': False}
+
+    def test_heartbeat_while_handler_runs(self, app):
+        started, release = threading.Event(), threading.Event()
+
+        def handler(job_id, payload):
+            started.set()
+            release.wait(5)
+            return {}
+
+        queue = JobQueue(handler=handler, poll_interval=0.05, heartbeat_interval=0.05)
+        queue.start(app)
+        job_id = queue.enqueue({})
+        assert started.wait(5)
+
+        first = queue.get(job_id)['heartbeat_at']
+        time.sleep(0.3)
+        assert queue.get(job_id)['heartbeat_at'] > first
+        release.set()
+        assert wait_for(queue, job_id)['status'] == 'done'
@@ -0,0 +1,521 @@
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.model_registry import ModelRegistry, warm_up_models
+from app.services.nlp_service import KeywordMatcher, PhraseCleaner, get_topic_scanner, normalize_topic_phrase, normalization_cache_stats
+from app.services.summarize import load_summarizer, pack_sentences, split_sentences
+from app.services.summary_cache import SummaryCache, make_summary_key
+
+ACADEMIC_STOPWORDS = {
+    'related to computer science', 'computer science and information technology',
+    'information technology', 'related to', 'example related', 'page', 'question',
+    'answer', 'following question', 'the following', 'as follows', 'marks',
+    'explain briefly', 'short answer', 'long answer', 'unit', 'chapter',
+    'section', 'part', 'what is', 'define', 'list', 'write short note',
+    'write note', 'short note', 'give', 'state', 'mention', 'discuss'
+}
+
+
+def reference_clean_topic_phrase(phrase, academic_stopwords=ACADEMIC_STOPWORDS):
+    """The original regex-by-regex EnhancedTopicRepetitionAnalyzer.clean_topic_phrase"""
+    phrase = phrase.strip()
+
+    if re.match(r'^\d+$', phrase) or len(phrase) < 3:
+        return None
+
+    phrase = re.sub(r'^\d+\.?\s*', '', phrase)
+    phrase = re.sub(r'^Q\d+\.?\s*', '', phrase, flags=re.IGNORECASE)
+    phrase = re.sub(r'^Question\s*\d+\.?\s*', '', phrase, flags=re.IGNORECASE)
+    phrase = re.sub(r'^\d+\s*[\)\]\}]\s*', '', phrase)
+    phrase = re.sub(r'^[a-z]\)\s*', '', phrase, flags=re.IGNORECASE)
+
+    prefixes_to_remove = [
+        r'^what\s+is\s+', r'^define\s+', r'^explain\s+', r'^describe\s+',
+        r'^write\s+short\s+note\s+on\s+', r'^discuss\s+', r'^list\s+',
+        r'^briefly\s+explain\s+', r'^give\s+', r'^state\s+', r'^mention\s+',
+        r'^how\s+', r'^why\s+', r'^when\s+', r'^where\s+'
+    ]
+    for prefix in prefixes_to_remove:
+        phrase = re.sub(prefix, '', phrase, flags=re.IGNORECASE)
+
+    phrase = re.sub(r'\s*\(\d+\s*marks?\)', '', phrase, flags=re.IGNORECASE)
+    phrase = re.sub(r'\s*\[\d+\s*marks?\]', '', phrase, flags=re.IGNORECASE)
+    phrase = re.sub(r'\s*\d+\s*marks?$', '', phrase, flags=re.IGNORECASE)
+
+    phrase = re.sub(r'[^\w\s-]', ' ', phrase)
+    phrase = ' '.join(phrase.split())
+
+    if len(phrase.split()) < 2:
+        return None
+
+    if phrase.lower() in academic_stopwords:
+        return None
+
+    return phrase
+
+
+EDGE_CASES = [
+    '', '  ', '12', '123456', 'ab', ' 7 ', '1. hypothesis test', 'Q3. regression analysis',
+    'q12 markov chain', 'Question 4: binary search tree', 'QUESTION4. sorting algorithm',
+    '2) dynamic programming', '3 ] graph theory', 'b) neural network', 'B) Neural Network',
+    '1. Q2. Question 3 4) a) what is a hash table', 'what is', 'What  is   variance analysis',
+    'explain define random variable', 'define explain random variable',
+    'briefly explain sampling distribution', 'explain briefly sampling distribution',
+    'write short note on operating system', 'Write Short Note On compiler design',
+    'how why when where test', 'list give state mention discuss anova test',
+    'chi-square test (5 marks)', 'chi-square test [10 Marks]', 'chi-square test 5 marks',
+    'chi-square test 1 mark', 'poisson (2 marks) distribution [3 marks] 4 marks',
+    'normal [5 (3 marks) marks] curve', 'MARKS', 'section', 'Related to Computer Science',
+    'information, technology!', 'latin-square design', 'big o notation?', 'data@structure#tree',
+    'İstanbul ﬁnal exam', 'k) Kelvin 5 MARK', '১২ bengali digits', 'line one\nline two (4 marks)',
+    'mann-whitney u-test', '5 marks', '(5 marks) regression', 'tree\ttraversal\t[2 marks]',
+]
+
+VOCABULARY = (
+    'what is define explain describe write short note on discuss list briefly give state mention how why '
+    'when where Q1. Q2 Question 3: 1. 2) 4] 5} a) b) (5 marks) [2 Marks] 10 marks mark hypothesis test '
+    'regression analysis markov chain binary search tree related to computer science information technology '
+    'the of and , ; ! ? - ( ) [ ] 7 42'
+).split()
+
+
+class TestPhraseCleanerParity:
+    """PhraseCleaner must clean exactly like the original clean_topic_phrase"""
+
+    @pytest.mark.parametrize('phrase', EDGE_CASES)
+    def test_edge_cases(self, phrase):
+        assert PhraseCleaner(ACADEMIC_STOPWORDS).clean(phrase) == reference_clean_topic_phrase(phrase)
+
+    def test_random_phrases(self):
+        rng = random.Random(17)
+        cleaner = PhraseCleaner(ACADEMIC_STOPWORDS)
+        for _ in range(5000):
+            phrase = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 7)))
+            assert cleaner.clean(phrase) == reference_clean_topic_phrase(phrase), phrase
+
+    def test_batch_matches_single(self):
+        cleaner = PhraseCleaner(ACADEMIC_STOPWORDS)
+        phrases = EDGE_CASES + EDGE_CASES[::-1]
+        assert cleaner.clean_batch(phrases) == [reference_clean_topic_phrase(p) for p in phrases]
+
+
+class TestNormalizationCache:
+    STOP_WORDS = frozenset({'the', 'of', 'and', 'is'})
+
+    def test_normalizes_like_before(self):
+        assert normalize_topic_phrase('Distribution of the Sampling', self.STOP_WORDS, False) == 'distribution sampling'
+        assert normalize_topic_phrase('sampling distribution', self.STOP_WORDS, False) == 'distribution sampling'
+        # Phrases longer than 3 words keep their order
+        assert normalize_topic_phrase('test the null hypothesis using anova', self.STOP_WORDS, False) == \
+            'test null hypothesis using anova'
+
+    def test_repeated_phrases_hit_the_cache(self):
+        before = normalization_cache_stats()['phrase']
+        for _ in range(3):
+            normalize_topic_phrase('markov chain process memo', self.STOP_WORDS, False)
+        after = normalization_cache_stats()['phrase']
+        assert after['misses'] - before['misses'] == 1
+        assert after['hits'] - before['hits'] == 2
+        assert 0.0 < after['hit_rate'] <= 1.0
+
+
+def reference_semantic_groups(all_topics, similarity_threshold=0.3):
+    """The original dense greedy grouping of find_semantic_topic_groups, over distinct topics"""
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    vectorizer = TfidfVectorizer(max_features=500, ngram_range=(1, 2), stop_words='english', lowercase=True)
+    similarity_matrix = cosine_similarity(vectorizer.fit_transform(all_topics))
+
+    semantic_groups = []
+    processed_indices = set()
+    for i in range(len(all_topics)):
+        if i in processed_indices:
+            continue
+        similar_indices = [i]
+        for j in range(i + 1, len(all_topics)):
+            if j not in processed_indices and similarity_matrix[i][j] > similarity_threshold:
+                similar_indices.append(j)
+        if len(similar_indices) > 1:
+            processed_indices.update(similar_indices)
+            semantic_groups.append({
+                'group_size': len(similar_indices),
+                'avg_similarity': np.mean([similarity_matrix[i][j] for j in similar_indices[1:]]),
+                'topics': [all_topics[idx] for idx in similar_indices]
+            })
+
+    semantic_groups.sort(key=lambda x: (x['group_size'], x['avg_similarity']), reverse=True)
+    return semantic_groups[:10]
+
+
+TOPIC_WORDS = (
+    'regression sampling distribution hypothesis testing variance markov chain binary search tree graph '
+    'traversal hash table sorting algorithm neural network gradient descent probability bayes theorem '
+    'linear logistic normal poisson dynamic programming'
+).split()
+
+
+@pytest.fixture
+def grouping_analyzer(tmp_path):
+    from app.blueprints.analyzer.analyze import EnhancedTopicRepetitionAnalyzer
+
+    try:
+        return EnhancedTopicRepetitionAnalyzer(output_dir=str(tmp_path / 'analysis'), use_lemmatization=False,
+                                               ocr_workers=1, preprocess_threads=1)
+    except LookupError as e:
+        pytest.skip(f"NLTK data not installed: {e}")
+
+
+class TestSemanticGroupingParity:
+    """The sparse similarity graph must group topics exactly like the dense greedy pass"""
+
+    @pytest.mark.parametrize('seed', [19, 190, 1900])
+    def test_matches_dense_grouping(self, grouping_analyzer, seed):
+        rng = random.Random(seed)
+        for n in range(rng.randint(20, 60)):
+            topics = list(dict.fromkeys(
+                ' '.join(rng.sample(TOPIC_WORDS, rng.randint(2, 3))) for _ in range(rng.randint(1, 6))
+            ))
+            data = {'filename': f'paper_{n}.png', 'date': '2024-05-01', 'topics': topics}
+            grouping_analyzer.extracted_texts.append(data)
+            grouping_analyzer.track_document_topics(data)
+
+        groups = grouping_analyzer.find_semantic_topic_groups()
+        expected = reference_semantic_groups(list(grouping_analyzer.topic_freq))
+
+        assert groups, "the random topics should form groups"
+        assert [[t['topic'] for t in group['topics']] for group in groups] == [group['topics'] for group in expected]
+        assert [group['group_size'] for group in groups] == [group['group_size'] for group in expected]
+        assert [group['avg_similarity'] for group in groups] == \
+            pytest.approx([group['avg_similarity'] for group in expected])
+
+    def test_group_sources_come_from_the_topic_index(self, grouping_analyzer):
+        for n, topics in enumerate([['binary search tree', 'hash table'], ['binary search', 'hash table sorting']]):
+            data = {'filename': f'paper_{n}.png', 'date': f'202{n}-01-01', 'topics': topics}
+            grouping_analyzer.extracted_texts.append(data)
+            grouping_analyzer.track_document_topics(data)
+
+        for group in grouping_analyzer.find_semantic_topic_groups():
+            for member in group['topics']:
+                assert member['sources'] == grouping_analyzer.topic_sources[member['topic']]
+                assert member['source'] == {'topic': member['topic'], **member['sources'][0]}
+
+
+ACADEMIC_KEYWORDS = frozenset({
+    'test', 'analysis', 'hypothesis', 'regression', 'distribution', 'sampling', 'tree', 'graph',
+    'hash', 'sorting', 'algorithm', 'neural network', 'big o', 'data', 'model', 'system'
+})
+
+SCAN_VOCABULARY = (
+    'The Big Test test Tests analysis ANALYSIS hypothesis regression big o tree-graph hash_map Algorithm '
+    'sorting Neural Network data, model. system! why? x_y 42 é Éclair naïve Über ß σ Σ ½ ² ٣ — ... ! ? . , ; '
+    '( ) [ ] Testing Machine Learning subtree hashing treetest bigo tests. Model! Theory design? approach '
+    'procedure Distribution sampling. (5 marks) Q1.'
+).split(' ')
+
+
+def random_document(rng, max_words=80):
+    words = [rng.choice(SCAN_VOCABULARY) for _ in range(rng.randint(0, max_words))]
+    return re.sub(r'\s+', ' ', ''.join(word + rng.choice(['', ' ', ' ', '  ']) for word in words))
+
+
+class TestKeywordMatcher:
+    def test_finds_every_occurrence(self):
+        keywords = {'he', 'she', 'his', 'hers', 'test', 'testing', 'big o'}
+        matcher = KeywordMatcher(keywords)
+        rng = random.Random(16)
+        for _ in range(500):
+            text = ''.join(rng.choice('hers tig bo') for _ in range(rng.randint(0, 60)))
+            expected = sorted(
+                (start, start + len(keyword), keyword)
+                for keyword in keywords for start in range(len(text)) if text.startswith(keyword, start)
+            )
+            assert sorted(matcher.finditer(text)) == expected, text
+
+    def test_hits_in_end_order(self):
+        hits = list(KeywordMatcher({'she', 'he', 'hers'}).finditer('ushers'))
+        assert hits == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def reference_scan(scanner, text):
+    """The four original regex passes of extract_academic_topics, using the scanner's patterns"""
+    words = text.lower().split()
+    lowered = ' '.join(words)
+    word_starts = []
+    offset = 0
+    for word in words:
+        word_starts.append(offset)
+        offset += len(word) + 1
+
+    # For each word, the latest start of a keyword hit ending within it
+    latest_hit_start = []
+    found_keywords = set()
+    hits = scanner.keyword_matcher.finditer(lowered)
+    hit = next(hits, None)
+    best_start = -1
+    for word_start, word in zip(word_starts, words):
+        word_end = word_start + len(word)
+        while hit is not None and hit[1] <= word_end:
+            best_start = max(best_start, hit[0])
+            found_keywords.add(hit[2])
+            hit = next(hits, None)
+        latest_hit_start.append(best_start)
+
+    candidates = []
+    for i in range(len(words)):
+        for n in scanner.NGRAM_SIZES:
+            if i + n <= len(words) and latest_hit_start[i + n - 1] >= word_starts[i]:
+                candidates.append(' '.join(words[i:i+n]))
+
+    for pattern in scanner.CAPITALIZED_PATTERN.findall(text):
+        if len(pattern.split()) >= 2:
+            candidates.append(pattern)
+
+    for pattern in scanner.STAT_PATTERN.findall(text):
+        words_in_pattern = pattern.strip('.,!?').split()[:scanner.STAT_SPAN_WORDS]
+        if len(words_in_pattern) >= 2:
+            candidates.append(' '.join(words_in_pattern))
+
+    for keyword in found_keywords:
+        candidates.extend(scanner.context_patterns[keyword].findall(text))
+    return candidates
+
+
+class TestTopicCandidateScanner:
+    """The single-pass scanner must produce the same candidates as the four regex passes"""
+
+    def test_matches_regex_passes(self):
+        rng = random.Random(20)
+        scanner = get_topic_scanner(ACADEMIC_KEYWORDS)
+        for _ in range(2000):
+            text = random_document(rng)
+            assert set(scanner.scan(text)) == set(reference_scan(scanner, text)), text
+
+    @pytest.mark.parametrize('text', [
+        '', ' ', 'test', 'Test.', 'analysis of data. The Test', 'Big Data Tree Model',
+        'the test, of the model!', 'x test y. test z',
+    ])
+    def test_edge_cases(self, text):
+        scanner = get_topic_scanner(ACADEMIC_KEYWORDS)
+        assert set(scanner.scan(text)) == set(reference_scan(scanner, text))
+
+    @pytest.mark.parametrize('text, folded', [
+        ('İstanbul Test Data', 'Istanbul Test Data'),
+        ('\u212aelvin Model Test', 'Kelvin Model Test'),
+        ('Stat \u017ftest of the data', 'Stat stest of the data'),
+        ('a hypothesıs test', 'a hypothesis test'),
+    ])
+    def test_special_case_characters_are_folded(self, text, folded):
+        scanner = get_topic_scanner(ACADEMIC_KEYWORDS)
+        assert sorted(scanner.scan(text)) == sorted(reference_scan(scanner, folded))
+
+    @pytest.mark.benchmark
+    def test_faster_than_regex_passes(self):
+        rng = random.Random(21)
+        scanner = get_topic_scanner(ACADEMIC_KEYWORDS)
+        text = ' '.join(random_document(rng, 400) for _ in range(100))
+
+        def best_of(function, repeats=3):
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                function(text)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        regex_time = best_of(lambda text: reference_scan(scanner, text))
+        scan_time = best_of(scanner.scan)
+        print(f"\n   {len(text.split())} words: regex passes {regex_time:.3f}s, scanner {scan_time:.3f}s")
+        assert scan_time < regex_time
+
+
+class TestModelRegistry:
+    def test_loads_each_model_once_across_threads(self):
+        registry = ModelRegistry()
+        loads = []
+
+        def load():
+            loads.append(1)
+            time.sleep(0.05)
+            return bytearray(1 << 20)
+
+        registry.register('model', load)
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(registry.get('model'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert all(model is seen[0] for model in seen)
+
+    def test_warm_up_and_memory_report(self):
+        registry = ModelRegistry()
+        registry.register('ok', lambda: 'model')
+        registry.register('broken', lambda: 1 / 0)
+        registry.register('unused', lambda: 'never loaded')
+
+        results = registry.warm_up(['ok', 'broken'])
+        assert results['ok'] is None and 'division by zero' in results['broken']
+
+        report = registry.memory_report()['models']
+        assert report['ok']['loaded'] and report['ok']['load_seconds'] >= 0
+        assert not report['broken']['loaded'] and not report['unused']['loaded']
+
+    def test_unknown_model(self):
+        with pytest.raises(KeyError):
+            ModelRegistry().get('missing')
+
+    def test_warm_up_is_off_by_default(self):
+        assert warm_up_models('') == {}
+
+
+class TestSummaryChunking:
+    def test_split_sentences(self):
+        text = 'First sentence. Second one!  Third?\n\nNew   paragraph without stop\nstill going. 3.5 stays'
+        assert split_sentences(text) == [
+            'First sentence.', 'Second one!', 'Third?', 'New paragraph without stop still going.', '3.5 stays'
+        ]
+        assert split_sentences('  \n ') == []
+
+    def test_pack_sentences_respects_budget(self):
+        counts = [300, 400, 250, 100, 950, 10]
+        chunks = pack_sentences(['s'] * len(counts), counts, max_tokens=900)
+        assert chunks == [[0, 1], [2, 3], [4], [5]]
+        assert [i for chunk in chunks for i in chunk] == list(range(len(counts)))
+
+
+class TestSummaryCache:
+    def test_key_ignores_whitespace_but_not_params(self):
+        assert make_summary_key('Some  notes\n here', model='m') == make_summary_key('Some notes here', model='m')
+        assert make_summary_key('Some notes here', model='m') != make_summary_key('Some notes here', model='n')
+
+    def test_hits_misses_and_ttl(self, tmp_path):
+        cache = SummaryCache(tmp_path / 'summaries.sqlite3', ttl=60)
+        cache.put_many([('a', 'summary a'), ('b', 'summary b')], 'chunk')
+        assert cache.get_many(['a', 'c', 'b'], 'chunk') == ['summary a', None, 'summary b']
+        assert cache.get('d', 'document') is None
+
+        stats = cache.stats()
+        assert (stats['chunk']['hits'], stats['chunk']['misses']) == (2, 1)
+        assert stats['document']['misses'] == 1 and stats['document']['hit_rate'] == 0.0
+
+        expired = SummaryCache(tmp_path / 'summaries.sqlite3', ttl=-1)
+        assert expired.get('a', 'chunk') is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = SummaryCache(tmp_path / 'summaries.sqlite3', max_bytes=20)
+        cache.put('old', 'x' * 10, 'chunk')
+        time.sleep(0.01)
+        cache.put('used', 'y' * 10, 'chunk')
+        time.sleep(0.01)
+        cache.get('old', 'chunk')
+        time.sleep(0.01)
+        cache.put('new', 'z' * 10, 'chunk')
+
+        assert cache.get('used', 'chunk') is None
+        assert cache.get('old', 'chunk') and cache.get('new', 'chunk')
+        assert cache.stats()['evictions'] == 1
+
+
+# Local directory of a small seq2seq checkpoint (e.g. a saved sshleifer/distilbart-xsum-12-1)
+# for the backend comparison. Without one the test is skipped - it never downloads a model.
+SUMMARY_TEST_MODEL = os.environ.get('SUMMARY_TEST_MODEL', '')
+
+BENCHMARK_DOCUMENTS = [
+    'A hypothesis test decides whether sample data give enough evidence to reject a null hypothesis. '
+    'The test statistic is compared with a critical value from its sampling distribution. When the p-value '
+    'is below the significance level the null hypothesis is rejected. Type I errors reject a true null '
+    'hypothesis, while type II errors keep a false one. The power of a test is the probability of '
+    'correctly rejecting a false null hypothesis, and it grows with the sample size.',
+    'Dynamic programming solves a problem by combining solutions to overlapping subproblems. Each '
+    'subproblem is solved once and its answer stored in a table, so later steps reuse it instead of '
+    'recomputing it. Classic examples are the knapsack problem, longest common subsequence and shortest '
+    'paths in graphs. The approach needs optimal substructure: an optimal solution is built from optimal '
+    'solutions of its subproblems.',
+    'An operating system schedules processes on the CPU. Round robin gives each process a fixed time '
+    'quantum, while shortest job first minimizes the average waiting time but needs burst estimates. '
+    'Priority scheduling can starve low priority processes, which aging prevents by raising their '
+    'priority over time. Context switches have a cost, so a quantum that is too small wastes CPU time.',
+]
+
+BENCHMARK_SCRIPT = """
+import json, sys, time
+import torch, transformers.pipelines  # Imported up front so the RSS delta only counts the model
+from app.services.model_registry import current_rss_bytes
+from app.services.summarize import load_summarizer, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH
+backend, model_name, documents = sys.argv[1], sys.argv[2], json.loads(sys.stdin.read())
+rss_before = current_rss_bytes()
+started = time.perf_counter()
+summarizer = load_summarizer(backend, model_name)
+load_seconds = time.perf_counter() - started
+summarizer(documents[:1], max_length=SUMMARY_MAX_LENGTH, min_length=10, do_sample=False, truncation=True)
+started = time.perf_counter()
+outputs = summarizer(documents, max_length=SUMMARY_MAX_LENGTH, min_length=10, do_sample=False, truncation=True)
+latency = (time.perf_counter() - started) / len(documents)
+print(json.dumps({'load_seconds': load_seconds, 'latency': latency, 'rss_bytes': current_rss_bytes() - rss_before,
+                  'summaries': [output['summary_text'] for output in outputs]}))
+"""
+
+
+def rouge_l(candidate, reference):
+    """ROUGE-L F1 of two texts over lowercased word tokens"""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return float(a == b)
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend):
+    """Load one backend in a fresh interpreter and summarize the benchmark documents"""
+    result = subprocess.run(
+        [sys.executable, '-c', BENCHMARK_SCRIPT, backend, SUMMARY_TEST_MODEL],
+        input=json.dumps(BENCHMARK_DOCUMENTS), capture_output=True, text=True, timeout=1800,
+        cwd=Path(__file__).resolve().parent.parent
+    )
+    assert result.returncode == 0, f"{backend} backend failed to load or run:\n{result.stderr}"
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestSummaryBackends:
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            load_summarizer('fp16-gpu')
+
+    def test_int8_against_fp32(self):
+        pytest.importorskip('torch')
+        pytest.importorskip('transformers')
+        if not SUMMARY_TEST_MODEL or not Path(SUMMARY_TEST_MODEL).is_dir():
+            pytest.skip("set SUMMARY_TEST_MODEL to a local summarization checkpoint directory")
+
+        fp32, int8 = run_backend('fp32'), run_backend('int8')
+        scores = [rouge_l(candidate, reference) for candidate, reference in zip(int8['summaries'], fp32['summaries'])]
+        print(f"\n   {SUMMARY_TEST_MODEL}")
+        for name, result in (('fp32', fp32), ('int8', int8)):
+            print(f"   {name}: load {result['load_seconds']:.2f}s, {result['latency']:.3f}s/summary, "
+                  f"RSS +{result['rss_bytes'] / 2**20:.0f} MB")
+        print(f"   ROUGE-L int8 vs fp32: {sum(scores) / len(scores):.3f}")
+
+        assert len(int8['summaries']) == len(BENCHMARK_DOCUMENTS)
+        assert int8['rss_bytes'] < fp32['rss_bytes']
@@ -0,0 +1,530 @@
+import os
+import shutil
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+import PyPDF2
+import pytest
+from PIL import Image
+
+from app.blueprints.analyzer import analyze
+from app.blueprints.analyzer.analyze import (
+    PREPROCESS_TILE_MIN_PIXELS, PREPROCESSING_VARIANTS, PSM_MODES, EnhancedTopicRepetitionAnalyzer, PageText,
+    PreprocessedPage, analyze_enhanced_topic_repetitions, find_text_regions, has_text_layer, iter_input_pages,
+    iter_pdf_page_sources, iter_pdf_pages, merge_ocr_data, text_from_ocr_data, tiled_bilateral_filter
+)
+from app.services.nlp_service import get_stop_words
+from app.services.ocr_cache import OCRCache, make_cache_key
+from app.services.ocr_service import (
+    TESSERACT_LANG, TEXT_HEIGHT_TARGET, TesseractEngine, estimate_text_height, load_grayscale, normalize_resolution,
+    tesserocr, to_pixel_array
+)
+
+
+def tesseract_available():
+    """True when an engine can be built here: tesserocr with language data, or the tesseract CLI"""
+    if tesserocr is not None:
+        return TESSERACT_LANG in tesserocr.get_languages()[1]
+    return shutil.which('tesseract') is not None
+
+
+def render_text(lines, height=60, width=1400):
+    """White grayscale page with each line of text drawn in black"""
+    page = np.full((height * len(lines) + 40, width), 255, dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(page, line, (30, height * (i + 1)), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3, cv2.LINE_AA)
+    return page
+
+
+@pytest.mark.skipif(not tesseract_available(), reason="no tesseract engine or language data")
+class TestTesseractEngine:
+    def test_ocrs_a_rendered_page(self):
+        engine = TesseractEngine()
+        try:
+            page = render_text(['HYPOTHESIS TESTING', 'LINEAR REGRESSION MODEL'])
+            text = engine.image_to_string(page, psm=6)
+            data = engine.image_to_data(page, psm=6)
+        finally:
+            engine.close()
+
+        assert 'HYPOTHESIS' in text and 'REGRESSION' in text
+        words = [word for word in data['text'] if word.strip()]
+        assert 'MODEL' in words
+        assert len(data['conf']) == len(data['text'])
+
+
+def ocr_data(words):
+    """image_to_data-style columns from (page, block, paragraph, line, text) rows"""
+    return {
+        'page_num': [w[0] for w in words],
+        'block_num': [w[1] for w in words],
+        'par_num': [w[2] for w in words],
+        'line_num': [w[3] for w in words],
+        'text': [w[4] for w in words],
+    }
+
+
+class TestTextFromOcrData:
+    def test_lines_and_blocks(self):
+        data = ocr_data([
+            (1, 1, 1, 1, 'Explain'), (1, 1, 1, 1, 'regression'),
+            (1, 1, 1, 2, 'analysis.'),
+            (1, 2, 1, 1, 'Q2'), (1, 2, 1, 1, 'Hashing'),
+        ])
+        assert text_from_ocr_data(data) == 'Explain regression\nanalysis.\n\nQ2 Hashing'
+
+    def test_skips_empty_words(self):
+        data = ocr_data([
+            (1, 1, 1, 1, ''), (1, 1, 1, 1, ' Sampling '), (1, 1, 1, 1, None),
+            (1, 1, 1, 2, '  '),
+            (1, 1, 2, 1, 'distribution'),
+        ])
+        assert text_from_ocr_data(data) == 'Sampling\ndistribution'
+        assert text_from_ocr_data(ocr_data([(1, 1, 1, 1, ' ')])) == ''
+
+
+class TestOCRCache:
+    def test_key_covers_pixels_shape_and_params(self):
+        page = np.zeros((4, 6), dtype=np.uint8)
+        key = make_cache_key(page, psm_modes=[6, 3])
+        assert make_cache_key(page.copy(), psm_modes=[6, 3]) == key
+        assert make_cache_key(page.reshape(6, 4), psm_modes=[6, 3]) != key
+        assert make_cache_key(page, psm_modes=[6]) != key
+
+        changed = page.copy()
+        changed[0, 0] = 1
+        assert make_cache_key(changed, psm_modes=[6, 3]) != key
+
+    def test_hits_and_misses(self, tmp_path):
+        cache = OCRCache(tmp_path / 'ocr.sqlite3')
+        assert cache.get('page') is None
+        cache.put('page', 'Sampling distribution', 91.5, 'otsu_psm6')
+        assert cache.get('page') == ('Sampling distribution', 91.5, 'otsu_psm6')
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+        assert stats['hit_rate'] == 0.5
+        assert stats['size_bytes'] == len('Sampling distribution')
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = OCRCache(tmp_path / 'ocr.sqlite3', max_bytes=20)
+        cache.put('old', 'x' * 10, 80, 'adaptive_psm6')
+        time.sleep(0.01)
+        cache.put('used', 'y' * 10, 80, 'adaptive_psm6')
+        time.sleep(0.01)
+        cache.get('old')
+        time.sleep(0.01)
+        cache.put('new', 'z' * 10, 80, 'adaptive_psm6')
+
+        assert cache.get('used') is None
+        assert cache.get('old') and cache.get('new')
+        assert cache.stats()['evictions'] == 1
+
+    def test_empty_results_are_not_stored(self, tmp_path):
+        cache = OCRCache(tmp_path / 'ocr.sqlite3')
+        cache.put('blank', '', 0, '')
+        cache.put('unscored', 'text', 0, '')
+        assert cache.stats()['entries'] == 0
+
+    def test_shared_between_instances(self, tmp_path):
+        OCRCache(tmp_path / 'ocr.sqlite3').put('page', 'text', 70, 'enhanced_psm3')
+        assert OCRCache(tmp_path / 'ocr.sqlite3').get('page') == ('text', 70.0, 'enhanced_psm3')
+
+
+requires_poppler = pytest.mark.skipif(shutil.which('pdftoppm') is None, reason="poppler is not installed")
+
+
+def scanned_pdf(path, page_count):
+    """Image-only PDF (no text layer): page i has a black bar i * 20 points wide"""
+    pages = []
+    for i in range(1, page_count + 1):
+        page = Image.new('L', (300, 200), 255)
+        page.paste(0, (10, 10, 10 + i * 20, 40))
+        pages.append(page)
+    pages[0].save(path, save_all=True, append_images=pages[1:], resolution=72)
+    return path
+
+
+@requires_poppler
+class TestPdfPageStreaming:
+    def test_yields_every_page_in_order(self, tmp_path):
+        pdf = scanned_pdf(tmp_path / 'scan.pdf', 5)
+        pages = list(iter_pdf_pages(str(pdf), dpi=72, window=2))
+
+        assert [number for number, _ in pages] == [1, 2, 3, 4, 5]
+        bar_widths = [int((np.asarray(image)[25] < 128).sum()) for _, image in pages]
+        assert bar_widths == sorted(bar_widths) and len(set(bar_widths)) == 5
+        assert all(image.mode == 'L' for _, image in pages)
+
+    def test_renders_only_the_requested_pages(self, tmp_path):
+        pdf = scanned_pdf(tmp_path / 'scan.pdf', 6)
+        for prefetch in (True, False):
+            pages = list(iter_pdf_pages(str(pdf), dpi=72, window=2, prefetch=prefetch, pages=[2, 3, 4, 6]))
+            assert [number for number, _ in pages] == [2, 3, 4, 6]
+        assert list(iter_pdf_pages(str(pdf), dpi=72, pages=[])) == []
+
+
+class TestLoadGrayscale:
+    def test_every_input_type_decodes_to_the_same_page(self, tmp_path):
+        gray = render_text(['SAMPLING'], width=400)
+        bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        path = tmp_path / 'page.png'
+        cv2.imwrite(str(path), bgr)
+
+        sources = [
+            str(path), path, path.read_bytes(), bytearray(path.read_bytes()),
+            Image.open(path), Image.fromarray(gray), gray, bgr, cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA),
+        ]
+        for source in sources:
+            loaded = load_grayscale(source)
+            assert loaded.dtype == np.uint8 and loaded.ndim == 2
+            assert np.array_equal(loaded, gray)
+
+    def test_undecodable_input(self, tmp_path):
+        assert load_grayscale(b'not an image') is None
+        assert load_grayscale(tmp_path / 'missing.png') is None
+
+    def test_pixel_array_is_contiguous(self):
+        rgba = Image.new('RGBA', (5, 3), (10, 20, 30, 255))
+        assert to_pixel_array(rgba).shape == (3, 5, 4)
+        assert to_pixel_array(Image.new('P', (5, 3))).shape == (3, 5, 3)
+        view = np.zeros((10, 10), dtype=np.uint8)[:, ::2]
+        assert to_pixel_array(view).flags['C_CONTIGUOUS']
+
+
+def text_page(scale, thickness, height=1200, width=1600):
+    """A page of identical text lines at the given putText scale"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    step = int(40 * scale) + 10
+    for y in range(30 + step, height - 10, step):
+        cv2.putText(page, 'The sampling distribution of a mean', (20, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, 0, thickness, cv2.LINE_AA)
+    return page
+
+
+class TestNormalizeResolution:
+    @pytest.mark.parametrize('scale, thickness, grows', [(0.4, 1, True), (0.8, 2, True), (2.5, 5, False), (4, 8, False)])
+    def test_text_lands_at_target_height(self, scale, thickness, grows):
+        page = text_page(scale, thickness)
+        normalized = normalize_resolution(page)
+
+        assert (normalized.shape[0] > page.shape[0]) == grows
+        assert normalized.shape[1] / normalized.shape[0] == pytest.approx(page.shape[1] / page.shape[0], rel=0.01)
+        assert estimate_text_height(normalized) == pytest.approx(TEXT_HEIGHT_TARGET, rel=0.15)
+
+    def test_page_near_target_is_left_alone(self):
+        page = text_page(1.3, 2)
+        assert 0.85 <= TEXT_HEIGHT_TARGET / estimate_text_height(page) <= 1.15
+        assert normalize_resolution(page) is page
+
+    def test_pages_without_text(self):
+        small = np.full((300, 400), 255, dtype=np.uint8)
+        assert normalize_resolution(small).shape == (800, 1066)
+
+        large = np.full((1200, 1600), 255, dtype=np.uint8)
+        assert normalize_resolution(large) is large
+
+
+class TestPreprocessedPage:
+    def test_tiled_filter_matches_full_frame(self):
+        rng = np.random.default_rng(8)
+        page = rng.integers(0, 256, size=(1500, 1400), dtype=np.uint8)
+        assert page.size >= PREPROCESS_TILE_MIN_PIXELS
+        assert np.array_equal(tiled_bilateral_filter(page, threads=4), cv2.bilateralFilter(page, 9, 75, 75))
+
+    def test_variants_are_built_on_demand(self):
+        page = PreprocessedPage(text_page(0.8, 2, height=400, width=800))
+        assert list(page) == PREPROCESSING_VARIANTS and len(page) == 3
+
+        otsu = page['otsu']
+        assert set(page._stages) == {'denoised', 'enhanced', 'otsu'}
+        assert page['otsu'] is otsu
+
+        with pytest.raises(KeyError):
+            page['sharpened']
+
+    def test_variants_match_the_eager_pipeline(self):
+        gray = text_page(0.8, 2, height=400, width=800)
+        denoised = cv2.bilateralFilter(gray, 9, 75, 75)
+        enhanced = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(denoised)
+        expected = {
+            'adaptive': cv2.adaptiveThreshold(enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2),
+            'otsu': cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
+            'enhanced': enhanced,
+        }
+        page = PreprocessedPage(gray)
+        for variant in PREPROCESSING_VARIANTS:
+            assert np.array_equal(page[variant], expected[variant])
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """An analyzer with two region OCR threads (needs NLTK's stopword list)"""
+    try:
+        get_stop_words()
+    except LookupError:
+        pytest.skip("NLTK stopwords data is not installed")
+    with EnhancedTopicRepetitionAnalyzer(output_dir=str(tmp_path / 'analysis'), ocr_workers=1,
+                                         preprocess_threads=2) as analyzer:
+        yield analyzer
+
+
+class TestTextRegions:
+    def test_blocks_in_reading_order(self):
+        page = np.full((1400, 1000), 255, dtype=np.uint8)
+        for text, y in (('Q1. Explain hypothesis testing', 150), ('with an example.', 190), ('Q2. Binary search trees', 1100)):
+            cv2.putText(page, text, (60, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2, cv2.LINE_AA)
+
+        regions = find_text_regions(page)
+        assert len(regions) == 2
+        (x1, y1, w1, h1), (x2, y2, w2, h2) = regions
+        # The two lines of Q1 form one block above Q2, and each block holds all of its ink
+        assert y1 < 150 - 30 and y1 + h1 > 190 and y2 < 1100 - 30 < 1100 < y2 + h2
+        ink = page < 128
+        covered = np.zeros_like(ink)
+        for x, y, w, h in regions:
+            covered[y:y + h, x:x + w] = True
+        assert not (ink & ~covered).any()
+
+    def test_blank_and_dense_pages(self):
+        assert find_text_regions(np.full((500, 500), 255, dtype=np.uint8)) == []
+
+        page = np.full((420, 360), 255, dtype=np.uint8)
+        for y in range(40, 410, 30):
+            cv2.putText(page, 'The sampling distribution', (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 0, 2, cv2.LINE_AA)
+        assert find_text_regions(page) is None
+
+    def test_merged_data_keeps_page_coordinates(self):
+        crops = [
+            {'text': ['Q1'], 'block_num': [1], 'left': [5], 'top': [2], 'conf': [90.0]},
+            {'text': ['Q2'], 'block_num': [1], 'left': [3], 'top': [4], 'conf': [80.0]},
+        ]
+        merged = merge_ocr_data(crops, [(100, 10, 50, 20), (100, 500, 50, 20)])
+        assert merged['text'] == ['Q1', 'Q2']
+        assert merged['left'] == [105, 103] and merged['top'] == [12, 504]
+        assert merged['block_num'][0] != merged['block_num'][1]
+
+
+class TestRegionExecutor:
+    def test_one_pool_for_every_page_until_closed(self, analyzer):
+        executor = analyzer.region_executor()
+        assert executor is not None and analyzer.region_executor() is executor
+
+        analyzer.close()
+        assert executor._shutdown
+        assert analyzer.region_executor() is not executor
+
+    def test_single_thread_analyzer_has_no_pool(self, analyzer):
+        analyzer.preprocess_threads = 1
+        assert analyzer.region_executor() is None
+
+
+def scored_ocr_data(word_count, confidence):
+    """image_to_data-style columns for one block of word_count words, all read at confidence"""
+    data = ocr_data([(1, 1, 1, 1, f'word{i}') for i in range(word_count)])
+    data['conf'] = [confidence] * word_count
+    return data
+
+
+class FakeRegionOCR:
+    """Stands in for analyzer.ocr_regions: records each (variant, psm) tried and returns canned data"""
+
+    def __init__(self, data):
+        self.data = data
+        self.tried = []
+
+    def __call__(self, image, psm, regions, executor=None):
+        self.tried.append(psm)
+        if isinstance(self.data, Exception):
+            raise self.data
+        return self.data
+
+
+class TestCandidateSearch:
+    def test_candidates_ordered_by_wins(self, analyzer, monkeypatch):
+        monkeypatch.setattr(analyze, 'OCR_CANDIDATE_WINS', Counter({'otsu_psm3': 5, 'enhanced_psm11': 2}))
+        candidates = analyzer.ocr_candidates()
+
+        assert candidates[:2] == [('otsu', 3), ('enhanced', 11)]
+        # Combinations that never won keep the default variant/PSM order
+        default_order = [(variant, psm) for variant in PREPROCESSING_VARIANTS for psm in PSM_MODES]
+        assert candidates[2:] == [c for c in default_order if c not in candidates[:2]]
+
+    def test_stops_once_targets_are_met(self, analyzer, monkeypatch):
+        monkeypatch.setattr(analyze, 'get_ocr_cache', lambda: None)
+        monkeypatch.setattr(analyze, 'OCR_CANDIDATE_WINS', Counter())
+        fake = FakeRegionOCR(scored_ocr_data(analyzer.ocr_target_words + 5, 95))
+        monkeypatch.setattr(analyzer, 'ocr_regions', fake)
+
+        text, confidence, method = analyzer.extract_text_from_image(render_text(['SAMPLING DISTRIBUTION']))
+        assert len(fake.tried) == 1
+        assert confidence == 95 and method == f'{PREPROCESSING_VARIANTS[0]}_psm{PSM_MODES[0]}'
+        assert analyze.OCR_CANDIDATE_WINS[method] == 1
+
+    def test_searches_every_candidate_below_target(self, analyzer, monkeypatch):
+        monkeypatch.setattr(analyze, 'get_ocr_cache', lambda: None)
+        monkeypatch.setattr(analyze, 'OCR_CANDIDATE_WINS', Counter())
+        fake = FakeRegionOCR(scored_ocr_data(analyzer.ocr_target_words + 5, analyzer.ocr_target_confidence - 10))
+        monkeypatch.setattr(analyzer, 'ocr_regions', fake)
+
+        analyzer.extract_text_from_image(render_text(['SAMPLING DISTRIBUTION']))
+        assert len(fake.tried) == len(PREPROCESSING_VARIANTS) * len(PSM_MODES)
+
+    def test_caches_only_successful_pages(self, analyzer, monkeypatch, tmp_path):
+        cache = OCRCache(tmp_path / 'ocr.sqlite3')
+        monkeypatch.setattr(analyze, 'get_ocr_cache', lambda: cache)
+        monkeypatch.setattr(analyze, 'OCR_CANDIDATE_WINS', Counter())
+        fake = FakeRegionOCR(scored_ocr_data(analyzer.ocr_target_words + 5, 95))
+        monkeypatch.setattr(analyzer, 'ocr_regions', fake)
+        page = render_text(['SAMPLING DISTRIBUTION'])
+
+        # Miss: OCR'd and stored; hit: served without running OCR again
+        result = analyzer.extract_text_from_image(page)
+        assert result[2] and len(fake.tried) == 1
+        assert analyzer.extract_text_from_image(page) == result
+        assert len(fake.tried) == 1
+
+        # Every candidate fails: nothing is stored, so the page is OCR'd again next time
+        fake.data = RuntimeError('tesseract crashed')
+        fake.tried.clear()
+        other = render_text(['LINEAR REGRESSION'])
+        assert analyzer.extract_text_from_image(other) == ('', 0, '')
+        assert analyzer.extract_text_from_image(other) == ('', 0, '')
+        assert len(fake.tried) == 2 * len(PREPROCESSING_VARIANTS) * len(PSM_MODES)
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 3, 1)
+
+
+def text_pdf(path, pages):
+    """A PDF with a real text layer: one page of Helvetica lines per entry of pages"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in pages:
+        stream = 'BT /F1 12 Tf 72 720 Td 14 TL ' + ' '.join(f'({line}) Tj T*' for line in text.split('\n')) + ' ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    body, offsets = b'%PDF-1.4\n', []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f'{number} 0 obj\n{obj}\nendobj\n'.encode()
+    xref = f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n' + ''.join(f'{offset:010d} 00000 n \n' for offset in offsets)
+    trailer = f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{len(body)}\n%%EOF\n'
+    path.write_bytes(body + (xref + trailer).encode())
+    return path
+
+
+QUESTION_PAGES = [
+    'Q1. Explain the sampling distribution of the mean.\nQ2. State the central limit theorem with an example.',
+    'Q3. Compare linear and logistic regression models.\nQ4. Describe hypothesis testing for two proportions.',
+]
+
+
+class TestTextLayer:
+    @pytest.mark.parametrize('text, usable', [
+        (None, False),
+        ('', False),
+        ('Too few words on this page', False),
+        ('\x01\x02 ~~ ## @@ %% ^^ ** ++ == || \x03', False),
+        ('-- .. ;; ,, :: a1 -- .. ;; ,, :: b2', False),
+        (QUESTION_PAGES[0], True),
+    ])
+    def test_has_text_layer(self, text, usable):
+        assert has_text_layer(text) == usable
+
+    def test_born_digital_pages_skip_rendering(self, tmp_path):
+        pdf = text_pdf(tmp_path / 'digital.pdf', QUESTION_PAGES)
+        sources = list(iter_pdf_page_sources(str(pdf)))
+
+        assert [number for number, _, _ in sources] == [1, 2]
+        for (_, text, image), expected in zip(sources, QUESTION_PAGES):
+            assert image is None and isinstance(text, PageText)
+            assert text.split() == expected.split()
+
+    @requires_poppler
+    def test_scanned_pages_are_rendered_in_place(self, tmp_path):
+        digital = PyPDF2.PdfReader(str(text_pdf(tmp_path / 'digital.pdf', QUESTION_PAGES)))
+        scanned = PyPDF2.PdfReader(str(scanned_pdf(tmp_path / 'scan.pdf', 1)))
+        writer = PyPDF2.PdfWriter()
+        for page in (digital.pages[0], scanned.pages[0], digital.pages[1]):
+            writer.add_page(page)
+        with open(tmp_path / 'mixed.pdf', 'wb') as mixed:
+            writer.write(mixed)
+
+        sources = list(iter_pdf_page_sources(str(tmp_path / 'mixed.pdf'), dpi=72))
+        assert [number for number, _, _ in sources] == [1, 2, 3]
+        assert [text is None for _, text, _ in sources] == [False, True, False]
+        assert [image is None for _, _, image in sources] == [True, False, True]
+
+
+
+class TestPageProgress:
+    def test_every_page_is_reported(self, analyzer, tmp_path):
+        pdf = text_pdf(tmp_path / 'paper.pdf', QUESTION_PAGES)
+        events = []
+        analyzer.process_multiple_files(iter_input_pages([str(pdf)]), on_page=events.append)
+
+        assert [event['page'] for event in events] == [1, 2]
+        assert all(event['accepted'] and event['source'] == 'text_layer' for event in events)
+        assert [event['filename'] for event in events] == [data['filename'] for data in analyzer.extracted_texts]
+
+    def test_analysis_reports_provisional_predictions(self, analyzer, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        pdf = text_pdf(tmp_path / 'paper.pdf', QUESTION_PAGES)
+        events = []
+        result = analyze_enhanced_topic_repetitions([str(pdf)], use_lemmatization=False, workers=1,
+                                                    on_page=events.append, top_n=3)
+
+        assert [event['page'] for event in events] == [1, 2]
+        # Running counts only grow, and each page comes with a top_n prediction list
+        assert set(events[0]['topic_counts']) <= set(events[1]['topic_counts'])
+        assert events[1]['topic_counts'] == dict(result['analyzer'].topic_freq.most_common(20))
+        assert all(0 < len(event['predictions']) <= 3 for event in events)
+        assert events[1]['predictions'] == result['analyzer'].provisional_predictions(3)
+
+def fake_ocr_worker(image, candidate_wins):
+    """Pool worker stand-in: the 'image' names what the page does"""
+    if image == 'crash':
+        os._exit(1)
+    if image == 'raise':
+        raise ValueError('unreadable page')
+    # Long enough that other pages are still in flight when a worker crashes
+    time.sleep(0.2)
+    return (f'text of {image}', 90.0, 'otsu_psm6'), {'otsu_psm6': 1}
+
+
+class TestParallelOCR:
+    @pytest.fixture(autouse=True)
+    def fake_worker(self, monkeypatch):
+        monkeypatch.setattr(analyze, '_ocr_worker', fake_ocr_worker)
+        monkeypatch.setattr(analyze, 'OCR_CANDIDATE_WINS', Counter())
+        yield
+        analyze.shutdown_ocr_pools()
+
+    def ocr(self, analyzer, images):
+        pages = [(f'page{i}.png', f'page{i}.png', image) for i, image in enumerate(images)]
+        return [(page[2], result) for page, result in analyzer.iter_ocr_results(pages, workers=2)]
+
+    def test_results_come_back_in_input_order(self, analyzer):
+        images = [f'p{i}' for i in range(7)]
+        results = self.ocr(analyzer, images[:3] + [PageText('born digital')] + images[3:])
+
+        assert [image for image, _ in results] == images[:3] + ['born digital'] + images[3:]
+        assert results[3][1] == ('born digital', 100.0, 'text_layer')
+        assert all(result == (f'text of {image}', 90.0, 'otsu_psm6') for image, result in results if image != 'born digital')
+        assert analyze.OCR_CANDIDATE_WINS['otsu_psm6'] == 7
+
+    def test_failing_page_does_not_fail_the_rest(self, analyzer):
+        results = self.ocr(analyzer, ['p0', 'raise', 'p2', 'p3'])
+        assert [result[2] for _, result in results] == ['otsu_psm6', 'failed', 'otsu_psm6', 'otsu_psm6']
+
+    def test_crashed_worker_only_fails_its_page(self, analyzer):
+        results = self.ocr(analyzer, ['p0', 'p1', 'crash', 'p3', 'p4', 'p5'])
+        assert [image for image, _ in results] == ['p0', 'p1', 'crash', 'p3', 'p4', 'p5']
+        assert [result[2] for _, result in results] == ['otsu_psm6'] * 2 + ['failed'] + ['otsu_psm6'] * 3
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import AnalysisResult
+from app.services.result_store import ResultStore
+
+REPORT = {
+    'predictions': [{'topic': f'topic {n}', 'probability': 1 - n / 100} for n in range(45)],
+    'summary': {'total_files': 3},
+    'analyzer_data': {'extracted_texts': [{'filename': 'a.png', 'confidence': 90.0, 'word_count': 120, 'date': '2024-05-01'}]}
+}
+
+
+@pytest.fixture
+def store(app):
+    return ResultStore(ttl=3600)
+
+
+def age(result_id, seconds):
+    row = db.session.get(AnalysisResult, result_id)
+    row.created_at -= timedelta(seconds=seconds)
+    db.session.commit()
+
+
+class TestResultStore:
+    def test_round_trip(self, store, user):
+        result_id = store.save(REPORT, user_id=user.id)
+
+        assert store.load(result_id, user.id) == REPORT
+        # Stored compressed, keyed by an opaque ID
+        assert len(db.session.get(AnalysisResult, result_id).data) < len(str(REPORT))
+        assert len(result_id) >= 20
+
+    def test_only_the_owner_can_load(self, store, user):
+        result_id = store.save(REPORT, user_id=user.id)
+        assert store.load(result_id, None) is None
+        assert store.load(result_id, user.id + 1) is None
+        assert store.load('unknown', user.id) is None
+
+    def test_expired_results_are_hidden_and_purged(self, store, user):
+        old = store.save(REPORT, user_id=user.id)
+        age(old, 7200)
+        assert store.load(old, user.id) is None
+
+        new = store.save(REPORT, user_id=user.id)
+        assert db.session.get(AnalysisResult, old) is None
+        assert store.load(new, user.id) == REPORT
+
+    def test_delete(self, store, user):
+        result_id = store.save(REPORT, user_id=user.id)
+        store.delete(result_id)
+        assert store.load(result_id, user.id) is None